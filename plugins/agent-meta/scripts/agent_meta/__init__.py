@@ -0,0 +1 @@
+"""Shared library for the agent-meta analysis scripts."""
@@ -0,0 +1,137 @@
+"""`--since-last`: pick up each transcript where the previous run stopped.
+
+Sessions only ever grow, so a script that's run over and over (say nightly,
+across every project) mostly re-reads history it has already analyzed. With
+`--since-last`, a checkpoint file per script records, for each transcript,
+its inode and size when it was read, the byte offset and entry count
+reached, and the script's partial aggregates at that point. Next time, a transcript that
+only grew is read from the saved offset and its new events are folded into
+the saved aggregates; one that was replaced or truncated is read from the
+start; one that didn't change isn't read at all.
+
+Checkpoints live at `$AGENT_META_CACHE_DIR/checkpoints/<script>.json`. Like
+the transcript index they're only a cache: delete one and the next run
+starts over. Aggregates are stored as JSON, so scripts keep them in plain
+dicts and lists.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+from .index import cache_dir
+from .transcripts import ReadStats
+
+# Bump when the file layout changes; checkpoints in another version are ignored.
+_VERSION = 2
+
+S = TypeVar("S")
+T = TypeVar("T")
+
+
+class Checkpoints:
+    """One script's checkpoints. Use as a context manager to save them on exit."""
+
+    def __init__(self, script: str, path: Path | None = None):
+        self.path = path if path is not None else cache_dir() / "checkpoints" / f"{script}.json"
+        try:
+            saved = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            saved = {}
+        self.files: dict[str, dict] = saved.get("files", {}) if saved.get("version") == _VERSION else {}
+
+    def __enter__(self) -> Checkpoints:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.save()
+
+    def resume(self, jsonl_path: Path) -> tuple[ReadStats, Any]:
+        """Where to pick `jsonl_path` up: (stats to read on from, saved aggregates).
+
+        Both start from scratch (aggregates None) when there's no usable
+        checkpoint: none saved, or the file was replaced or truncated since.
+        """
+        saved = self.files.get(str(jsonl_path.resolve()))
+        try:
+            stat = jsonl_path.stat()
+        except OSError:
+            return ReadStats(), None
+        if (
+            not saved
+            or saved["inode"] != stat.st_ino
+            or stat.st_size < max(saved["size"], saved["offset"])
+        ):
+            return ReadStats(), None
+        return ReadStats(entries=saved["entries"], offset=saved["offset"]), saved["state"]
+
+    def unchanged(self, jsonl_path: Path, stat: os.stat_result) -> bool:
+        """Whether `jsonl_path`, now at `stat`, is just as it was when last read."""
+        saved = self.files.get(str(jsonl_path.resolve()))
+        return bool(saved) and (saved["inode"], saved["size"]) == (stat.st_ino, stat.st_size)
+
+    def record(self, jsonl_path: Path, stat: os.stat_result, stats: ReadStats, state: Any) -> None:
+        """Remember how far `jsonl_path` was read and the aggregates at that point.
+
+        `stat` is the file's before the read began, so lines written during
+        it count as a change next time.
+        """
+        self.files[str(jsonl_path.resolve())] = {
+            "inode": stat.st_ino,
+            "size": stat.st_size,
+            "offset": stats.offset,
+            "entries": stats.entries,
+            "state": state,
+        }
+
+    def advance(self, jsonl_path: Path, read: Callable[[Path, ReadStats, S | None], S]) -> S:
+        """Read what's new in `jsonl_path` and return the updated aggregates.
+
+        `read(jsonl_path, stats, state)` continues from `stats` (passing it
+        on to `read_events` with `partial=False`), folds the new events into
+        `state` (None on a first read) and returns it.
+        """
+        stat = jsonl_path.stat()
+        if self.unchanged(jsonl_path, stat):
+            return self.files[str(jsonl_path.resolve())]["state"]
+        stats, state = self.resume(jsonl_path)
+        state = read(jsonl_path, stats, state)
+        self.record(jsonl_path, stat, stats, state)
+        return state
+
+    def save(self) -> None:
+        """Write the checkpoints back, dropping transcripts that no longer exist."""
+        files = {path: saved for path, saved in self.files.items() if os.path.exists(path)}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"version": _VERSION, "files": files}))
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # it's only a cache; the next run reads from the start
+
+
+def add_since_last_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--since-last",
+        action="store_true",
+        help="Only read what's new since the last --since-last run, merging it into "
+        "the saved results (runs in-process; --jobs is ignored)",
+    )
+
+
+def map_since_last(
+    func: Callable[[Path, Checkpoints], T], jsonl_files: list[Path], script: str
+) -> Iterator[T]:
+    """Yield `func(path, checkpoints)` for each file, in order, then save the checkpoints.
+
+    The `--since-last` counterpart to `fanout.map_files`. Only new lines are
+    read, so it stays in-process.
+    """
+    with Checkpoints(script) as checkpoints:
+        for path in jsonl_files:
+            yield func(path, checkpoints)
@@ -0,0 +1,75 @@
+"""`agent-meta` command: maintenance for the analysis scripts' shared state."""
+
+from __future__ import annotations
+
+import argparse
+import signal
+import sys
+import time
+from pathlib import Path
+
+from .index import TranscriptIndex
+from .transcripts import ALLOWED_ROOT, collect_jsonl_files
+
+signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+
+
+def cmd_index(args: argparse.Namespace) -> int:
+    jsonl_files = collect_jsonl_files(args.paths or [ALLOWED_ROOT])
+    started = time.monotonic()
+
+    with TranscriptIndex(args.db) as index:
+        if args.rebuild:
+            index.rebuild()
+        stats = index.update(jsonl_files)
+        stats.pruned = index.prune()
+
+    elapsed = time.monotonic() - started
+    print(
+        f"Indexed {stats.files} file(s) in {elapsed:.1f}s: "
+        f"{stats.entries} new entries "
+        f"({stats.added} added, {stats.appended} appended, {stats.reindexed} re-indexed, "
+        f"{stats.unchanged} unchanged, {stats.pruned} pruned)"
+    )
+    print(f"Index: {index.db_path}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="agent-meta",
+        description="Meta-development tools for agentic workflows.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = subparsers.add_parser(
+        "index",
+        help="Incrementally index session transcripts into SQLite",
+        description="Incrementally index session transcripts into SQLite.",
+        epilog="Only files within ~/.claude/projects are allowed.",
+    )
+    index_parser.add_argument(
+        "paths",
+        nargs="*",
+        type=Path,
+        metavar="PATH",
+        help="JSONL file(s) or directory(ies) to index (default: ~/.claude/projects)",
+    )
+    index_parser.add_argument(
+        "--db",
+        type=Path,
+        help="Index database (default: $AGENT_META_CACHE_DIR/index.sqlite3)",
+    )
+    index_parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Discard the index and re-ingest everything",
+    )
+    index_parser.set_defaults(func=cmd_index)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
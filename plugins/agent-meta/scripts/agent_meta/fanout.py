@@ -0,0 +1,56 @@
+"""`--jobs N`: analyze transcripts in parallel, one process per file.
+
+Sessions are independent, so per-file analysis maps cleanly over a process
+pool (threads wouldn't help: the work is JSON decoding under the GIL).
+Results come back in input order whatever order workers finish in, so
+output is the same as a serial run; aggregates are merged by the caller
+from the per-file results as they arrive.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+def add_jobs_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Analyze up to N files in parallel (0 = one per CPU; default: 1)",
+    )
+
+
+def map_files(func: Callable[[Path], T], jsonl_files: list[Path], jobs: int = 1) -> Iterator[T]:
+    """Yield `func(path)` for each file, in order, using up to `jobs` processes.
+
+    `func` must be a module-level function (it's pickled to the workers).
+    The largest files are handed out first so one big session doesn't start
+    last and leave the other workers idle.
+    """
+    workers = min(jobs if jobs > 0 else os.cpu_count() or 1, len(jsonl_files))
+    if workers <= 1:
+        yield from map(func, jsonl_files)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for path in sorted(jsonl_files, key=_size, reverse=True):
+            futures[path] = pool.submit(func, path)
+        for path in jsonl_files:
+            yield futures[path].result()
+
+
+def _size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
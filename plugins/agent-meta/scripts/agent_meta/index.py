@@ -0,0 +1,360 @@
+"""Incremental SQLite index of Claude session transcripts.
+
+`agent-meta index` ingests transcripts into one local database, so the
+analysis scripts (with `--index`) can query it instead of re-reading and
+re-parsing every session each run.
+
+Ingestion is incremental. Each file's inode, size and the byte offset of the
+last fully ingested line are recorded; a file that only grew is read from
+that offset, one that was replaced or truncated is re-ingested from scratch,
+and one that didn't change isn't opened at all. A trailing line that's still
+being written is left for the next run.
+
+The database lives at `$AGENT_META_CACHE_DIR/index.sqlite3` (default
+`${XDG_CACHE_HOME:-~/.cache}/pickled-claude-plugins/agent-meta`). It's a
+cache: delete it, or pass `--rebuild`, and it's rebuilt from the transcripts.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from .transcripts import (
+    Entry,
+    SystemReminder,
+    ToolResult,
+    ToolUse,
+    decode_entry,
+    entry_events,
+    read_lines,
+)
+
+_DB_FILENAME = "index.sqlite3"
+
+# Bump when the schema changes; an index with another version is rebuilt.
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    offset INTEGER NOT NULL,     -- end of the last ingested line
+    entry_count INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE entries (
+    file_id INTEGER NOT NULL,
+    idx INTEGER NOT NULL,        -- position among the file's entries
+    offset INTEGER NOT NULL,     -- byte offset of the line
+    uuid TEXT,
+    parent_uuid TEXT,
+    type TEXT,
+    role TEXT,
+    timestamp,                   -- as recorded: ISO string or epoch ms
+    PRIMARY KEY (file_id, idx)
+) WITHOUT ROWID;
+CREATE INDEX entries_uuid ON entries (uuid);
+CREATE TABLE tool_calls (
+    file_id INTEGER NOT NULL,
+    entry_idx INTEGER NOT NULL,
+    tool_use_id TEXT,
+    name TEXT NOT NULL,
+    input TEXT NOT NULL          -- JSON
+);
+CREATE INDEX tool_calls_id ON tool_calls (file_id, tool_use_id);
+CREATE INDEX tool_calls_name ON tool_calls (name);
+CREATE TABLE tool_results (
+    file_id INTEGER NOT NULL,
+    entry_idx INTEGER NOT NULL,
+    tool_use_id TEXT,
+    is_error INTEGER NOT NULL,
+    content TEXT                 -- JSON, kept for errors only
+);
+CREATE INDEX tool_results_id ON tool_results (file_id, tool_use_id);
+CREATE INDEX tool_results_errors ON tool_results (file_id) WHERE is_error;
+CREATE TABLE system_reminders (
+    file_id INTEGER NOT NULL,
+    entry_idx INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX system_reminders_file ON system_reminders (file_id);
+"""
+
+_FILE_TABLES = ("entries", "tool_calls", "tool_results", "system_reminders")
+
+
+def cache_dir() -> Path:
+    base = os.environ.get("AGENT_META_CACHE_DIR", "")
+    if not base:
+        xdg = os.environ.get("XDG_CACHE_HOME", "") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        base = os.path.join(xdg, "pickled-claude-plugins", "agent-meta")
+    return Path(base)
+
+
+def default_db_path() -> Path:
+    return cache_dir() / _DB_FILENAME
+
+
+@dataclass
+class UpdateStats:
+    files: int = 0
+    added: int = 0
+    unchanged: int = 0
+    appended: int = 0
+    reindexed: int = 0
+    entries: int = 0
+    pruned: int = 0
+
+
+class TranscriptIndex:
+    """The transcript database. Use as a context manager to close it."""
+
+    def __init__(self, db_path: Path | None = None):
+        self.db_path = db_path if db_path is not None else default_db_path()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != _SCHEMA_VERSION:
+            self.rebuild()
+
+    def __enter__(self) -> TranscriptIndex:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def rebuild(self) -> None:
+        """Drop everything; the next `update` re-ingests from scratch."""
+        with self.conn:
+            tables = [row[0] for row in self.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )]
+            for table in tables:
+                self.conn.execute(f"DROP TABLE {table}")
+            self.conn.executescript(_SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    # -- ingestion ---------------------------------------------------------
+
+    def update(self, jsonl_files: Iterable[Path]) -> UpdateStats:
+        """Bring the index up to date for `jsonl_files`."""
+        stats = UpdateStats()
+        for path in jsonl_files:
+            stats.files += 1
+            try:
+                self._update_file(path.resolve(), stats)
+            except OSError:
+                continue  # vanished or unreadable; try again next run
+        return stats
+
+    def prune(self) -> int:
+        """Forget indexed files that no longer exist. Returns how many."""
+        gone = [
+            (file_id,) for file_id, path in self.conn.execute("SELECT id, path FROM files")
+            if not os.path.exists(path)
+        ]
+        with self.conn:
+            for table in _FILE_TABLES:
+                self.conn.executemany(f"DELETE FROM {table} WHERE file_id = ?", gone)
+            self.conn.executemany("DELETE FROM files WHERE id = ?", gone)
+        return len(gone)
+
+    def _update_file(self, path: Path, stats: UpdateStats) -> None:
+        st = path.stat()
+        row = self.conn.execute(
+            "SELECT id, inode, size, mtime_ns, offset, entry_count FROM files WHERE path = ?",
+            (str(path),),
+        ).fetchone()
+        same_file = row is not None and row[1] == st.st_ino
+
+        if same_file and row[2] == st.st_size and row[3] == st.st_mtime_ns:
+            stats.unchanged += 1
+            return
+
+        with self.conn:
+            if same_file and row[4] <= st.st_size:
+                file_id, offset, entry_count = row[0], row[4], row[5]
+                stats.appended += 1
+            else:
+                if row is not None:
+                    self._forget(row[0])
+                    stats.reindexed += 1
+                else:
+                    stats.added += 1
+                file_id = self.conn.execute(
+                    "INSERT INTO files"
+                    " (path, inode, size, mtime_ns, offset, entry_count, indexed_at)"
+                    " VALUES (?, ?, 0, 0, 0, 0, 0)",
+                    (str(path), st.st_ino),
+                ).lastrowid
+                offset, entry_count = 0, 0
+
+            offset, added = self._ingest(file_id, path, offset, entry_count)
+            self.conn.execute(
+                "UPDATE files SET inode = ?, size = ?, mtime_ns = ?, offset = ?,"
+                " entry_count = entry_count + ?, indexed_at = ? WHERE id = ?",
+                (st.st_ino, st.st_size, st.st_mtime_ns, offset, added, time.time(), file_id),
+            )
+        stats.entries += added
+
+    def _forget(self, file_id: int) -> None:
+        for table in _FILE_TABLES:
+            self.conn.execute(f"DELETE FROM {table} WHERE file_id = ?", (file_id,))
+        self.conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _ingest(self, file_id: int, path: Path, offset: int, index: int) -> tuple[int, int]:
+        """Ingest lines from `offset`. Returns (new offset, entries added)."""
+        entries, calls, results, reminders = [], [], [], []
+        start_index = index
+
+        for line_offset, line in read_lines(path, offset):
+            raw = decode_entry(line)
+            if raw is None and not line.endswith(b"\n") and line.strip():
+                break  # partial line, still being written
+            offset = line_offset + len(line)
+            if raw is None:
+                continue
+
+            for event in entry_events(raw, index):
+                if isinstance(event, ToolUse):
+                    calls.append((file_id, index, event.id, event.name, json.dumps(event.input)))
+                elif isinstance(event, ToolResult):
+                    content = json.dumps(event.content) if event.is_error else None
+                    results.append((file_id, index, event.tool_use_id, event.is_error, content))
+                elif isinstance(event, SystemReminder):
+                    reminders.append((file_id, index, event.text))
+                elif isinstance(event, Entry):
+                    entries.append((
+                        file_id, index, line_offset, event.uuid, event.parent_uuid,
+                        event.type, event.role, _sql_value(event.timestamp),
+                    ))
+            index += 1
+
+        self.conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", entries)
+        self.conn.executemany("INSERT INTO tool_calls VALUES (?, ?, ?, ?, ?)", calls)
+        self.conn.executemany("INSERT INTO tool_results VALUES (?, ?, ?, ?, ?)", results)
+        self.conn.executemany("INSERT INTO system_reminders VALUES (?, ?, ?)", reminders)
+        return offset, index - start_index
+
+    # -- queries -----------------------------------------------------------
+
+    def file_id(self, path: Path) -> int | None:
+        row = self.conn.execute(
+            "SELECT id FROM files WHERE path = ?", (str(path.resolve()),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def entry_count(self, file_id: int) -> int:
+        return self.conn.execute(
+            "SELECT entry_count FROM files WHERE id = ?", (file_id,)
+        ).fetchone()[0]
+
+    def timestamps(self, file_id: int) -> list:
+        return [row[0] for row in self.conn.execute(
+            "SELECT timestamp FROM entries WHERE file_id = ? AND timestamp IS NOT NULL"
+            " ORDER BY idx",
+            (file_id,),
+        )]
+
+    def tool_calls(self, file_id: int) -> list[dict]:
+        """Tool calls in order, shaped like summarize-session's."""
+        rows = self.conn.execute(
+            "SELECT e.uuid, e.timestamp, c.name, c.input, c.tool_use_id"
+            " FROM tool_calls c JOIN entries e ON e.file_id = c.file_id AND e.idx = c.entry_idx"
+            " WHERE c.file_id = ? ORDER BY c.rowid",
+            (file_id,),
+        )
+        return [
+            {"uuid": uuid, "timestamp": ts, "name": name, "input": json.loads(inp), "id": tid}
+            for uuid, ts, name, inp, tid in rows
+        ]
+
+    def tool_results(self, file_id: int) -> dict[str, dict]:
+        """Results by tool_use_id (content for errors only); later ones win."""
+        rows = self.conn.execute(
+            "SELECT tool_use_id, is_error, content FROM tool_results"
+            " WHERE file_id = ? AND tool_use_id IS NOT NULL ORDER BY rowid",
+            (file_id,),
+        )
+        return {
+            tid: {"is_error": bool(is_error), "content": json.loads(content) if content else ""}
+            for tid, is_error, content in rows
+        }
+
+    def failures(self, file_id: int) -> list[dict]:
+        """Errored tool results, each with the latest earlier tool_use of its id.
+
+        An entry written more than once is reported in its first copy's
+        place but from its last copy, as a uuid → entry map would have it.
+        """
+        rows = self.conn.execute(
+            """
+            SELECT r.tool_use_id, r.content, e.idx, e.uuid, e.type,
+                   c.name, c.input, ce.uuid, ce.type
+            FROM tool_results r
+            JOIN entries e ON e.file_id = r.file_id AND e.idx = r.entry_idx
+            LEFT JOIN tool_calls c ON c.rowid = (
+                SELECT rowid FROM tool_calls
+                WHERE file_id = r.file_id AND tool_use_id = r.tool_use_id
+                  AND entry_idx < r.entry_idx
+                ORDER BY entry_idx DESC LIMIT 1
+            )
+            LEFT JOIN entries ce ON ce.file_id = c.file_id AND ce.idx = c.entry_idx
+            WHERE r.file_id = ? AND r.is_error AND e.uuid IS NOT NULL
+            ORDER BY r.rowid
+            """,
+            (file_id,),
+        )
+        # response uuid -> (index of its last copy, that copy's failures)
+        by_response: dict[str, tuple[int, list[dict]]] = {}
+        for tid, content, idx, uuid, etype, name, inp, req_uuid, req_type in rows:
+            copy_idx, failures = by_response.get(uuid, (None, None))
+            if copy_idx != idx:
+                failures = []
+                by_response[uuid] = (idx, failures)
+            found = name is not None
+            failures.append({
+                "request_uuid": req_uuid if found else "unknown",
+                "request_type": (req_type or "unknown") if found else "unknown",
+                "response_uuid": uuid,
+                "response_type": etype or "unknown",
+                "tool_use_id": tid or "unknown",
+                "tool_name": name if found else "unknown",
+                "tool_input": json.loads(inp) if found else {},
+                "error_content": json.loads(content),
+            })
+        return [failure for _, failures in by_response.values() for failure in failures]
+
+
+def _sql_value(value):
+    """SQLite stores str/int/float/None as-is; anything else as JSON."""
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return json.dumps(value)
+
+
+def open_index(jsonl_files: Iterable[Path], db_path: Path | None = None) -> TranscriptIndex:
+    """Open the index and bring it up to date for `jsonl_files`.
+
+    What the scripts' `--index` flag does: the refresh only reads what's new,
+    so querying stays correct without a separate `agent-meta index` run.
+    """
+    index = TranscriptIndex(db_path)
+    index.update(jsonl_files)
+    return index
@@ -0,0 +1,64 @@
+"""Normalize tool output into grouping keys, reading only as much as the key needs.
+
+Failures are grouped by their error text with the specifics masked out:
+paths become `<path>`, numbers `<n>`, and the result is cut to a fixed
+length. Error output can run to megabytes (a full test log, say) while the
+key only keeps its first 150 characters, so normalizing all of it before
+cutting is mostly wasted work.
+
+A `Normalizer` is a chain of compiled substitutions plus a length limit,
+and works through the text a chunk at a time until it has enough output.
+That's only the same as normalizing everything and then cutting if no
+substitution can reach across a chunk boundary, so every step's pattern
+must match only within a run of `token` characters, and its replacement
+must start and end with a non-token character (`<path>`, not `path`).
+Chunks are then cut where a token run ends, and each one normalizes on its
+own. Add steps with `then`.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterable
+
+
+class Normalizer:
+    """Substitutions applied in order, then a cut to `limit` characters.
+
+    Text is read in chunks of about `chunk` characters, stopping once
+    `limit` characters of output are in hand.
+    """
+
+    def __init__(
+        self,
+        steps: Iterable[tuple[str | re.Pattern[str], str]] = (),
+        limit: int = 150,
+        token: str = r"[\w/.-]",
+        chunk: int = 256,
+    ):
+        self.steps = [(re.compile(pattern), replacement) for pattern, replacement in steps]
+        self.limit = limit
+        self.token = token
+        self.chunk = chunk
+        self._boundary = re.compile(rf"(?!{token})")
+
+    def then(self, pattern: str | re.Pattern[str], replacement: str) -> Normalizer:
+        """A copy with one more substitution at the end of the chain."""
+        return Normalizer([*self.steps, (pattern, replacement)], self.limit, self.token, self.chunk)
+
+    def __call__(self, text: str) -> str:
+        """`text` with every step applied in turn, cut to `limit` characters."""
+        pieces = []
+        length = 0
+        start = 0
+        while start < len(text) and length < self.limit:
+            end = start + self.chunk
+            if end < len(text):
+                end = self._boundary.search(text, end).start()
+            piece = text[start:end]
+            for pattern, replacement in self.steps:
+                piece = pattern.sub(replacement, piece)
+            pieces.append(piece)
+            length += len(piece)
+            start = end
+        return "".join(pieces)[:self.limit]
@@ -0,0 +1,123 @@
+"""Fixed-memory counting for streams with too many distinct keys to hold.
+
+`CountMinSketch` estimates how often any key was seen, in a fixed-size
+table: estimates never undercount, and overcount by at most about
+`e / width` of the total with probability `1 - e**-depth`. `TopKCounter`
+uses one to keep just the heaviest keys (and a few details about each)
+while everything else is only counted in the sketch. Memory stays the same
+whether the stream has a thousand keys or a billion.
+
+Keys are hashed with BLAKE2b rather than `hash()`, which is salted per
+process, so the same stream gives the same estimates (and the same top keys)
+on every run.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+from array import array
+from typing import Any, Callable, Generic, Hashable, Iterator, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+
+
+class CountMinSketch:
+    """Approximate counts of byte-string keys; `depth` rows of `width` 64-bit counters."""
+
+    def __init__(self, width: int = 16384, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self._rows = [array("Q", bytes(8 * width)) for _ in range(depth)]
+
+    def _columns(self, key: bytes) -> Iterator[int]:
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for row in range(self.depth):
+            yield (h1 + row * h2) % self.width
+
+    def add(self, key: bytes, count: int = 1) -> int:
+        """Count `key` `count` more times; returns its new estimate."""
+        self.total += count
+        estimate = None
+        for row, column in zip(self._rows, self._columns(key)):
+            row[column] += count
+            if estimate is None or row[column] < estimate:
+                estimate = row[column]
+        return estimate
+
+    def estimate(self, key: bytes) -> int:
+        """How many times `key` was counted, or a little more; never less."""
+        return min(row[column] for row, column in zip(self._rows, self._columns(key)))
+
+
+class TopKCounter(Generic[K]):
+    """The (approximately) `capacity` most frequent keys of a stream.
+
+    Every key is counted in a `CountMinSketch`; only keys whose estimate is
+    among the largest keep an entry, holding the estimate and whatever
+    `details` the caller attached (examples, say). When a newcomer outranks
+    the smallest entry, that entry is evicted. Keep `capacity` a few times
+    the number of keys you'll report, so the ones that matter are settled
+    well inside it.
+    """
+
+    def __init__(self, capacity: int, key_bytes: Callable[[K], bytes], sketch: CountMinSketch | None = None):
+        self.capacity = capacity
+        self.sketch = sketch if sketch is not None else CountMinSketch()
+        self._key_bytes = key_bytes
+        self._counts: dict[K, int] = {}
+        self._details: dict[K, Any] = {}
+        # Min-heap of (count, sequence, key); stale when the count moved on.
+        self._heap: list[tuple[int, int, K]] = []
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._counts
+
+    def add(self, key: K, count: int = 1, new_details: Callable[[], Any] | None = None) -> Any:
+        """Count `key`; returns its details if it's (now) a top key, else None.
+
+        `new_details()` makes the details for a key entering the top; the
+        caller updates the returned object in place from then on.
+        """
+        estimate = self.sketch.add(self._key_bytes(key), count)
+
+        if key not in self._counts:
+            if len(self._counts) >= self.capacity:
+                floor, _, smallest = self._smallest()
+                if estimate <= floor:
+                    return None
+                del self._counts[smallest]
+                del self._details[smallest]
+            self._details[key] = new_details() if new_details else None
+
+        self._counts[key] = estimate
+        self._sequence += 1
+        heapq.heappush(self._heap, (estimate, self._sequence, key))
+        if len(self._heap) > 4 * self.capacity:
+            self._compact()
+        return self._details[key]
+
+    def items(self) -> list[tuple[K, int, Any]]:
+        """(key, estimated count, details) for the top keys, most frequent first."""
+        return sorted(
+            ((key, count, self._details[key]) for key, count in self._counts.items()),
+            key=lambda item: -item[1],
+        )
+
+    def _smallest(self) -> tuple[int, int, K]:
+        while True:
+            count, sequence, key = self._heap[0]
+            if self._counts.get(key) == count:
+                return count, sequence, key
+            heapq.heappop(self._heap)
+
+    def _compact(self) -> None:
+        self._heap = [(count, 0, key) for key, count in self._counts.items()]
+        heapq.heapify(self._heap)
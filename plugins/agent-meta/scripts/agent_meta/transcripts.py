@@ -0,0 +1,403 @@
+"""Streaming reader for Claude session transcripts (JSONL).
+
+A transcript is one JSON entry per line. Rather than loading every entry
+into memory, `read_events` walks the file once and yields small typed
+events as it goes:
+
+- `Entry` for every decoded line, before that line's other events
+- `ToolUse` / `ToolResult` for tool calls and their results
+- `Text` for plain text (string content, string items, `text` items)
+- `SystemReminder` for each `<system-reminder>` block in text or tool output
+
+Events hold only the fields the scripts use; the decoded line itself is
+dropped as soon as its events are out. Scripts keep whatever state their
+analysis needs and get by with one pass.
+
+Decoding dominates the cost of a scan, and most of each line (usage stats,
+`toolUseResult` copies of tool output, ...) is never looked at. When
+msgspec is installed, lines are decoded against a schema of just the fields
+the reader uses, and everything else is skipped without being built;
+failing that orjson is used, and failing that the stdlib. Set
+`AGENT_META_JSON=json` (or `orjson`) to force a backend.
+
+Cheaper still is not decoding a line at all. `read_events` takes a
+`prefilter` run on each raw line first: lines it rejects are skipped
+undecoded (though they still count toward `Entry.index`). Build one with
+`key_pattern`, which matches a key/value pair in raw JSON whatever the
+spacing, e.g. `key_pattern("is_error", "true").search`. When only a few
+lines matter, `mapped` and `line_matches` go further: search the whole
+memory-mapped file for them, and decode just those with `line_at`.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import re
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
+
+try:
+    import msgspec
+except ImportError:  # optional accelerator
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # optional accelerator
+    orjson = None
+
+ALLOWED_ROOT = Path.home() / ".claude" / "projects"
+
+_SYSTEM_REMINDER = re.compile(r"<system-reminder>(.*?)</system-reminder>", re.DOTALL)
+
+
+@dataclass(frozen=True, slots=True)
+class Entry:
+    """One transcript line: who said it, where it sits in the conversation."""
+
+    index: int
+    uuid: str | None
+    parent_uuid: str | None
+    type: str | None
+    role: str | None
+    timestamp: str | int | float | None
+
+
+@dataclass(frozen=True, slots=True)
+class ToolUse:
+    entry: Entry
+    id: str | None
+    name: str
+    input: dict
+
+
+@dataclass(frozen=True, slots=True)
+class ToolResult:
+    entry: Entry
+    tool_use_id: str | None
+    content: Any
+    is_error: bool
+
+
+@dataclass(frozen=True, slots=True)
+class Text:
+    entry: Entry
+    text: str
+
+
+@dataclass(frozen=True, slots=True)
+class SystemReminder:
+    entry: Entry
+    text: str
+
+
+Event = Union[Entry, ToolUse, ToolResult, Text, SystemReminder]
+
+Prefilter = Callable[[bytes], Any]
+
+
+@dataclass(slots=True)
+class ReadStats:
+    """Where a `read_events` pass got to: entries seen (and how many were
+    decoded), and the byte offset just past the last whole line read.
+
+    Pass one back to `read_events` to pick up from there.
+    """
+
+    entries: int = 0
+    decoded: int = 0
+    offset: int = 0
+
+    @property
+    def skipped(self) -> int:
+        return self.entries - self.decoded
+
+
+def is_allowed_path(path: Path) -> bool:
+    """Check if path is within ~/.claude/projects."""
+    try:
+        resolved = path.resolve()
+        return resolved.is_relative_to(ALLOWED_ROOT)
+    except (OSError, ValueError):
+        return False
+
+
+def collect_jsonl_files(paths: list[Path]) -> list[Path]:
+    """Expand paths to individual .jsonl files, filtering to allowed locations."""
+    jsonl_files = []
+
+    for path in paths:
+        if not path.exists():
+            print(f"Warning: Path not found: {path}", file=sys.stderr)
+            continue
+
+        if not is_allowed_path(path):
+            print(f"Warning: Skipping path outside ~/.claude/projects: {path}", file=sys.stderr)
+            continue
+
+        if path.is_file():
+            if path.suffix == ".jsonl":
+                jsonl_files.append(path)
+            else:
+                print(f"Warning: Skipping non-JSONL file: {path}", file=sys.stderr)
+        elif path.is_dir():
+            # Recursively find all .jsonl files
+            jsonl_files.extend(sorted(path.rglob("*.jsonl")))
+
+    return jsonl_files
+
+
+def read_lines(jsonl_path: Path, start: int = 0) -> Iterator[tuple[int, bytes]]:
+    """Yield (byte offset, raw line) for each line from byte `start` on."""
+    with open(jsonl_path, "rb") as f:
+        f.seek(start)
+        offset = start
+        for line in f:
+            yield offset, line
+            offset += len(line)
+
+
+@contextmanager
+def mapped(jsonl_path: Path) -> Iterator[mmap.mmap | bytes]:
+    """A transcript's bytes, memory-mapped read-only."""
+    with open(jsonl_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""  # empty files can't be mapped
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield buf
+
+
+def line_matches(
+    buf: mmap.mmap | bytes, pattern: re.Pattern[bytes], start: int = 0, end: int | None = None
+) -> Iterator[tuple[int, re.Match[bytes]]]:
+    """Yield (offset of its line, match) for each match of `pattern` in `buf[start:end]`.
+
+    The search runs over the whole buffer at C speed, so lines without a
+    match cost nothing.
+    """
+    for match in pattern.finditer(buf, start, len(buf) if end is None else end):
+        yield buf.rfind(b"\n", 0, match.start()) + 1, match
+
+
+def line_at(buf: mmap.mmap | bytes, offset: int) -> bytes:
+    """The raw line starting at byte `offset`."""
+    end = buf.find(b"\n", offset)
+    return buf[offset:] if end < 0 else buf[offset:end + 1]
+
+
+if msgspec is not None:
+
+    class _Message(msgspec.Struct):
+        role: Any = None
+        content: Any = None
+
+    class _Line(msgspec.Struct):
+        type: Any = None
+        uuid: Any = None
+        parentUuid: Any = None
+        timestamp: Any = None
+        message: Optional[_Message] = None
+
+    _line_decoder = msgspec.json.Decoder(_Line)
+
+    def _decode_msgspec(line: bytes) -> Any:
+        try:
+            raw = _line_decoder.decode(line)
+        except msgspec.ValidationError:
+            return json.loads(line)  # valid JSON, unexpected shape
+        message = raw.message
+        return {
+            "type": raw.type,
+            "uuid": raw.uuid,
+            "parentUuid": raw.parentUuid,
+            "timestamp": raw.timestamp,
+            "message": None if message is None else {
+                "role": message.role,
+                "content": message.content,
+            },
+        }
+
+
+def _select_decoder():
+    wanted = os.environ.get("AGENT_META_JSON", "")
+    if msgspec is not None and wanted in ("", "msgspec"):
+        return "msgspec", _decode_msgspec
+    if orjson is not None and wanted in ("", "msgspec", "orjson"):
+        return "orjson", orjson.loads
+    return "json", json.loads
+
+
+JSON_BACKEND, _fast_loads = _select_decoder()
+
+
+def decode_entry(line: bytes) -> dict | None:
+    """The entry on a raw line, or None for blank and malformed lines.
+
+    With an accelerated backend the dict holds only the fields the reader
+    uses (type, uuid, parentUuid, timestamp, message.role/content).
+    """
+    if not line.strip():
+        return None
+    try:
+        entry = _fast_loads(line)
+    except ValueError:
+        # The fast decoders are stricter than the stdlib (e.g. about lone
+        # surrogates); let it have the last word.
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return None
+    return entry if isinstance(entry, dict) else None
+
+
+def read_entries(jsonl_path: Path) -> Iterator[dict]:
+    """Yield decoded entries in file order, skipping blank and malformed lines."""
+    for _, line in read_lines(jsonl_path):
+        entry = decode_entry(line)
+        if entry is not None:
+            yield entry
+
+
+def key_pattern(key: str, value: str) -> re.Pattern[bytes]:
+    """Match `"key": value` in a raw line, `value` being JSON text like `true`.
+
+    Keys and values inside string content are escaped (`\\"key\\"`), so
+    they don't match.
+    """
+    return re.compile(
+        rb'"%s"\s*:\s*%s' % (re.escape(key.encode()), re.escape(value.encode()))
+    )
+
+
+def read_events(
+    jsonl_path: Path,
+    prefilter: Prefilter | None = None,
+    stats: ReadStats | None = None,
+    partial: bool = True,
+) -> Iterator[Event]:
+    """Yield the events of a transcript, in order, in a single pass.
+
+    With `stats`, reading starts at `stats.offset` and entries are numbered
+    on from `stats.entries`. With a `prefilter`, only lines it accepts are
+    decoded. A rejected line is taken to be a well-formed entry: it still
+    takes up an index, so indexes match an unfiltered read.
+
+    An unterminated last line may be mid-write. It's decoded anyway unless
+    `partial` is False, which resumable reads use so that `stats.offset`
+    never lands inside a line.
+    """
+    if stats is None:
+        stats = ReadStats()
+    for offset, line in read_lines(jsonl_path, stats.offset):
+        whole = line.endswith(b"\n")
+        if whole:
+            stats.offset = offset + len(line)
+        elif not partial:
+            break
+        if prefilter is not None and whole and not prefilter(line):
+            if not line.isspace():
+                stats.entries += 1
+            continue
+        raw = decode_entry(line)
+        if raw is None:
+            continue
+        stats.decoded += 1
+        yield from entry_events(raw, stats.entries)
+        stats.entries += 1
+
+
+def entry_events(raw: dict, index: int) -> Iterator[Event]:
+    """The events of one decoded entry: its `Entry`, then its content."""
+    message = raw.get("message")
+    if not isinstance(message, dict):
+        message = {}
+    entry = Entry(
+        index=index,
+        uuid=raw.get("uuid"),
+        parent_uuid=raw.get("parentUuid"),
+        type=raw.get("type"),
+        role=message.get("role"),
+        timestamp=raw.get("timestamp"),
+    )
+    yield entry
+
+    content = message.get("content")
+    if isinstance(content, str):
+        yield from _text_events(entry, content)
+        return
+    if not isinstance(content, list):
+        return
+
+    for item in content:
+        if isinstance(item, str):
+            yield from _text_events(entry, item)
+        elif not isinstance(item, dict):
+            continue
+        elif item.get("type") == "tool_use":
+            yield ToolUse(
+                entry=entry,
+                id=item.get("id"),
+                name=item.get("name", "unknown"),
+                input=item.get("input", {}),
+            )
+        elif item.get("type") == "tool_result" or item.get("tool_use_id"):
+            result = item.get("content", "")
+            yield ToolResult(
+                entry=entry,
+                tool_use_id=item.get("tool_use_id"),
+                content=result,
+                is_error=item.get("is_error") is True,
+            )
+            if isinstance(result, str):
+                yield from _reminder_events(entry, result)
+        elif item.get("type") == "text":
+            yield from _text_events(entry, item.get("text", ""))
+
+
+def _text_events(entry: Entry, text: str) -> Iterator[Event]:
+    yield Text(entry=entry, text=text)
+    yield from _reminder_events(entry, text)
+
+
+def _reminder_events(entry: Entry, text: str) -> Iterator[SystemReminder]:
+    if "<system-reminder>" not in text:
+        return
+    for match in _SYSTEM_REMINDER.finditer(text):
+        yield SystemReminder(entry=entry, text=match.group(1))
+
+
+def by_entry(events: Iterable[Event]) -> Iterator[tuple[Entry, list[Event]]]:
+    """Group a stream of events per entry: (entry, that entry's content events).
+
+    Only one entry's events are held at a time.
+    """
+    for _, group in groupby(events, key=_entry_index):
+        group = list(group)
+        entry = _entry_of(group[0])
+        yield entry, [event for event in group if not isinstance(event, Entry)]
+
+
+def _entry_of(event: Event) -> Entry:
+    return event if isinstance(event, Entry) else event.entry
+
+
+def _entry_index(event: Event) -> int:
+    return _entry_of(event).index
+
+
+def entry_text(events: Iterable[Event]) -> str:
+    """All text of an entry's events: text plus string tool output, in order."""
+    texts = []
+    for event in events:
+        if isinstance(event, Text):
+            texts.append(event.text)
+        elif isinstance(event, ToolResult) and isinstance(event.content, str):
+            texts.append(event.content)
+    return "\n".join(texts)
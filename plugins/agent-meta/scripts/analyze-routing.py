@@ -15,9 +15,20 @@ import sys
 from collections import defaultdict
 from pathlib import Path
 
-signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+from agent_meta.checkpoint import Checkpoints, add_since_last_argument, map_since_last
+from agent_meta.fanout import add_jobs_argument, map_files
+from agent_meta.transcripts import (
+    Entry,
+    ReadStats,
+    ToolUse,
+    by_entry,
+    collect_jsonl_files,
+    entry_text,
+    key_pattern,
+    read_events,
+)
 
-ALLOWED_ROOT = Path.home() / ".claude" / "projects"
+signal.signal(signal.SIGPIPE, signal.SIG_DFL)
 
 # Patterns for tool-routing suggestions
 SUGGESTION_PATTERNS = [
@@ -31,169 +42,89 @@ SUGGESTION_PATTERNS = [
     r"tool-routing.*?suggests?\s+(\w+)",
 ]
 
+# Each suggestion pattern above starts with one of these
+SUGGESTION_WORDS = (b"suggestion", b"consider using", b"prefer", b"tool-routing")
 
-def is_allowed_path(path: Path) -> bool:
-    """Check if path is within ~/.claude/projects."""
-    try:
-        resolved = path.resolve()
-        return resolved.is_relative_to(ALLOWED_ROOT)
-    except (OSError, ValueError):
-        return False
-
-
-def collect_jsonl_files(paths: list[Path]) -> list[Path]:
-    """Expand paths to individual .jsonl files, filtering to allowed locations."""
-    jsonl_files = []
-
-    for path in paths:
-        if not path.exists():
-            print(f"Warning: Path not found: {path}", file=sys.stderr)
-            continue
-
-        if not is_allowed_path(path):
-            print(f"Warning: Skipping path outside ~/.claude/projects: {path}", file=sys.stderr)
-            continue
-
-        if path.is_file():
-            if path.suffix == ".jsonl":
-                jsonl_files.append(path)
-            else:
-                print(f"Warning: Skipping non-JSONL file: {path}", file=sys.stderr)
-        elif path.is_dir():
-            jsonl_files.extend(sorted(path.rglob("*.jsonl")))
-
-    return jsonl_files
-
-
-def parse_session(jsonl_path: Path) -> list[dict]:
-    """Parse JSONL file and return entries in order."""
-    entries = []
-
-    with open(jsonl_path) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-
-            try:
-                entry = json.loads(line)
-                entries.append(entry)
-            except json.JSONDecodeError:
-                continue
-
-    return entries
-
+_TOOL_USE = key_pattern("type", '"tool_use"')
 
-def extract_text_content(entry: dict) -> str:
-    """Extract all text content from an entry."""
-    message = entry.get("message", {})
-    content = message.get("content", [])
 
-    texts = []
+def is_routing_line(line: bytes) -> bool:
+    """Whether a raw line can matter: it makes a tool call or may hold a suggestion."""
+    lowered = line.lower()
+    return any(word in lowered for word in SUGGESTION_WORDS) or bool(_TOOL_USE.search(line))
 
-    if isinstance(content, str):
-        texts.append(content)
-    elif isinstance(content, list):
-        for item in content:
-            if isinstance(item, str):
-                texts.append(item)
-            elif isinstance(item, dict):
-                if item.get("type") == "text":
-                    texts.append(item.get("text", ""))
-                elif item.get("type") == "tool_result":
-                    result_content = item.get("content", "")
-                    if isinstance(result_content, str):
-                        texts.append(result_content)
 
-    return "\n".join(texts)
-
-
-def extract_tool_calls(entries: list[dict]) -> list[dict]:
-    """Extract all tool calls with their entry index."""
-    tool_calls = []
-
-    for i, entry in enumerate(entries):
-        message = entry.get("message", {})
-        content = message.get("content", [])
-
-        if not isinstance(content, list):
-            continue
-
-        for item in content:
-            if isinstance(item, dict) and item.get("type") == "tool_use":
-                tool_calls.append({
-                    "index": i,
-                    "uuid": entry.get("uuid"),
-                    "name": item.get("name", "unknown"),
-                    "input": item.get("input", {}),
-                    "id": item.get("id"),
-                })
+def find_suggestions(entry: Entry, text: str) -> list[dict]:
+    """Find tool-routing suggestions in one entry's text."""
+    suggestions = []
 
-    return tool_calls
+    for pattern in SUGGESTION_PATTERNS:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            groups = match.groups()
 
+            suggestion = {
+                "index": entry.index,
+                "uuid": entry.uuid,
+                "match_text": match.group(),
+                "suggested_tool": groups[0] if groups else None,
+                "instead_of": groups[1] if len(groups) > 1 else None,
+            }
+            suggestions.append(suggestion)
 
-def find_suggestions(entries: list[dict]) -> list[dict]:
-    """Find tool-routing suggestions in session entries."""
-    suggestions = []
-
-    for i, entry in enumerate(entries):
-        text = extract_text_content(entry)
-        if not text:
-            continue
+    return suggestions
 
-        for pattern in SUGGESTION_PATTERNS:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                groups = match.groups()
 
-                suggestion = {
-                    "index": i,
-                    "uuid": entry.get("uuid"),
-                    "match_text": match.group(),
-                    "suggested_tool": groups[0] if groups else None,
-                    "instead_of": groups[1] if len(groups) > 1 else None,
-                }
-                suggestions.append(suggestion)
+def resolve_outcome(suggestion: dict, next_tool: str | None) -> dict:
+    """Classify a suggestion by the first tool called after it."""
+    suggested_tool = suggestion["suggested_tool"]
+    instead_of = suggestion["instead_of"]
 
-    return suggestions
+    if next_tool is None:
+        outcome = "no_subsequent_call"
+    elif suggested_tool and next_tool.lower() == suggested_tool.lower():
+        outcome = "followed"
+    elif instead_of and next_tool.lower() == instead_of.lower():
+        outcome = "ignored"
+    else:
+        outcome = "different_tool"
 
+    return {
+        **suggestion,
+        "outcome": outcome,
+        "next_tool": next_tool,
+    }
 
-def analyze_suggestion_outcomes(
-    suggestions: list[dict],
-    tool_calls: list[dict],
-    entries: list[dict]
-) -> list[dict]:
-    """Analyze whether suggestions were followed."""
-    analyzed = []
 
-    for suggestion in suggestions:
-        suggestion_idx = suggestion["index"]
-        suggested_tool = suggestion["suggested_tool"]
-        instead_of = suggestion["instead_of"]
+def analyze_suggestions(jsonl_path: Path, stats: ReadStats | None = None, session: dict | None = None) -> dict:
+    """Stream a JSONL file once: entry count, tool call count, analyzed suggestions.
 
-        # Find the next tool call after this suggestion
-        next_calls = [tc for tc in tool_calls if tc["index"] > suggestion_idx]
+    Suggestions wait in `pending` until the next entry with a tool call
+    settles them, so only unresolved suggestions are held. Lines with
+    neither a tool call nor suggestion wording are counted, not decoded.
+    Given `stats` and the `session` read up to there, reads on and adds to it.
+    """
+    partial = stats is None
+    if stats is None:
+        stats = ReadStats()
+    if session is None:
+        session = {"entry_count": 0, "tool_call_count": 0, "analyzed": [], "pending": []}
+    analyzed = session["analyzed"]
+    pending = session["pending"]
 
-        if not next_calls:
-            outcome = "no_subsequent_call"
-            next_tool = None
-        else:
-            next_call = next_calls[0]
-            next_tool = next_call["name"]
+    for entry, events in by_entry(read_events(jsonl_path, is_routing_line, stats, partial)):
+        tool_uses = [e for e in events if isinstance(e, ToolUse)]
+        session["tool_call_count"] += len(tool_uses)
 
-            if suggested_tool and next_tool.lower() == suggested_tool.lower():
-                outcome = "followed"
-            elif instead_of and next_tool.lower() == instead_of.lower():
-                outcome = "ignored"
-            else:
-                outcome = "different_tool"
+        if tool_uses and pending:
+            analyzed.extend(resolve_outcome(s, tool_uses[0].name) for s in pending)
+            pending.clear()
 
-        analyzed.append({
-            **suggestion,
-            "outcome": outcome,
-            "next_tool": next_tool,
-        })
+        text = entry_text(events)
+        if text:
+            pending.extend(find_suggestions(entry, text))
 
-    return analyzed
+    session["entry_count"] = stats.entries
+    return session
 
 
 def aggregate_outcomes(analyzed: list[dict]) -> dict:
@@ -222,18 +153,17 @@ def aggregate_outcomes(analyzed: list[dict]) -> dict:
     }
 
 
-def analyze_routing(jsonl_path: Path) -> dict:
-    """Analyze tool-routing for a session."""
-    entries = parse_session(jsonl_path)
-    tool_calls = extract_tool_calls(entries)
-    suggestions = find_suggestions(entries)
-    analyzed = analyze_suggestion_outcomes(suggestions, tool_calls, entries)
+def analyze_routing(jsonl_path: Path, checkpoints: Checkpoints | None = None) -> dict:
+    """Analyze tool-routing for a session, picking up from checkpoints if given."""
+    session = checkpoints.advance(jsonl_path, analyze_suggestions) if checkpoints else analyze_suggestions(jsonl_path)
+    # Suggestions still pending at the end of the session had no call after them.
+    analyzed = session["analyzed"] + [resolve_outcome(s, None) for s in session["pending"]]
     summary = aggregate_outcomes(analyzed)
 
     return {
         "file_path": str(jsonl_path.resolve()),
-        "entry_count": len(entries),
-        "tool_call_count": len(tool_calls),
+        "entry_count": session["entry_count"],
+        "tool_call_count": session["tool_call_count"],
         "summary": summary,
         "suggestions": analyzed,
     }
@@ -304,6 +234,8 @@ def main():
         action="store_true",
         help="Output results as JSON",
     )
+    add_since_last_argument(parser)
+    add_jobs_argument(parser)
     args = parser.parse_args()
 
     jsonl_files = collect_jsonl_files(args.paths)
@@ -312,8 +244,11 @@ def main():
         print("No valid JSONL files found.", file=sys.stderr)
         sys.exit(1)
 
-    for jsonl_file in jsonl_files:
-        result = analyze_routing(jsonl_file)
+    if args.since_last:
+        results = map_since_last(analyze_routing, jsonl_files, "analyze-routing")
+    else:
+        results = map_files(analyze_routing, jsonl_files, args.jobs)
+    for jsonl_file, result in zip(jsonl_files, results):
 
         if args.json:
             print(json.dumps(result))
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Benchmark find-failures' tool_use lookup against the old parent-chain walk.
+
+The baseline below is the pre-streaming implementation (whole file parsed
+into a uuid → entry dict, then a parentUuid walk per error, scanning each
+ancestor's content), kept here verbatim so the comparison stays honest as
+find-failures.py evolves.
+
+Usage:
+    python3 scripts/bench-find-failures.py [TRANSCRIPT] [-n N] [--repeat R]
+
+Without TRANSCRIPT, a synthetic session of N (default 50k) entries is
+generated: a long main chain with failing tool calls, plus subagent
+sidechains whose results are recorded against the main chain (so the
+baseline's walk for them runs all the way back to the root) and which
+replay tool_use ids from the main chain. Each implementation's best of R
+interleaved runs is reported, with how many failures each resolved.
+"""
+import argparse
+import importlib.util
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS))
+
+# --- baseline: the parent-chain walk this replaced ----------------------------
+
+
+def baseline_parse_session(jsonl_path):
+    entries = {}
+    with open(jsonl_path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            uuid = entry.get("uuid")
+            if uuid:
+                entries[uuid] = entry
+    return entries
+
+
+def baseline_find_tool_use(entries, tool_use_id, start_uuid):
+    current_uuid = entries.get(start_uuid, {}).get("parentUuid")
+    while current_uuid:
+        entry = entries.get(current_uuid)
+        if not entry:
+            break
+        message = entry.get("message", {})
+        content = message.get("content", [])
+        if isinstance(content, list):
+            for item in content:
+                if isinstance(item, dict) and item.get("type") == "tool_use":
+                    if item.get("id") == tool_use_id:
+                        return {
+                            "uuid": current_uuid,
+                            "type": entry.get("type", "unknown"),
+                            "name": item.get("name", "unknown"),
+                            "input": item.get("input", {}),
+                        }
+        current_uuid = entry.get("parentUuid")
+    return None
+
+
+def baseline_find_failures(jsonl_path):
+    entries = baseline_parse_session(jsonl_path)
+    failures = []
+    for entry in entries.values():
+        content = entry.get("message", {}).get("content", [])
+        if not isinstance(content, list):
+            continue
+        for item in content:
+            if isinstance(item, dict) and item.get("is_error") is True:
+                tool_use_id = item.get("tool_use_id", "unknown")
+                tool_use = baseline_find_tool_use(entries, tool_use_id, entry.get("uuid", ""))
+                failures.append({
+                    "tool_use_id": tool_use_id,
+                    "tool_name": tool_use["name"] if tool_use else "unknown",
+                })
+    return failures
+
+
+# --- synthetic transcript -----------------------------------------------------
+
+
+def write_synthetic(path, n, seed=0):
+    rng = random.Random(seed)
+    counter = iter(range(10**9))
+    main_parent = None
+    main_tool_ids = []
+    written = 0
+
+    def uid():
+        return f"u{next(counter)}"
+
+    with open(path, "w") as f:
+        def emit(entry):
+            nonlocal written
+            f.write(json.dumps(entry) + "\n")
+            written += 1
+
+        while written < n:
+            sidechain = rng.random() < 0.05
+            tool_id = f"toolu_{next(counter)}"
+            if sidechain and main_tool_ids and rng.random() < 0.1:
+                tool_id = rng.choice(main_tool_ids)  # replayed into the subagent
+            use_uuid = uid()
+            emit({
+                "type": "assistant", "uuid": use_uuid,
+                "parentUuid": None if sidechain else main_parent,
+                "isSidechain": sidechain,
+                "message": {"role": "assistant", "content": [
+                    {"type": "text", "text": "Running it."},
+                    {"type": "tool_use", "id": tool_id, "name": "Bash",
+                     "input": {"command": f"make target-{rng.randint(1, 500)}"}},
+                ]},
+            })
+            if not sidechain:
+                main_parent = use_uuid
+                main_tool_ids.append(tool_id)
+            is_error = rng.random() < 0.08 or sidechain
+            result = {"type": "tool_result", "tool_use_id": tool_id,
+                      "content": "Exit code 2\nmake: *** No rule" if is_error else "ok\n" * 20}
+            if is_error:
+                result["is_error"] = True
+            result_uuid = uid()
+            # Subagent results land on the main chain, away from their tool_use.
+            emit({
+                "type": "user", "uuid": result_uuid, "parentUuid": main_parent,
+                "message": {"role": "user", "content": [result]},
+            })
+            main_parent = result_uuid
+
+
+def load_find_failures():
+    spec = importlib.util.spec_from_file_location("find_failures", SCRIPTS / "find-failures.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.find_failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("transcript", nargs="?", type=Path)
+    parser.add_argument("-n", type=int, default=50_000, help="synthetic entries (default: 50000)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    find_failures = load_find_failures()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.transcript
+        if path is None:
+            path = Path(tmp) / "synthetic.jsonl"
+            write_synthetic(path, args.n)
+        size_mb = path.stat().st_size / 1e6
+
+        impls = {"baseline (parent walk)": baseline_find_failures, "find-failures.py": find_failures}
+        best = {name: float("inf") for name in impls}
+        resolved = {}
+        for _ in range(args.repeat):
+            for name, func in impls.items():
+                start = time.perf_counter()
+                failures = func(path)
+                best[name] = min(best[name], time.perf_counter() - start)
+                resolved[name] = (sum(f["tool_name"] != "unknown" for f in failures), len(failures))
+
+    print(f"{path.name}: {size_mb:.1f} MB")
+    for name in impls:
+        found, total = resolved[name]
+        print(f"  {name:<24} {best[name]:8.3f}s  resolved {found}/{total} failures")
+
+
+if __name__ == "__main__":
+    main()
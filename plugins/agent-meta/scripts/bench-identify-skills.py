@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Benchmark identify-skills' failure grouping and misuse matching against the old regexes.
+
+The baselines below are the pre-`Normalizer` implementations (two uncompiled
+`re.sub`s over the whole error, then a cut to 150 characters; one
+`re.search` per misuse pattern per Bash command), kept here verbatim so the
+comparison stays honest as identify-skills.py evolves.
+
+Usage:
+    python3 scripts/bench-identify-skills.py [TRANSCRIPT ...] [-n N] [--repeat R]
+
+Transcripts are read once up front, so only grouping and matching are
+timed. Without any, a synthetic failure-heavy session of N (default 20k)
+tool calls is used: mostly Bash, a third of them failing, with errors from
+one-liners up to test logs of tens of KB full of paths and line numbers.
+Each implementation's best of R interleaved runs is reported, and results
+are checked to be identical.
+"""
+import argparse
+import importlib.util
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+SCRIPTS = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS))
+
+# --- baseline: the per-call regexes this replaced -----------------------------
+
+
+def baseline_find_repeated_failures(tool_calls):
+    failure_patterns = defaultdict(list)
+
+    for call in tool_calls:
+        if not call["is_error"]:
+            continue
+
+        result = call["result"] or ""
+
+        # Normalize error message for grouping
+        # Remove specific paths, numbers, etc.
+        normalized = re.sub(r"/[\w/.-]+", "<path>", result)
+        normalized = re.sub(r"\d+", "<n>", normalized)
+        normalized = normalized[:150]  # Truncate for grouping
+
+        key = (call["name"], normalized)
+        failure_patterns[key].append(call)
+
+    candidates = []
+    for (tool_name, error_pattern), calls in failure_patterns.items():
+        if len(calls) >= 2:
+            candidates.append({
+                "type": "repeated_failure",
+                "confidence": "high" if len(calls) >= 3 else "medium",
+                "tool": tool_name,
+                "pattern": error_pattern,
+                "count": len(calls),
+                "suggestion": f"Hook to prevent {tool_name} failures matching this pattern",
+                "examples": [c["result"][:100] for c in calls[:3]],
+            })
+
+    return sorted(candidates, key=lambda x: x["count"], reverse=True)
+
+
+def baseline_find_tool_misuse(tool_calls):
+    candidates = []
+
+    # Look for Bash calls that could have used native tools
+    bash_patterns = {
+        r"\bcat\s+": ("Read", "Use Read tool instead of cat"),
+        r"\bhead\s+": ("Read", "Use Read tool with limit instead of head"),
+        r"\btail\s+": ("Read", "Use Read tool with offset instead of tail"),
+        r"\bgrep\s+": ("Grep", "Use Grep tool instead of grep/rg"),
+        r"\brg\s+": ("Grep", "Use Grep tool instead of rg"),
+        r"\bfind\s+": ("Glob", "Use Glob tool instead of find"),
+        r"\bls\s+.*\*": ("Glob", "Use Glob tool instead of ls with wildcards"),
+    }
+
+    misuse_counts = defaultdict(int)
+
+    for call in tool_calls:
+        if call["name"] != "Bash":
+            continue
+
+        command = call["input"].get("command", "")
+        for pattern, (better_tool, suggestion) in bash_patterns.items():
+            if re.search(pattern, command):
+                misuse_counts[(pattern, better_tool, suggestion)] += 1
+
+    for (pattern, better_tool, suggestion), count in misuse_counts.items():
+        if count >= 2:
+            candidates.append({
+                "type": "tool_misuse",
+                "confidence": "medium",
+                "pattern": pattern,
+                "better_tool": better_tool,
+                "count": count,
+                "suggestion": suggestion,
+            })
+
+    return sorted(candidates, key=lambda x: x["count"], reverse=True)
+
+
+# --- synthetic session ------------------------------------------------------------
+
+COMMANDS = [
+    "cat {path}",
+    "head -n {n} {path} | grep -n error",
+    "tail -f {path}",
+    "rg -n 'def main' src/ && find . -name '*.py' | head -{n}",
+    "ls -la src/*.py",
+    "cd {dir} && make test-{n}",
+    "git status && git diff --stat",
+    "python -m pytest tests/test_{n}.py -x -q 2>&1 | tail -{n}",
+    "npm run build -- --filter=pkg-{n}",
+    "for f in {dir}/*; do echo \"$f\"; done",
+]
+
+
+def synthetic_error(rng):
+    kind = rng.random()
+    path = f"/home/dev/src/project/module_{rng.randint(1, 40)}/file_{rng.randint(1, 300)}.py"
+    if kind < 0.4:
+        return rng.choice([
+            f"Exit code {rng.randint(1, 2)}\nmake: *** No rule to make target 'test-{rng.randint(1, 500)}'.",
+            f"Error: ENOENT: no such file or directory, open '{path}'",
+            f"cat: {path}: No such file or directory",
+            f"<tool_use_error>File has not been read yet. Read it first before writing to it.</tool_use_error>",
+        ])
+    lines = [f"Exit code 1\n============================= test session starts =============================="]
+    for _ in range(rng.randint(20, 600 if kind > 0.9 else 120)):
+        lines.append(
+            f"{path}:{rng.randint(1, 2000)}: in test_case_{rng.randint(1, 999)}\n"
+            f"    assert result == {rng.randint(0, 10**6)}, f\"got {{result}}\"\n"
+            f"E   AssertionError: expected {rng.randint(0, 10**6)} at /tmp/pytest-of-dev/pytest-{rng.randint(1, 99)}/out"
+        )
+    return "\n".join(lines)
+
+
+def synthetic_tool_calls(n, seed=0):
+    rng = random.Random(seed)
+    calls = []
+    for i in range(n):
+        name = rng.choice(["Bash"] * 6 + ["Read", "Edit", "Write", "Grep"])
+        command = rng.choice(COMMANDS).format(
+            path=f"src/module_{rng.randint(1, 40)}/file.py", n=rng.randint(1, 500), dir=f"pkg/{rng.randint(1, 9)}"
+        )
+        is_error = rng.random() < 0.35
+        calls.append({
+            "uuid": f"u{i}",
+            "name": name,
+            "input": {"command": command} if name == "Bash" else {"file_path": "src/x.py"},
+            "result": synthetic_error(rng) if is_error else None,
+            "is_error": is_error,
+        })
+    return calls
+
+
+def load_identify_skills():
+    spec = importlib.util.spec_from_file_location("identify_skills", SCRIPTS / "identify-skills.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("transcripts", nargs="*", type=Path)
+    parser.add_argument("-n", type=int, default=20_000, help="synthetic tool calls (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    identify_skills = load_identify_skills()
+    if args.transcripts:
+        tool_calls = [
+            call
+            for path in args.transcripts
+            for _, call in identify_skills.read_session(path)["tool_calls"]
+        ]
+        source = f"{len(args.transcripts)} transcript(s)"
+    else:
+        tool_calls = synthetic_tool_calls(args.n)
+        source = "synthetic session"
+
+    failed = [call for call in tool_calls if call["is_error"]]
+    error_mb = sum(len(str(call["result"] or "")) for call in failed) / 1e6
+    print(f"{source}: {len(tool_calls)} tool calls, {len(failed)} failed ({error_mb:.1f} MB of errors)")
+
+    benchmarks = {
+        "find_repeated_failures": (baseline_find_repeated_failures, identify_skills.find_repeated_failures),
+        "find_tool_misuse": (baseline_find_tool_misuse, identify_skills.find_tool_misuse),
+    }
+    for name, (baseline, current) in benchmarks.items():
+        best = {"baseline": float("inf"), "identify-skills.py": float("inf")}
+        results = {}
+        for _ in range(args.repeat):
+            for label, func in (("baseline", baseline), ("identify-skills.py", current)):
+                start = time.perf_counter()
+                results[label] = func(tool_calls)
+                best[label] = min(best[label], time.perf_counter() - start)
+        same = "identical" if results["baseline"] == results["identify-skills.py"] else "DIFFERENT"
+        print(f"  {name}  ({same} results)")
+        for label, seconds in best.items():
+            print(f"    {label:<20} {seconds:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
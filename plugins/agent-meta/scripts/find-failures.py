@@ -3,131 +3,213 @@
 
 import argparse
 import json
+import re
 import signal
 import sys
 from pathlib import Path
+from typing import NamedTuple
+
+from agent_meta.checkpoint import Checkpoints, add_since_last_argument, map_since_last
+from agent_meta.fanout import add_jobs_argument, map_files
+from agent_meta.index import TranscriptIndex, open_index
+from agent_meta.transcripts import (
+    Entry,
+    Event,
+    ReadStats,
+    ToolResult,
+    ToolUse,
+    by_entry,
+    collect_jsonl_files,
+    decode_entry,
+    entry_events,
+    key_pattern,
+    line_at,
+    line_matches,
+    mapped,
+    read_events,
+)
 
 # Handle broken pipe gracefully (e.g., when piping to `less` and quitting early)
 signal.signal(signal.SIGPIPE, signal.SIG_DFL)
 
-ALLOWED_ROOT = Path.home() / ".claude" / "projects"
-
-
-def is_allowed_path(path: Path) -> bool:
-    """Check if path is within ~/.claude/projects."""
-    try:
-        resolved = path.resolve()
-        return resolved.is_relative_to(ALLOWED_ROOT)
-    except (OSError, ValueError):
-        return False
-
-
-def collect_jsonl_files(paths: list[Path]) -> list[Path]:
-    """Expand paths to individual .jsonl files, filtering to allowed locations."""
-    jsonl_files = []
-
-    for path in paths:
-        if not path.exists():
-            print(f"Warning: Path not found: {path}", file=sys.stderr)
-            continue
-
-        if not is_allowed_path(path):
-            print(f"Warning: Skipping path outside ~/.claude/projects: {path}", file=sys.stderr)
-            continue
-
-        if path.is_file():
-            if path.suffix == ".jsonl":
-                jsonl_files.append(path)
-            else:
-                print(f"Warning: Skipping non-JSONL file: {path}", file=sys.stderr)
-        elif path.is_dir():
-            # Recursively find all .jsonl files
-            jsonl_files.extend(sorted(path.rglob("*.jsonl")))
-
-    return jsonl_files
-
-
-def parse_session(jsonl_path: Path) -> dict[str, dict]:
-    """Parse JSONL file and return entries indexed by UUID."""
-    entries = {}
-
-    with open(jsonl_path) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-
-            uuid = entry.get("uuid")
-            if uuid:
-                entries[uuid] = entry
+_ERROR_RESULT = key_pattern("is_error", "true")
+_ID = re.compile(rb'"id"\s*:\s*"([^"\\]*)"')
+
+
+class ToolUseSite(NamedTuple):
+    """A tool_use and the entry it was made in."""
+
+    uuid: str
+    type: str
+    tool_use: ToolUse
+
+
+def find_tool_use(
+    sites: list[ToolUseSite] | None, parents: dict[str, str | None], start_uuid: str
+) -> dict | None:
+    """The tool_use a result answers, from the entries that made its id.
+
+    Normally an id is made exactly once, so this is a lookup. When it shows
+    up in several entries (a subagent sidechain replaying its parent's
+    history, say), walk the result's parent chain to pick the one it
+    descends from, falling back to the latest.
+    """
+    if not sites:
+        return None
+
+    site = sites[-1]
+    if len(sites) > 1:
+        by_uuid = {s.uuid: s for s in sites}
+        current_uuid = parents.get(start_uuid)
+        while current_uuid:
+            if current_uuid in by_uuid:
+                site = by_uuid[current_uuid]
+                break
+            current_uuid = parents.get(current_uuid)
+
+    return {
+        "uuid": site.uuid,
+        "type": site.type,
+        "name": site.tool_use.name,
+        "input": site.tool_use.input,
+    }
+
+
+def find_failures(jsonl_path: Path, stats: ReadStats | None = None, failures: list[dict] | None = None) -> list[dict]:
+    """Extract failed tool calls, decoding only the lines that matter.
+
+    Errors are rare, so rather than decoding the whole session, search the
+    mapped file for error results (`"is_error": true`) and for the lines
+    that made their tool_use ids, and decode just those. If an id was made
+    more than once, picking the right one needs parent links, so the file
+    is read in full instead.
+
+    Given `stats` and the `failures` found up to there, only the whole lines
+    after `stats.offset` are searched for errors, and what they add is
+    appended to `failures`.
+
+    An entry line written more than once is reported once, in its first
+    copy's place but from its last copy, as a uuid → entry map would have
+    it. (A copy in a later run than the first is left out.)
+    """
+    failures = [] if failures is None else failures
+    reported = {failure["response_uuid"] for failure in failures}
+    with mapped(jsonl_path) as buf:
+        start = stats.offset if stats else 0
+        end = len(buf) if stats is None else buf.rfind(b"\n") + 1
+        if stats is not None:
+            stats.offset = max(start, end)
+
+        # response uuid -> (offset of its last copy, that copy's error results)
+        error_lines: dict[str, tuple[int, list[ToolResult]]] = {}
+        for offset in _line_offsets(buf, _ERROR_RESULT, start, end):
+            results = [
+                event for event in _line_events(buf, offset)
+                if isinstance(event, ToolResult) and event.is_error and event.entry.uuid
+            ]
+            if results and results[0].entry.uuid not in reported:
+                error_lines[results[0].entry.uuid] = (offset, results)
+        errors = [(offset, event) for offset, results in error_lines.values() for event in results]
+        if not errors:
+            return failures
+
+        wanted = {(event.tool_use_id or "unknown").encode() for _, event in errors}
+        made_at: dict[str, list[tuple[int, ToolUseSite]]] = {}
+        for offset in _line_offsets(buf, _ID, 0, end, lambda match: match.group(1) in wanted):
+            for event in _line_events(buf, offset):
+                if isinstance(event, ToolUse) and event.entry.uuid:
+                    site = ToolUseSite(event.entry.uuid, event.entry.type or "unknown", event)
+                    made_at.setdefault(event.id, []).append((offset, site))
+
+    file_path = str(jsonl_path.resolve())
+    new_failures = []
+    for offset, event in errors:
+        tool_use_id = event.tool_use_id or "unknown"
+        sites = [site for made, site in made_at.get(tool_use_id, []) if made < offset]
+        if len(sites) > 1:
+            # The full pass finds the earlier failures again, in the same order.
+            new_failures = find_failures_full(jsonl_path, partial=stats is None)[len(failures):]
+            break
+        tool_use = find_tool_use(sites, {}, event.entry.uuid)
+        new_failures.append(_failure(file_path, event.entry, tool_use_id, tool_use, event.content))
 
-    return entries
+    failures.extend(new_failures)
+    return failures
 
 
-def find_tool_use(entries: dict[str, dict], tool_use_id: str, start_uuid: str) -> dict | None:
-    """Walk parent chain to find the tool_use message matching tool_use_id."""
-    current_uuid = entries.get(start_uuid, {}).get("parentUuid")
+def find_failures_since_last(jsonl_path: Path, checkpoints: Checkpoints) -> list[dict]:
+    """`find_failures`, searching only what's new since the last checkpoint."""
+    return checkpoints.advance(jsonl_path, find_failures)
 
-    while current_uuid:
-        entry = entries.get(current_uuid)
-        if not entry:
-            break
 
-        message = entry.get("message", {})
-        content = message.get("content", [])
+def _line_offsets(buf, pattern: re.Pattern[bytes], start: int = 0, end: int | None = None, keep=None) -> list[int]:
+    """Offsets of the lines in `buf[start:end]` with a match of `pattern` (that `keep` accepts), in order."""
+    return list(dict.fromkeys(
+        offset for offset, match in line_matches(buf, pattern, start, end) if keep is None or keep(match)
+    ))
 
-        if isinstance(content, list):
-            for item in content:
-                if isinstance(item, dict) and item.get("type") == "tool_use":
-                    if item.get("id") == tool_use_id:
-                        return {
-                            "uuid": current_uuid,
-                            "type": entry.get("type", "unknown"),
-                            "name": item.get("name", "unknown"),
-                            "input": item.get("input", {}),
-                        }
 
-        current_uuid = entry.get("parentUuid")
+def _line_events(buf, offset: int) -> list[Event]:
+    raw = decode_entry(line_at(buf, offset))
+    # Byte offsets order entries just like indexes do.
+    return [] if raw is None else list(entry_events(raw, offset))
 
-    return None
 
+def find_failures_full(jsonl_path: Path, partial: bool = True) -> list[dict]:
+    """Stream a JSONL file once, decoding every line, and extract failed tool calls.
 
-def find_failures(jsonl_path: Path) -> list[dict]:
-    """Parse JSONL file and extract failed tool calls."""
-    entries = parse_session(jsonl_path)
-    failures = []
+    A tool_use always precedes its result, so one forward pass that maps
+    tool_use_id → tool_use resolves each failure as it's reached. Parent
+    links are kept only for the rare ambiguous id. A repeated entry line's
+    failures are reported as `find_failures` does.
+    """
+    file_path = str(jsonl_path.resolve())
+    parents: dict[str, str | None] = {}
+    tool_uses: dict[str, list[ToolUseSite]] = {}
+    # response uuid -> failures of its last copy, in its first copy's place
+    failures: dict[str, list[dict]] = {}
 
-    for entry in entries.values():
-        # Look for tool_result with is_error: true
-        message = entry.get("message", {})
-        content = message.get("content", [])
-
-        if not isinstance(content, list):
+    for entry, events in by_entry(read_events(jsonl_path, partial=partial)):
+        if not entry.uuid:
             continue
-
-        for item in content:
-            if isinstance(item, dict) and item.get("is_error") is True:
-                tool_use_id = item.get("tool_use_id", "unknown")
-                tool_use = find_tool_use(entries, tool_use_id, entry.get("uuid", ""))
-
-                failures.append({
-                    "file_path": str(jsonl_path.resolve()),
-                    "request_uuid": tool_use["uuid"] if tool_use else "unknown",
-                    "request_type": tool_use["type"] if tool_use else "unknown",
-                    "response_uuid": entry.get("uuid", "unknown"),
-                    "response_type": entry.get("type", "unknown"),
-                    "tool_use_id": tool_use_id,
-                    "tool_name": tool_use["name"] if tool_use else "unknown",
-                    "tool_input": tool_use["input"] if tool_use else {},
-                    "error_content": item.get("content", ""),
-                })
-
-    return failures
+        entry_type = entry.type or "unknown"
+        parents[entry.uuid] = entry.parent_uuid
+        entry_failures = []
+        for event in events:
+            if isinstance(event, ToolUse):
+                tool_uses.setdefault(event.id, []).append(ToolUseSite(entry.uuid, entry_type, event))
+            elif isinstance(event, ToolResult) and event.is_error:
+                tool_use_id = event.tool_use_id or "unknown"
+                tool_use = find_tool_use(tool_uses.get(tool_use_id), parents, entry.uuid)
+                entry_failures.append(_failure(file_path, entry, tool_use_id, tool_use, event.content))
+        if entry_failures:
+            failures[entry.uuid] = entry_failures
+
+    return [failure for entry_failures in failures.values() for failure in entry_failures]
+
+
+def _failure(file_path: str, entry: Entry, tool_use_id: str, tool_use: dict | None, error_content) -> dict:
+    return {
+        "file_path": file_path,
+        "request_uuid": tool_use["uuid"] if tool_use else "unknown",
+        "request_type": tool_use["type"] if tool_use else "unknown",
+        "response_uuid": entry.uuid,
+        "response_type": entry.type or "unknown",
+        "tool_use_id": tool_use_id,
+        "tool_name": tool_use["name"] if tool_use else "unknown",
+        "tool_input": tool_use["input"] if tool_use else {},
+        "error_content": error_content,
+    }
+
+
+def find_indexed_failures(index: TranscriptIndex, jsonl_path: Path) -> list[dict]:
+    """Same as `find_failures`, from the transcript index."""
+    file_id = index.file_id(jsonl_path)
+    if file_id is None:
+        return find_failures(jsonl_path)
+
+    file_path = str(jsonl_path.resolve())
+    return [{"file_path": file_path, **failure} for failure in index.failures(file_id)]
 
 
 def format_tool_input(tool_name: str, tool_input: dict, indent: str) -> list[str]:
@@ -197,8 +279,18 @@ def main():
         action="store_true",
         help="Output results as JSON (one object per line)",
     )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Query the transcript index (refreshing it first) instead of parsing transcripts",
+    )
+    add_since_last_argument(parser)
+    add_jobs_argument(parser)
     args = parser.parse_args()
 
+    if args.index and args.since_last:
+        parser.error("--index and --since-last are mutually exclusive")
+
     jsonl_files = collect_jsonl_files(args.paths)
 
     if not jsonl_files:
@@ -206,8 +298,16 @@ def main():
         sys.exit(1)
 
     all_failures = []
-    for jsonl_file in jsonl_files:
-        all_failures.extend(find_failures(jsonl_file))
+    if args.index:
+        with open_index(jsonl_files) as index:
+            for jsonl_file in jsonl_files:
+                all_failures.extend(find_indexed_failures(index, jsonl_file))
+    elif args.since_last:
+        for failures in map_since_last(find_failures_since_last, jsonl_files, "find-failures"):
+            all_failures.extend(failures)
+    else:
+        for failures in map_files(find_failures, jsonl_files, args.jobs):
+            all_failures.extend(failures)
 
     if args.json:
         for failure in all_failures:
@@ -6,6 +6,9 @@ Detects:
 - Manual workarounds (user repeatedly giving same instruction)
 - Unused tool suggestions (suggestions made but not followed)
 - Directory confusion (commands run in wrong directory)
+
+With --cross-session, reports failures and instructions that recur across
+sessions instead, counted in fixed memory however many sessions are read.
 """
 
 import argparse
@@ -13,125 +16,100 @@ import json
 import re
 import signal
 import sys
-from collections import defaultdict
+from collections import Counter, defaultdict
 from pathlib import Path
 
-signal.signal(signal.SIGPIPE, signal.SIG_DFL)
-
-ALLOWED_ROOT = Path.home() / ".claude" / "projects"
-
-
-def is_allowed_path(path: Path) -> bool:
-    """Check if path is within ~/.claude/projects."""
-    try:
-        resolved = path.resolve()
-        return resolved.is_relative_to(ALLOWED_ROOT)
-    except (OSError, ValueError):
-        return False
-
-
-def collect_jsonl_files(paths: list[Path]) -> list[Path]:
-    """Expand paths to individual .jsonl files, filtering to allowed locations."""
-    jsonl_files = []
-
-    for path in paths:
-        if not path.exists():
-            print(f"Warning: Path not found: {path}", file=sys.stderr)
-            continue
-
-        if not is_allowed_path(path):
-            print(f"Warning: Skipping path outside ~/.claude/projects: {path}", file=sys.stderr)
-            continue
-
-        if path.is_file():
-            if path.suffix == ".jsonl":
-                jsonl_files.append(path)
-            else:
-                print(f"Warning: Skipping non-JSONL file: {path}", file=sys.stderr)
-        elif path.is_dir():
-            jsonl_files.extend(sorted(path.rglob("*.jsonl")))
-
-    return jsonl_files
-
-
-def parse_session(jsonl_path: Path) -> list[dict]:
-    """Parse JSONL file and return entries in order."""
-    entries = []
-
-    with open(jsonl_path) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-
-            try:
-                entry = json.loads(line)
-                entries.append(entry)
-            except json.JSONDecodeError:
-                continue
-
-    return entries
-
+from agent_meta.checkpoint import Checkpoints, add_since_last_argument, map_since_last
+from agent_meta.fanout import add_jobs_argument, map_files
+from agent_meta.normalize import Normalizer
+from agent_meta.sketch import TopKCounter
+from agent_meta.transcripts import (
+    Entry,
+    ReadStats,
+    Text,
+    ToolResult,
+    ToolUse,
+    collect_jsonl_files,
+    read_events,
+)
 
-def extract_tool_calls_with_results(entries: list[dict]) -> list[dict]:
-    """Extract tool calls paired with their results."""
-    # First pass: collect tool calls
-    tool_calls = {}
-    for entry in entries:
-        message = entry.get("message", {})
-        content = message.get("content", [])
-
-        if not isinstance(content, list):
-            continue
-
-        for item in content:
-            if isinstance(item, dict) and item.get("type") == "tool_use":
-                tool_calls[item.get("id")] = {
-                    "uuid": entry.get("uuid"),
-                    "name": item.get("name", "unknown"),
-                    "input": item.get("input", {}),
-                    "result": None,
-                    "is_error": False,
-                }
-
-    # Second pass: match results
-    for entry in entries:
-        message = entry.get("message", {})
-        content = message.get("content", [])
-
-        if not isinstance(content, list):
-            continue
-
-        for item in content:
-            if isinstance(item, dict) and item.get("tool_use_id"):
-                tool_id = item.get("tool_use_id")
-                if tool_id in tool_calls:
-                    tool_calls[tool_id]["result"] = item.get("content", "")
-                    tool_calls[tool_id]["is_error"] = item.get("is_error", False)
-
-    return list(tool_calls.values())
-
-
-def extract_user_messages(entries: list[dict]) -> list[str]:
-    """Extract user message content."""
-    messages = []
-
-    for entry in entries:
-        message = entry.get("message", {})
-        if message.get("role") != "user":
-            continue
-
-        content = message.get("content", [])
-        if isinstance(content, str):
-            messages.append(content)
-        elif isinstance(content, list):
-            for item in content:
-                if isinstance(item, str):
-                    messages.append(item)
-                elif isinstance(item, dict) and item.get("type") == "text":
-                    messages.append(item.get("text", ""))
+signal.signal(signal.SIGPIPE, signal.SIG_DFL)
 
-    return messages
+# Examples kept per pattern in --cross-session reports.
+EXAMPLES = 3
+
+# Error messages are grouped with paths and numbers masked, by their first
+# 150 characters.
+FAILURE_NORMALIZER = Normalizer(
+    [
+        (r"/[\w/.-]+", "<path>"),
+        (r"\d+", "<n>"),
+    ],
+    limit=150,
+)
+
+# Bash commands that could have used a native tool: (pattern, better tool, suggestion).
+BASH_MISUSE = [
+    (r"\bcat\s+", "Read", "Use Read tool instead of cat"),
+    (r"\bhead\s+", "Read", "Use Read tool with limit instead of head"),
+    (r"\btail\s+", "Read", "Use Read tool with offset instead of tail"),
+    (r"\bgrep\s+", "Grep", "Use Grep tool instead of grep/rg"),
+    (r"\brg\s+", "Grep", "Use Grep tool instead of rg"),
+    (r"\bfind\s+", "Glob", "Use Glob tool instead of find"),
+    (r"\bls\s+.*\*", "Glob", "Use Glob tool instead of ls with wildcards"),
+]
+
+# All of BASH_MISUSE in one pass. Every pattern starts at a word boundary,
+# so only word starts are tried, each against all the patterns as named
+# groups inside lookaheads (which consume nothing, so no match hides
+# another). That finds every pattern present as long as no two can match at
+# the same position, which holds since each starts with its own command word.
+_BASH_MISUSE_MATCHER = re.compile(
+    r"\b(?:"
+    # pattern[2:] drops each pattern's own leading \b.
+    + "|".join(f"(?=(?P<m{i}>{pattern[2:]}))" for i, (pattern, _, _) in enumerate(BASH_MISUSE))
+    + ")"
+)
+
+
+def read_session(jsonl_path: Path, stats: ReadStats | None = None, session: dict | None = None) -> dict:
+    """Stream a JSONL file once: entry count, tool calls with results, user messages.
+
+    Given `stats` and the `session` read up to there, reads on and adds to it.
+    Tool calls are kept as (id, call) pairs so the session stays JSON.
+    """
+    if session is None:
+        session = {"entry_count": 0, "tool_calls": [], "user_messages": []}
+    tool_calls = dict(session["tool_calls"])
+    user_messages = session["user_messages"]
+
+    for event in read_events(jsonl_path, stats=stats, partial=stats is None):
+        if isinstance(event, Entry):
+            session["entry_count"] += 1
+        elif isinstance(event, ToolUse):
+            tool_calls[event.id] = {
+                "uuid": event.entry.uuid,
+                "name": event.name,
+                "input": event.input,
+                "result": None,
+                "is_error": False,
+            }
+        elif isinstance(event, ToolResult):
+            call = tool_calls.get(event.tool_use_id)
+            if call is not None:
+                # Only errors' output is looked at; don't hold on to the rest.
+                call["result"] = event.content if event.is_error else None
+                call["is_error"] = event.is_error
+        elif isinstance(event, Text) and event.entry.role == "user":
+            user_messages.append(event.text)
+
+    session["tool_calls"] = list(tool_calls.items())
+    return session
+
+
+def failure_key(call: dict) -> tuple[str, str]:
+    """Group a failed call by tool and error message, minus paths and numbers."""
+    return call["name"], FAILURE_NORMALIZER(call["result"] or "")
 
 
 def find_repeated_failures(tool_calls: list[dict]) -> list[dict]:
@@ -141,17 +119,7 @@ def find_repeated_failures(tool_calls: list[dict]) -> list[dict]:
     for call in tool_calls:
         if not call["is_error"]:
             continue
-
-        result = call["result"] or ""
-
-        # Normalize error message for grouping
-        # Remove specific paths, numbers, etc.
-        normalized = re.sub(r"/[\w/.-]+", "<path>", result)
-        normalized = re.sub(r"\d+", "<n>", normalized)
-        normalized = normalized[:150]  # Truncate for grouping
-
-        key = (call["name"], normalized)
-        failure_patterns[key].append(call)
+        failure_patterns[failure_key(call)].append(call)
 
     candidates = []
     for (tool_name, error_pattern), calls in failure_patterns.items():
@@ -209,25 +177,27 @@ def find_directory_confusion(tool_calls: list[dict]) -> list[dict]:
     return candidates
 
 
+def instruction_key(message: str) -> str | None:
+    """Group a user message by its first few words, or None if it's too short to."""
+    # Lowercase, remove punctuation, collapse whitespace
+    normalized = re.sub(r"[^\w\s]", "", message.lower())
+    normalized = re.sub(r"\s+", " ", normalized).strip()
+    if len(normalized) <= 10:  # Skip very short messages
+        return None
+    # Use first few words as key
+    return " ".join(normalized[:100].split()[:5])
+
+
 def find_repeated_instructions(user_messages: list[str]) -> list[dict]:
     """Find cases where user gave similar instructions repeatedly."""
     candidates = []
 
-    # Normalize messages for comparison
-    normalized_messages = []
-    for msg in user_messages:
-        # Lowercase, remove punctuation, collapse whitespace
-        normalized = re.sub(r"[^\w\s]", "", msg.lower())
-        normalized = re.sub(r"\s+", " ", normalized).strip()
-        if len(normalized) > 10:  # Skip very short messages
-            normalized_messages.append((normalized[:100], msg))
-
     # Group similar messages
     message_groups = defaultdict(list)
-    for normalized, original in normalized_messages:
-        # Use first few words as key
-        key = " ".join(normalized.split()[:5])
-        message_groups[key].append(original)
+    for msg in user_messages:
+        key = instruction_key(msg)
+        if key is not None:
+            message_groups[key].append(msg)
 
     for key, messages in message_groups.items():
         if len(messages) >= 2:
@@ -248,16 +218,6 @@ def find_tool_misuse(tool_calls: list[dict]) -> list[dict]:
     candidates = []
 
     # Look for Bash calls that could have used native tools
-    bash_patterns = {
-        r"\bcat\s+": ("Read", "Use Read tool instead of cat"),
-        r"\bhead\s+": ("Read", "Use Read tool with limit instead of head"),
-        r"\btail\s+": ("Read", "Use Read tool with offset instead of tail"),
-        r"\bgrep\s+": ("Grep", "Use Grep tool instead of grep/rg"),
-        r"\brg\s+": ("Grep", "Use Grep tool instead of rg"),
-        r"\bfind\s+": ("Glob", "Use Glob tool instead of find"),
-        r"\bls\s+.*\*": ("Glob", "Use Glob tool instead of ls with wildcards"),
-    }
-
     misuse_counts = defaultdict(int)
 
     for call in tool_calls:
@@ -265,11 +225,12 @@ def find_tool_misuse(tool_calls: list[dict]) -> list[dict]:
             continue
 
         command = call["input"].get("command", "")
-        for pattern, (better_tool, suggestion) in bash_patterns.items():
-            if re.search(pattern, command):
-                misuse_counts[(pattern, better_tool, suggestion)] += 1
+        found = {match.lastgroup for match in _BASH_MISUSE_MATCHER.finditer(command)}
+        for i in sorted(int(name[1:]) for name in found):
+            misuse_counts[i] += 1
 
-    for (pattern, better_tool, suggestion), count in misuse_counts.items():
+    for i, count in misuse_counts.items():
+        pattern, better_tool, suggestion = BASH_MISUSE[i]
         if count >= 2:
             candidates.append({
                 "type": "tool_misuse",
@@ -283,11 +244,12 @@ def find_tool_misuse(tool_calls: list[dict]) -> list[dict]:
     return sorted(candidates, key=lambda x: x["count"], reverse=True)
 
 
-def identify_skills(jsonl_path: Path) -> dict:
-    """Identify skill/hook opportunities in a session."""
-    entries = parse_session(jsonl_path)
-    tool_calls = extract_tool_calls_with_results(entries)
-    user_messages = extract_user_messages(entries)
+def identify_skills(jsonl_path: Path, checkpoints: Checkpoints | None = None) -> dict:
+    """Identify skill/hook opportunities in a session, picking up from checkpoints if given."""
+    session = checkpoints.advance(jsonl_path, read_session) if checkpoints else read_session(jsonl_path)
+    entry_count = session["entry_count"]
+    tool_calls = [call for _, call in session["tool_calls"]]
+    user_messages = session["user_messages"]
 
     candidates = []
     candidates.extend(find_repeated_failures(tool_calls))
@@ -301,12 +263,111 @@ def identify_skills(jsonl_path: Path) -> dict:
 
     return {
         "file_path": str(jsonl_path.resolve()),
-        "entry_count": len(entries),
+        "entry_count": entry_count,
         "tool_call_count": len(tool_calls),
         "candidates": candidates,
     }
 
 
+def session_patterns(jsonl_path: Path, checkpoints: Checkpoints | None = None) -> dict:
+    """A session's failures and instructions grouped by key, for --cross-session.
+
+    Each group holds its count and up to `EXAMPLES` examples, so what goes
+    back to the aggregator is small however long the session was. Failure
+    examples point back into the transcript: file, entry uuid, tool_use_id.
+    """
+    session = checkpoints.advance(jsonl_path, read_session) if checkpoints else read_session(jsonl_path)
+    file_path = str(jsonl_path.resolve())
+
+    failures = {}
+    for tool_use_id, call in session["tool_calls"]:
+        if not call["is_error"]:
+            continue
+        group = failures.setdefault(failure_key(call), {"count": 0, "examples": []})
+        group["count"] += 1
+        if len(group["examples"]) < EXAMPLES:
+            group["examples"].append({
+                "file_path": file_path,
+                "uuid": call["uuid"],
+                "tool_use_id": tool_use_id,
+                "error": str(call["result"] or "")[:100],
+            })
+
+    instructions = {}
+    for message in session["user_messages"]:
+        key = instruction_key(message)
+        if key is None:
+            continue
+        group = instructions.setdefault(key, {"count": 0, "examples": []})
+        group["count"] += 1
+        if len(group["examples"]) < EXAMPLES:
+            group["examples"].append({"file_path": file_path, "message": message[:100]})
+
+    return {
+        "tool_call_count": len(session["tool_calls"]),
+        "failures": failures,
+        "instructions": instructions,
+    }
+
+
+class RecurringPatterns:
+    """Failure and instruction patterns across sessions, in fixed memory.
+
+    Every key is counted in a count-min sketch; only the `capacity` heaviest
+    keep an entry, with how many sessions they were seen in and an example
+    from each of the first few. Counts are estimates that can run slightly
+    high, and a key that entered the top late may be missing sessions and
+    examples from before, but neither grows with the number of sessions
+    read.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.sessions = 0
+        self.tool_calls = 0
+        self.failed_calls = 0
+        self.failures = TopKCounter(capacity, lambda key: "\0".join(key).encode("utf-8", "surrogatepass"))
+        self.instructions = TopKCounter(capacity, lambda key: key.encode("utf-8", "surrogatepass"))
+
+    def add(self, patterns: dict) -> None:
+        """Fold in one session's `session_patterns`."""
+        self.sessions += 1
+        self.tool_calls += patterns["tool_call_count"]
+        for key, group in patterns["failures"].items():
+            self.failed_calls += group["count"]
+            self._count(self.failures, key, group)
+        for key, group in patterns["instructions"].items():
+            self._count(self.instructions, key, group)
+
+    @staticmethod
+    def _count(counter: TopKCounter, key, group: dict) -> None:
+        details = counter.add(key, group["count"], lambda: {"sessions": 0, "examples": []})
+        if details is not None:
+            details["sessions"] += 1
+            # One per session, so the examples show how far it's spread.
+            if len(details["examples"]) < EXAMPLES:
+                details["examples"].append(group["examples"][0])
+
+    def report(self, top: int) -> dict:
+        """The `top` most frequent patterns seen in more than one session."""
+        failures = [
+            {"tool": tool, "pattern": pattern, "count": count, **details}
+            for (tool, pattern), count, details in self.failures.items()
+            if details["sessions"] >= 2
+        ]
+        instructions = [
+            {"pattern": pattern, "count": count, **details}
+            for pattern, count, details in self.instructions.items()
+            if details["sessions"] >= 2
+        ]
+        return {
+            "session_count": self.sessions,
+            "tool_call_count": self.tool_calls,
+            "failure_count": self.failed_calls,
+            "recurring_failures": failures[:top],
+            "recurring_instructions": instructions[:top],
+        }
+
+
 def format_candidates(result: dict) -> str:
     """Format skill candidates for human-readable output."""
     lines = ["━━━ Skill Candidates ━━━"]
@@ -347,6 +408,38 @@ def format_candidates(result: dict) -> str:
     return "\n".join(lines)
 
 
+def format_recurring(report: dict) -> str:
+    """Format a cross-session report for human-readable output."""
+    lines = [
+        "━━━ Recurring Across Sessions ━━━",
+        f"Analyzed {report['session_count']} session(s): "
+        f"{report['tool_call_count']} tool call(s), {report['failure_count']} failed",
+    ]
+
+    sections = [
+        ("Failures", report["recurring_failures"]),
+        ("Instructions", report["recurring_instructions"]),
+    ]
+    for title, patterns in sections:
+        lines.append("")
+        if not patterns:
+            lines.append(f"{title}: none seen in more than one session.")
+            continue
+        lines.append(f"{title}:")
+        for pattern in patterns:
+            label = str(pattern["pattern"])[:60].replace("\n", " ")
+            if pattern.get("tool"):
+                label = f"{pattern['tool']}: {label}"
+            lines.append(f"  {pattern['count']}x in {pattern['sessions']} session(s) - {label}")
+            for example in pattern["examples"][:2]:
+                where = example["file_path"]
+                if example.get("uuid"):
+                    where += f" @ {example['uuid']}"
+                lines.append(f"    - {where}")
+
+    return "\n".join(lines)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Identify patterns that suggest new skills or hooks.",
@@ -364,6 +457,20 @@ def main():
         action="store_true",
         help="Output results as JSON",
     )
+    parser.add_argument(
+        "--cross-session",
+        action="store_true",
+        help="Report failures and instructions that recur across sessions instead of per-session candidates",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        metavar="N",
+        help="With --cross-session, how many patterns of each kind to report (default: 10)",
+    )
+    add_since_last_argument(parser)
+    add_jobs_argument(parser)
     args = parser.parse_args()
 
     jsonl_files = collect_jsonl_files(args.paths)
@@ -372,11 +479,32 @@ def main():
         print("No valid JSONL files found.", file=sys.stderr)
         sys.exit(1)
 
-    all_candidates = []
+    if args.cross_session:
+        if args.since_last:
+            sessions = map_since_last(session_patterns, jsonl_files, "identify-skills")
+        else:
+            sessions = map_files(session_patterns, jsonl_files, args.jobs)
+
+        recurring = RecurringPatterns(capacity=max(1000, 10 * args.top))
+        for patterns in sessions:
+            recurring.add(patterns)
+
+        report = recurring.report(args.top)
+        print(json.dumps(report) if args.json else format_recurring(report))
+        return
 
-    for jsonl_file in jsonl_files:
-        result = identify_skills(jsonl_file)
-        all_candidates.extend(result["candidates"])
+    # Aggregate partials, merged per file as results arrive
+    total_candidates = 0
+    by_type = Counter()
+
+    if args.since_last:
+        results = map_since_last(identify_skills, jsonl_files, "identify-skills")
+    else:
+        results = map_files(identify_skills, jsonl_files, args.jobs)
+
+    for jsonl_file, result in zip(jsonl_files, results):
+        total_candidates += len(result["candidates"])
+        by_type.update(c.get("type", "unknown") for c in result["candidates"])
 
         if args.json:
             print(json.dumps(result))
@@ -390,18 +518,12 @@ def main():
     if len(jsonl_files) > 1 and not args.json:
         print("━━━ Aggregate Summary ━━━")
         print(f"Analyzed {len(jsonl_files)} session(s)")
-        print(f"Total candidates: {len(all_candidates)}")
-
-        # Group by type
-        by_type = defaultdict(int)
-        for c in all_candidates:
-            by_type[c.get("type", "unknown")] += 1
+        print(f"Total candidates: {total_candidates}")
 
         if by_type:
             print("\nBy type:")
             for t, count in sorted(by_type.items(), key=lambda x: -x[1]):
                 print(f"  {t}: {count}")
 
-
 if __name__ == "__main__":
     main()
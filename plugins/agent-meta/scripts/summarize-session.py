@@ -14,109 +14,101 @@ import json
 import signal
 import sys
 from collections import defaultdict
+from contextlib import nullcontext
 from datetime import datetime
 from pathlib import Path
 
-signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+from agent_meta.checkpoint import Checkpoints, add_since_last_argument, map_since_last
+from agent_meta.fanout import add_jobs_argument, map_files
+from agent_meta.index import TranscriptIndex, open_index
+from agent_meta.transcripts import Entry, ReadStats, ToolResult, ToolUse, collect_jsonl_files, read_events
 
-ALLOWED_ROOT = Path.home() / ".claude" / "projects"
+signal.signal(signal.SIGPIPE, signal.SIG_DFL)
 
 
-def is_allowed_path(path: Path) -> bool:
-    """Check if path is within ~/.claude/projects."""
+def parse_timestamp(ts) -> datetime | None:
+    """Parse an entry timestamp (ISO string or epoch milliseconds)."""
     try:
-        resolved = path.resolve()
-        return resolved.is_relative_to(ALLOWED_ROOT)
-    except (OSError, ValueError):
-        return False
-
-
-def collect_jsonl_files(paths: list[Path]) -> list[Path]:
-    """Expand paths to individual .jsonl files, filtering to allowed locations."""
-    jsonl_files = []
-
-    for path in paths:
-        if not path.exists():
-            print(f"Warning: Path not found: {path}", file=sys.stderr)
-            continue
-
-        if not is_allowed_path(path):
-            print(f"Warning: Skipping path outside ~/.claude/projects: {path}", file=sys.stderr)
-            continue
-
-        if path.is_file():
-            if path.suffix == ".jsonl":
-                jsonl_files.append(path)
-            else:
-                print(f"Warning: Skipping non-JSONL file: {path}", file=sys.stderr)
-        elif path.is_dir():
-            jsonl_files.extend(sorted(path.rglob("*.jsonl")))
-
-    return jsonl_files
-
-
-def parse_session(jsonl_path: Path) -> list[dict]:
-    """Parse JSONL file and return entries in order."""
-    entries = []
-
-    with open(jsonl_path) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-
-            try:
-                entry = json.loads(line)
-                entries.append(entry)
-            except json.JSONDecodeError:
-                continue
-
-    return entries
-
-
-def extract_tool_calls(entries: list[dict]) -> list[dict]:
-    """Extract all tool calls from session entries."""
-    tool_calls = []
-
-    for entry in entries:
-        message = entry.get("message", {})
-        content = message.get("content", [])
-
-        if not isinstance(content, list):
+        # Handle ISO format timestamps
+        if isinstance(ts, str):
+            return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+        elif isinstance(ts, (int, float)):
+            return datetime.fromtimestamp(ts / 1000)  # milliseconds
+    except (ValueError, OSError):
+        pass
+    return None
+
+
+def timestamp_range(raw_timestamps, span=(None, None, 0)) -> tuple:
+    """(earliest, latest, how many parsed) of raw entry timestamps.
+
+    Earliest and latest are kept raw, as recorded. Pass an earlier result
+    as `span` to extend it with more timestamps.
+    """
+    first, last, count = span
+    first_dt, last_dt = parse_timestamp(first), parse_timestamp(last)
+
+    for ts in raw_timestamps:
+        dt = parse_timestamp(ts) if ts else None
+        if dt is None:
             continue
+        count += 1
+        if first_dt is None or dt < first_dt:
+            first, first_dt = ts, dt
+        if last_dt is None or dt > last_dt:
+            last, last_dt = ts, dt
+
+    return first, last, count
+
+
+def read_session(jsonl_path: Path, stats: ReadStats | None = None, session: dict | None = None) -> dict:
+    """Stream a JSONL file once, keeping what the summary needs.
+
+    Returns the entry count, tool calls in order, tool results indexed by
+    tool_use_id, and the earliest/latest timestamps with how many were seen.
+    Given `stats` and the `session` read up to there, reads on and adds to it.
+    """
+    if session is None:
+        session = {"entry_count": 0, "tool_calls": [], "tool_results": {}, "timestamps": (None, None, 0)}
+    tool_calls = session["tool_calls"]
+    tool_results = session["tool_results"]
+    raw_timestamps = []
+
+    for event in read_events(jsonl_path, stats=stats, partial=stats is None):
+        if isinstance(event, Entry):
+            session["entry_count"] += 1
+            raw_timestamps.append(event.timestamp)
+        elif isinstance(event, ToolUse):
+            tool_calls.append({
+                "uuid": event.entry.uuid,
+                "timestamp": event.entry.timestamp,
+                "name": event.name,
+                "input": event.input,
+                "id": event.id,
+            })
+        elif isinstance(event, ToolResult) and event.tool_use_id:
+            # Only errors' content is looked at; don't hold on to the rest.
+            tool_results[event.tool_use_id] = {
+                "is_error": event.is_error,
+                "content": event.content if event.is_error else None,
+            }
 
-        for item in content:
-            if isinstance(item, dict) and item.get("type") == "tool_use":
-                tool_calls.append({
-                    "uuid": entry.get("uuid"),
-                    "timestamp": entry.get("timestamp"),
-                    "name": item.get("name", "unknown"),
-                    "input": item.get("input", {}),
-                    "id": item.get("id"),
-                })
-
-    return tool_calls
-
-
-def extract_tool_results(entries: list[dict]) -> dict[str, dict]:
-    """Extract tool results indexed by tool_use_id."""
-    results = {}
-
-    for entry in entries:
-        message = entry.get("message", {})
-        content = message.get("content", [])
+    session["timestamps"] = timestamp_range(raw_timestamps, session["timestamps"])
+    return session
 
-        if not isinstance(content, list):
-            continue
 
-        for item in content:
-            if isinstance(item, dict) and item.get("tool_use_id"):
-                results[item["tool_use_id"]] = {
-                    "is_error": item.get("is_error", False),
-                    "content": item.get("content", ""),
-                }
+def read_indexed_session(index: TranscriptIndex, jsonl_path: Path) -> dict:
+    """Same as `read_session`, from the transcript index."""
+    file_id = index.file_id(jsonl_path)
+    if file_id is None:
+        return read_session(jsonl_path)
 
-    return results
+    return {
+        "entry_count": index.entry_count(file_id),
+        "tool_calls": index.tool_calls(file_id),
+        "tool_results": index.tool_results(file_id),
+        "timestamps": timestamp_range(index.timestamps(file_id)),
+    }
 
 
 def extract_files_touched(tool_calls: list[dict]) -> dict[str, set[str]]:
@@ -168,28 +160,14 @@ def extract_bash_commands(tool_calls: list[dict]) -> list[dict]:
     return commands
 
 
-def estimate_duration(entries: list[dict]) -> str | None:
-    """Estimate session duration from timestamps."""
-    timestamps = []
-
-    for entry in entries:
-        ts = entry.get("timestamp")
-        if ts:
-            try:
-                # Handle ISO format timestamps
-                if isinstance(ts, str):
-                    dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-                    timestamps.append(dt)
-                elif isinstance(ts, (int, float)):
-                    dt = datetime.fromtimestamp(ts / 1000)  # milliseconds
-                    timestamps.append(dt)
-            except (ValueError, OSError):
-                continue
-
-    if len(timestamps) < 2:
+def estimate_duration(timestamps: tuple) -> str | None:
+    """Estimate session duration from the earliest and latest timestamps."""
+    first, last, count = timestamps
+
+    if count < 2:
         return None
 
-    duration = max(timestamps) - min(timestamps)
+    duration = parse_timestamp(last) - parse_timestamp(first)
     total_seconds = int(duration.total_seconds())
 
     if total_seconds < 60:
@@ -228,11 +206,12 @@ def find_repeated_failures(tool_calls: list[dict], tool_results: dict[str, dict]
     return sorted(repeated, key=lambda x: x["count"], reverse=True)
 
 
-def summarize_session(jsonl_path: Path) -> dict:
-    """Generate a summary of a session."""
-    entries = parse_session(jsonl_path)
-    tool_calls = extract_tool_calls(entries)
-    tool_results = extract_tool_results(entries)
+def summarize_session(jsonl_path: Path, index: TranscriptIndex | None = None, session: dict | None = None) -> dict:
+    """Generate a summary of a session, from the transcript index if given."""
+    if session is None:
+        session = read_indexed_session(index, jsonl_path) if index else read_session(jsonl_path)
+    tool_calls = session["tool_calls"]
+    tool_results = session["tool_results"]
 
     # Count tool calls by type
     tool_counts = defaultdict(int)
@@ -253,8 +232,8 @@ def summarize_session(jsonl_path: Path) -> dict:
 
     return {
         "file_path": str(jsonl_path.resolve()),
-        "duration": estimate_duration(entries),
-        "entry_count": len(entries),
+        "duration": estimate_duration(session["timestamps"]),
+        "entry_count": session["entry_count"],
         "tool_calls": {
             "total": len(tool_calls),
             "failures": failure_count,
@@ -271,6 +250,11 @@ def summarize_session(jsonl_path: Path) -> dict:
     }
 
 
+def summarize_session_since_last(jsonl_path: Path, checkpoints: Checkpoints) -> dict:
+    """`summarize_session`, reading only what's new since the last checkpoint."""
+    return summarize_session(jsonl_path, session=checkpoints.advance(jsonl_path, read_session))
+
+
 def format_summary(summary: dict) -> str:
     """Format summary for human-readable output."""
     lines = ["━━━ Session Summary ━━━"]
@@ -355,24 +339,40 @@ def main():
         action="store_true",
         help="Output results as JSON",
     )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Query the transcript index (refreshing it first) instead of parsing transcripts",
+    )
+    add_since_last_argument(parser)
+    add_jobs_argument(parser)
     args = parser.parse_args()
 
+    if args.index and args.since_last:
+        parser.error("--index and --since-last are mutually exclusive")
+
     jsonl_files = collect_jsonl_files(args.paths)
 
     if not jsonl_files:
         print("No valid JSONL files found.", file=sys.stderr)
         sys.exit(1)
 
-    for jsonl_file in jsonl_files:
-        summary = summarize_session(jsonl_file)
-
-        if args.json:
-            print(json.dumps(summary))
+    with open_index(jsonl_files) if args.index else nullcontext() as index:
+        if index:
+            summaries = (summarize_session(jsonl_file, index) for jsonl_file in jsonl_files)
+        elif args.since_last:
+            summaries = map_since_last(summarize_session_since_last, jsonl_files, "summarize-session")
         else:
-            if len(jsonl_files) > 1:
-                print(f"\n=== {jsonl_file} ===\n")
-            print(format_summary(summary))
-            print()
+            summaries = map_files(summarize_session, jsonl_files, args.jobs)
+
+        for jsonl_file, summary in zip(jsonl_files, summaries):
+            if args.json:
+                print(json.dumps(summary))
+            else:
+                if len(jsonl_files) > 1:
+                    print(f"\n=== {jsonl_file} ===\n")
+                print(format_summary(summary))
+                print()
 
 
 if __name__ == "__main__":
@@ -16,9 +16,18 @@ import sys
 from collections import defaultdict
 from pathlib import Path
 
-signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+from agent_meta.checkpoint import Checkpoints, add_since_last_argument, map_since_last
+from agent_meta.fanout import add_jobs_argument, map_files
+from agent_meta.transcripts import (
+    ReadStats,
+    SystemReminder,
+    by_entry,
+    collect_jsonl_files,
+    entry_text,
+    read_events,
+)
 
-ALLOWED_ROOT = Path.home() / ".claude" / "projects"
+signal.signal(signal.SIGPIPE, signal.SIG_DFL)
 
 # Patterns that indicate hook-generated content
 HOOK_PATTERNS = [
@@ -36,88 +45,18 @@ HOOK_PATTERNS = [
 ]
 
 
-def is_allowed_path(path: Path) -> bool:
-    """Check if path is within ~/.claude/projects."""
-    try:
-        resolved = path.resolve()
-        return resolved.is_relative_to(ALLOWED_ROOT)
-    except (OSError, ValueError):
-        return False
-
-
-def collect_jsonl_files(paths: list[Path]) -> list[Path]:
-    """Expand paths to individual .jsonl files, filtering to allowed locations."""
-    jsonl_files = []
-
-    for path in paths:
-        if not path.exists():
-            print(f"Warning: Path not found: {path}", file=sys.stderr)
-            continue
-
-        if not is_allowed_path(path):
-            print(f"Warning: Skipping path outside ~/.claude/projects: {path}", file=sys.stderr)
-            continue
-
-        if path.is_file():
-            if path.suffix == ".jsonl":
-                jsonl_files.append(path)
-            else:
-                print(f"Warning: Skipping non-JSONL file: {path}", file=sys.stderr)
-        elif path.is_dir():
-            jsonl_files.extend(sorted(path.rglob("*.jsonl")))
-
-    return jsonl_files
-
-
-def parse_session(jsonl_path: Path) -> list[dict]:
-    """Parse JSONL file and return entries in order."""
-    entries = []
-
-    with open(jsonl_path) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-
-            try:
-                entry = json.loads(line)
-                entries.append(entry)
-            except json.JSONDecodeError:
-                continue
-
-    return entries
-
-
-def extract_text_content(entry: dict) -> str:
-    """Extract all text content from an entry."""
-    message = entry.get("message", {})
-    content = message.get("content", [])
-
-    texts = []
-
-    if isinstance(content, str):
-        texts.append(content)
-    elif isinstance(content, list):
-        for item in content:
-            if isinstance(item, str):
-                texts.append(item)
-            elif isinstance(item, dict):
-                if item.get("type") == "text":
-                    texts.append(item.get("text", ""))
-                elif item.get("type") == "tool_result":
-                    result_content = item.get("content", "")
-                    if isinstance(result_content, str):
-                        texts.append(result_content)
-
-    return "\n".join(texts)
-
+def find_hook_traces(jsonl_path: Path, stats: ReadStats | None = None, found: dict | None = None) -> dict:
+    """Stream a JSONL file once: entry count, and entries with hook-related content.
 
-def find_hook_traces(entries: list[dict]) -> list[dict]:
-    """Find entries that contain hook-related content."""
-    traces = []
+    Given `stats` and what was `found` up to there, reads on and adds to it.
+    """
+    if found is None:
+        found = {"entry_count": 0, "traces": []}
+    traces = found["traces"]
 
-    for entry in entries:
-        text = extract_text_content(entry)
+    for entry, events in by_entry(read_events(jsonl_path, stats=stats, partial=stats is None)):
+        found["entry_count"] += 1
+        text = entry_text(events)
         if not text:
             continue
 
@@ -132,24 +71,20 @@ def find_hook_traces(entries: list[dict]) -> list[dict]:
                 })
 
         # Also check for system-reminder tags specifically
-        system_reminders = re.findall(
-            r"<system-reminder>(.*?)</system-reminder>",
-            text,
-            re.DOTALL
-        )
+        system_reminders = [e.text for e in events if isinstance(e, SystemReminder)]
 
         if matches or system_reminders:
             trace = {
-                "uuid": entry.get("uuid"),
-                "timestamp": entry.get("timestamp"),
-                "type": entry.get("type"),
-                "role": entry.get("message", {}).get("role"),
+                "uuid": entry.uuid,
+                "timestamp": entry.timestamp,
+                "type": entry.type,
+                "role": entry.role,
                 "hook_matches": matches,
                 "system_reminders": [r[:500] for r in system_reminders],  # Truncate
             }
             traces.append(trace)
 
-    return traces
+    return found
 
 
 def categorize_hooks(traces: list[dict]) -> dict[str, list[dict]]:
@@ -174,15 +109,15 @@ def categorize_hooks(traces: list[dict]) -> dict[str, list[dict]]:
     return dict(categories)
 
 
-def trace_hooks(jsonl_path: Path) -> dict:
-    """Generate hook trace for a session."""
-    entries = parse_session(jsonl_path)
-    traces = find_hook_traces(entries)
+def trace_hooks(jsonl_path: Path, checkpoints: Checkpoints | None = None) -> dict:
+    """Generate hook trace for a session, picking up from checkpoints if given."""
+    found = checkpoints.advance(jsonl_path, find_hook_traces) if checkpoints else find_hook_traces(jsonl_path)
+    traces = found["traces"]
     categories = categorize_hooks(traces)
 
     return {
         "file_path": str(jsonl_path.resolve()),
-        "entry_count": len(entries),
+        "entry_count": found["entry_count"],
         "hook_traces": len(traces),
         "categories": categories,
         "traces": traces,
@@ -249,6 +184,8 @@ def main():
         action="store_true",
         help="Output results as JSON",
     )
+    add_since_last_argument(parser)
+    add_jobs_argument(parser)
     args = parser.parse_args()
 
     jsonl_files = collect_jsonl_files(args.paths)
@@ -257,8 +194,11 @@ def main():
         print("No valid JSONL files found.", file=sys.stderr)
         sys.exit(1)
 
-    for jsonl_file in jsonl_files:
-        result = trace_hooks(jsonl_file)
+    if args.since_last:
+        results = map_since_last(trace_hooks, jsonl_files, "trace-hooks")
+    else:
+        results = map_files(trace_hooks, jsonl_files, args.jobs)
+    for jsonl_file, result in zip(jsonl_files, results):
 
         if args.json:
             print(json.dumps(result))
@@ -0,0 +1,8 @@
+"""Pytest configuration for agent-meta tests."""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Send the index and checkpoints to tmp, away from the real cache."""
+    monkeypatch.setenv("AGENT_META_CACHE_DIR", str(tmp_path / "cache"))
@@ -0,0 +1,13 @@
+"""The analysis scripts, imported as modules despite their hyphenated names."""
+import importlib.util
+from pathlib import Path
+
+SCRIPTS = Path(__file__).resolve().parent.parent / "scripts"
+
+
+def load_script(name: str):
+    """Import `scripts/<name>.py`, e.g. ``load_script("identify-skills")``."""
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), SCRIPTS / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
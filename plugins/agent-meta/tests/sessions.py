@@ -0,0 +1,93 @@
+"""Builders for small transcripts, one JSON entry per line."""
+import json
+from pathlib import Path
+
+
+def assistant(uuid, parent, *content, timestamp="2026-01-01T00:00:00Z"):
+    return {
+        "type": "assistant",
+        "uuid": uuid,
+        "parentUuid": parent,
+        "timestamp": timestamp,
+        "message": {"role": "assistant", "content": list(content)},
+    }
+
+
+def user(uuid, parent, *content, timestamp="2026-01-01T00:00:01Z"):
+    return {
+        "type": "user",
+        "uuid": uuid,
+        "parentUuid": parent,
+        "timestamp": timestamp,
+        "message": {"role": "user", "content": list(content)},
+    }
+
+
+def tool_use(tool_use_id, name, **tool_input):
+    return {"type": "tool_use", "id": tool_use_id, "name": name, "input": tool_input}
+
+
+def tool_result(tool_use_id, content, is_error=False):
+    return {"type": "tool_result", "tool_use_id": tool_use_id, "content": content, "is_error": is_error}
+
+
+def text(value):
+    return {"type": "text", "text": value}
+
+
+def lines(entries) -> bytes:
+    return b"".join(json.dumps(entry).encode() + b"\n" for entry in entries)
+
+
+def write_jsonl(path: Path, entries, tail: bytes = b"") -> Path:
+    """Write `entries` to `path`, then `tail` (say, half a line) as is."""
+    path.write_bytes(lines(entries) + tail)
+    return path
+
+
+def append_jsonl(path: Path, entries, tail: bytes = b"") -> Path:
+    with open(path, "ab") as f:
+        f.write(lines(entries) + tail)
+    return path
+
+
+def failing_session(n: int, prefix: str = "") -> list:
+    """`n` Bash calls, each answered by an error, chained parent to child."""
+    entries = []
+    parent = None
+    for i in range(n):
+        call, result = f"{prefix}a{i}", f"{prefix}u{i}"
+        entries.append(assistant(call, parent, tool_use(f"{prefix}t{i}", "Bash", command=f"cat /tmp/x{i}")))
+        entries.append(user(result, call, tool_result(f"{prefix}t{i}", f"cat: /tmp/x{i}: No such file", is_error=True)))
+        parent = result
+    return entries
+
+
+def varied_session(n: int) -> list:
+    """A session of `n` Bash calls with something in it for every script.
+
+    It has failures (some with tool_use ids used before), routing
+    suggestions, hook output in system reminders, and a user instruction
+    repeated every fifth call.
+    """
+    entries = []
+    parent = None
+    for i in range(n):
+        tool_use_id = f"t{i % 7}" if i % 5 == 4 else f"t{i}"  # replayed now and then
+        stamp = f"2026-01-01T00:{i // 60:02d}:{i % 60:02d}Z"
+        command = ["cat src/a.py", "grep -rn foo .", "ls *.py", f"make test-{i}"][i % 4]
+        call = assistant(f"a{i}", parent, text(f"step {i}"), tool_use(tool_use_id, "Bash", command=command),
+                         timestamp=stamp)
+        failed = i % 3 == 0
+        output = f"cat: /src/a{i}.py: No such file or directory" if failed else "ok"
+        if i % 4 == 1:
+            output += "\nSuggestion: Use Read instead of Bash"
+        if i % 6 == 2:
+            output += "\n<system-reminder>hook additional context: lint</system-reminder>"
+        result = user(f"u{i}", call["uuid"], tool_result(tool_use_id, output, is_error=failed), timestamp=stamp)
+        entries += [call, result]
+        parent = result["uuid"]
+        if i % 5 == 0:
+            entries.append(user(f"m{i}", parent, text("please run the tests again before committing")))
+            parent = f"m{i}"
+    return entries
@@ -0,0 +1,48 @@
+import json
+import random
+import re
+
+from .scripts import load_script
+from .sessions import assistant, text, tool_use, user, varied_session, write_jsonl
+
+
+class TestRoutingPrefilter:
+    def setup_method(self):
+        self.analyze_routing = load_script("analyze-routing")
+
+    def _could_match(self, entry):
+        line = json.dumps(entry).encode() + b"\n"
+        return self.analyze_routing.is_routing_line(line)
+
+    def test_every_suggestion_pattern_passes(self):
+        rng = random.Random(0)
+        samples = [
+            "Suggestion: Use Read instead of Bash",
+            "consider using Grep tool instead",
+            "PREFER Glob over find",
+            "tool-routing: this suggests Read",
+            "Suggestion:\n  use Read instead of cat",
+        ]
+        for sample in samples:
+            for _ in range(20):
+                varied = "".join(c.upper() if rng.random() < 0.5 else c.lower() for c in sample)
+                assert any(re.search(p, varied, re.IGNORECASE) for p in self.analyze_routing.SUGGESTION_PATTERNS)
+                assert self._could_match(user("u", None, text(f"x {varied} y"))), varied
+                assert self._could_match(user("u", None, {"type": "tool_result", "tool_use_id": "t", "content": varied}))
+
+    def test_tool_calls_pass(self):
+        assert self._could_match(assistant("a", None, tool_use("t", "Bash", command="ls")))
+        line = json.dumps(assistant("a", None, tool_use("t", "Bash")), separators=(",", ":")).encode()
+        assert self.analyze_routing.is_routing_line(line)
+
+    def test_unrelated_lines_are_rejected(self):
+        assert not self._could_match(user("u", None, text("all tests passed")))
+        # A tool_use mentioned in a string isn't a call.
+        assert not self._could_match(user("u", None, text('{"type": "tool_use"}')))
+
+    def test_same_analysis_as_without_the_prefilter(self, tmp_path, monkeypatch):
+        path = write_jsonl(tmp_path / "s.jsonl", varied_session(30))
+        filtered = self.analyze_routing.analyze_suggestions(path)
+        monkeypatch.setattr(self.analyze_routing, "is_routing_line", lambda line: True)
+        assert self.analyze_routing.analyze_suggestions(path) == filtered
+        assert filtered["analyzed"]
@@ -0,0 +1,172 @@
+import json
+import os
+
+import pytest
+
+from agent_meta.checkpoint import Checkpoints, map_since_last
+from agent_meta.transcripts import Entry, ReadStats, read_events
+
+from .scripts import load_script
+from .sessions import failing_session, lines, varied_session, write_jsonl
+
+
+def _count_entries(path, stats, state):
+    """A minimal `advance` reader: how many entries, and their uuids."""
+    state = state or {"uuids": []}
+    for event in read_events(path, stats=stats, partial=False):
+        if isinstance(event, Entry):
+            state["uuids"].append(event.uuid)
+    return state
+
+
+class TestCheckpoints:
+    def test_first_read_starts_from_scratch(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", failing_session(1))
+        checkpoints = Checkpoints("t", tmp_path / "cp.json")
+        stats, state = checkpoints.resume(path)
+        assert (stats.offset, stats.entries, state) == (0, 0, None)
+
+    def test_resumes_over_a_trailing_partial_line(self, tmp_path):
+        whole = lines(failing_session(2))
+        cut = whole.rindex(b"\n", 0, -1) + 10  # mid-way into the last line
+        path = tmp_path / "s.jsonl"
+        path.write_bytes(whole[:cut])
+
+        with Checkpoints("t", tmp_path / "cp.json") as checkpoints:
+            state = checkpoints.advance(path, _count_entries)
+        assert state["uuids"] == ["a0", "u0", "a1"]
+
+        with open(path, "ab") as f:
+            f.write(whole[cut:])
+        checkpoints = Checkpoints("t", tmp_path / "cp.json")
+        stats, _ = checkpoints.resume(path)
+        assert stats.offset == whole.rindex(b"\n", 0, -1) + 1
+        assert stats.entries == 3
+        assert checkpoints.advance(path, _count_entries)["uuids"] == ["a0", "u0", "a1", "u1"]
+
+    def test_unchanged_file_is_not_read(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", failing_session(1))
+        with Checkpoints("t", tmp_path / "cp.json") as checkpoints:
+            checkpoints.advance(path, _count_entries)
+
+        def not_read(path, stats, state):
+            raise AssertionError("read an unchanged file")
+
+        assert Checkpoints("t", tmp_path / "cp.json").advance(path, not_read) == {"uuids": ["a0", "u0"]}
+
+    def test_lines_written_during_a_read_are_read_next_time(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", failing_session(1))
+        checkpoints = Checkpoints("t", tmp_path / "cp.json")
+
+        def read_then_grow(path, stats, state):
+            state = _count_entries(path, stats, state)
+            with open(path, "ab") as f:
+                f.write(lines(failing_session(1, prefix="b")))
+            return state
+
+        assert checkpoints.advance(path, read_then_grow)["uuids"] == ["a0", "u0"]
+        assert checkpoints.advance(path, _count_entries)["uuids"] == ["a0", "u0", "ba0", "bu0"]
+
+    def test_shrunk_file_starts_over_even_past_the_offset(self, tmp_path):
+        whole = lines(failing_session(1))
+        path = tmp_path / "s.jsonl"
+        path.write_bytes(whole + b'{"uuid": "still being written')
+        checkpoints = Checkpoints("t", tmp_path / "cp.json")
+        checkpoints.advance(path, _count_entries)
+        assert checkpoints.files[str(path.resolve())]["offset"] == len(whole)
+
+        # Rewritten in place, shorter than when it was read but not than the offset.
+        path.write_bytes(whole + b"{")
+        assert checkpoints.resume(path) == (ReadStats(), None)
+
+    def test_replaced_file_starts_over(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", failing_session(1))
+        checkpoints = Checkpoints("t", tmp_path / "cp.json")
+        checkpoints.advance(path, _count_entries)
+        os.replace(write_jsonl(tmp_path / "new.jsonl", failing_session(2, prefix="b")), path)
+        assert checkpoints.advance(path, _count_entries)["uuids"] == ["ba0", "bu0", "ba1", "bu1"]
+
+    def test_save_drops_vanished_transcripts(self, tmp_path):
+        kept = write_jsonl(tmp_path / "kept.jsonl", failing_session(1))
+        gone = write_jsonl(tmp_path / "gone.jsonl", failing_session(1))
+        with Checkpoints("t", tmp_path / "cp.json") as checkpoints:
+            checkpoints.advance(kept, _count_entries)
+            checkpoints.advance(gone, _count_entries)
+            gone.unlink()
+        saved = json.loads((tmp_path / "cp.json").read_text())
+        assert list(saved["files"]) == [str(kept.resolve())]
+
+    def test_save_without_a_writable_cache_is_a_no_op(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", failing_session(1))
+        (tmp_path / "not-a-dir").write_text("")
+        with Checkpoints("t", tmp_path / "not-a-dir" / "cp.json") as checkpoints:
+            assert checkpoints.advance(path, _count_entries)["uuids"] == ["a0", "u0"]
+        assert (tmp_path / "not-a-dir").read_text() == ""
+
+    def test_other_versions_are_ignored(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", failing_session(1))
+        (tmp_path / "cp.json").write_text(json.dumps({"version": 0, "files": {
+            str(path.resolve()): {"inode": path.stat().st_ino, "offset": 0, "entries": 9, "state": {}},
+        }}))
+        assert Checkpoints("t", tmp_path / "cp.json").files == {}
+
+    def test_default_path_is_in_the_cache_dir(self, tmp_path):
+        assert Checkpoints("find-failures").path == tmp_path / "cache" / "checkpoints" / "find-failures.json"
+
+    def test_map_since_last_saves(self, tmp_path):
+        paths = [
+            write_jsonl(tmp_path / "a.jsonl", failing_session(1)),
+            write_jsonl(tmp_path / "b.jsonl", failing_session(2)),
+        ]
+
+        def count(path, checkpoints):
+            return len(checkpoints.advance(path, _count_entries)["uuids"])
+
+        assert list(map_since_last(count, paths, "t")) == [2, 4]
+        assert len(Checkpoints("t").files) == 2
+
+
+# (script, its --since-last function, its full-run function)
+_SCRIPTS = {
+    "identify-skills": ("identify_skills", "identify_skills"),
+    "summarize-session": ("summarize_session_since_last", "summarize_session"),
+    "analyze-routing": ("analyze_routing", "analyze_routing"),
+    "find-failures": ("find_failures_since_last", "find_failures"),
+    "trace-hooks": ("trace_hooks", "trace_hooks"),
+}
+
+
+@pytest.mark.parametrize("script", sorted(_SCRIPTS))
+def test_since_last_matches_a_full_run(tmp_path, script):
+    """Grow a session in steps, each ending mid-line; every --since-last run
+    matches a full run over the whole lines so far."""
+    module = load_script(script)
+    since_last, full = (getattr(module, name) for name in _SCRIPTS[script])
+    whole = lines(varied_session(40))
+    path = tmp_path / "s.jsonl"
+    checkpoint_file = tmp_path / "cp.json"
+
+    newlines = [i for i, byte in enumerate(whole) if byte == ord("\n")]
+    # Cut a third of the way into every seventh line, then finish the file.
+    cuts = [start + (end - start) // 3 for start, end in zip(newlines[::7], newlines[1::7])] + [len(whole)]
+    for cut in cuts:
+        path.write_bytes(whole[:cut])
+        with Checkpoints(script, checkpoint_file) as checkpoints:
+            resumed = since_last(path, checkpoints)
+        assert resumed == full(path)
+
+    # Run again over the finished file: nothing is read, the saved results stand.
+    with Checkpoints(script, checkpoint_file) as checkpoints:
+        assert since_last(path, checkpoints) == full(path)
+
+
+def test_since_last_cross_session_patterns_match(tmp_path):
+    identify_skills = load_script("identify-skills")
+    whole = lines(varied_session(30))
+    path = tmp_path / "s.jsonl"
+    for cut in (len(whole) // 3, len(whole) // 2 + 7, len(whole)):
+        path.write_bytes(whole[:cut])
+        with Checkpoints("identify-skills", tmp_path / "cp.json") as checkpoints:
+            resumed = identify_skills.session_patterns(path, checkpoints)
+        # The saved state went through JSON, keys and all.
+        assert resumed == identify_skills.session_patterns(path)
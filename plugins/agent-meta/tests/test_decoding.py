@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from agent_meta import transcripts
+from agent_meta.transcripts import decode_entry, read_events
+
+from .sessions import lines, varied_session
+
+# Lines that take the decoders off their happy path.
+ODD_LINES = [
+    b'{"type": "user", "uuid": "s1", "message": "just a string"}\n',  # schema mismatch
+    b'[1, 2, 3]\n',  # valid JSON, not an entry
+    b'"a string"\n',
+    b'{"type": "user", "uuid": "s2", "message": {"role": "user", "content": "lone \\ud800 surrogate"}}\n',
+    b'{"type": "user", "uuid": "s3", "timestamp": NaN, "message": {"content": "nan"}}\n',
+    b'{"type": "user", "uuid": "s4", "message": {"content": [{"type": "text", "text": "big"}]}, "n": 18446744073709551616}\n',
+    b'{"uuid": 5, "parentUuid": ["x"], "timestamp": 1700000000, "message": {"role": 1, "content": 7}}\n',
+    b'{"type": "assistant", "uuid": "s6", "message": {"content": [5, "text item", '
+    b'{"type": "tool_use", "id": "t", "name": "Bash", "input": {"command": "ls"}}]}}\n',
+    b'{"type": "user", "uuid": "s7", "message": null}\n',
+    b'{"type": "user", "uuid": "s8", "message": {"content": null}, "extra": {"deep": [1, {"a": 2}]}}\n',
+    b'{"uuid": "s9", "uuid": "s9-last"}\n',
+    b'\n',
+    b'   \n',
+    b'{"uuid": "half\n',
+    b'{"uuid": "s10"} trailing\n',
+    b'\xff\xfe not utf-8\n',
+]
+
+
+def _backends():
+    backends = [pytest.param(json.loads, id="json")]
+    backends.append(pytest.param(
+        transcripts.orjson.loads if transcripts.orjson else None, id="orjson",
+        marks=pytest.mark.skipif(transcripts.orjson is None, reason="orjson not installed"),
+    ))
+    backends.append(pytest.param(
+        getattr(transcripts, "_decode_msgspec", None), id="msgspec",
+        marks=pytest.mark.skipif(transcripts.msgspec is None, reason="msgspec not installed"),
+    ))
+    return backends
+
+
+@pytest.fixture
+def session(tmp_path):
+    path = tmp_path / "s.jsonl"
+    path.write_bytes(lines(varied_session(20)) + b"".join(ODD_LINES))
+    return path
+
+
+def _events(path, loads, monkeypatch):
+    monkeypatch.setattr(transcripts, "_fast_loads", loads)
+    return list(read_events(path))
+
+
+@pytest.mark.parametrize("loads", _backends())
+def test_backends_read_the_same_events(session, loads, monkeypatch):
+    expected = _events(session, json.loads, monkeypatch)
+    assert _events(session, loads, monkeypatch) == expected
+
+
+@pytest.mark.parametrize("loads", _backends())
+def test_odd_lines(loads, monkeypatch):
+    monkeypatch.setattr(transcripts, "_fast_loads", loads)
+    decoded = [decode_entry(line) for line in ODD_LINES]
+    uuids = [entry and entry.get("uuid") for entry in decoded]
+    assert uuids == [
+        "s1", None, None, "s2", "s3", "s4", 5, "s6", "s7", "s8", "s9-last",
+        None, None, None, None, None,
+    ]
+    # Shapes the schema rejects fall back to the whole line, as json has it.
+    assert decoded[0]["message"] == "just a string"
+    assert decoded[3]["message"]["content"] == "lone \ud800 surrogate"
+
+
+@pytest.mark.skipif(transcripts.msgspec is None, reason="msgspec not installed")
+def test_msgspec_decodes_only_the_schema_fields():
+    line = b'{"type": "user", "uuid": "u", "costUSD": 1.5, "message": {"role": "user", "content": "hi", "usage": {}}}'
+    assert transcripts._decode_msgspec(line) == {
+        "type": "user", "uuid": "u", "parentUuid": None, "timestamp": None,
+        "message": {"role": "user", "content": "hi"},
+    }
+
+
+class TestBackendOverride:
+    def _select(self, monkeypatch, wanted):
+        monkeypatch.setenv("AGENT_META_JSON", wanted)
+        return transcripts._select_decoder()
+
+    def test_json_is_always_available(self, monkeypatch):
+        assert self._select(monkeypatch, "json") == ("json", json.loads)
+
+    def test_unknown_value_means_the_stdlib(self, monkeypatch):
+        assert self._select(monkeypatch, "simplejson")[0] == "json"
+
+    def test_orjson(self, monkeypatch):
+        name, _ = self._select(monkeypatch, "orjson")
+        assert name == ("orjson" if transcripts.orjson else "json")
+
+    def test_default_is_the_fastest_installed(self, monkeypatch):
+        name, _ = self._select(monkeypatch, "")
+        if transcripts.msgspec:
+            assert name == "msgspec"
+        elif transcripts.orjson:
+            assert name == "orjson"
+        else:
+            assert name == "json"
+
+    def test_missing_backend_falls_back(self, monkeypatch):
+        monkeypatch.setattr(transcripts, "msgspec", None)
+        monkeypatch.setattr(transcripts, "orjson", None)
+        assert self._select(monkeypatch, "msgspec") == ("json", json.loads)
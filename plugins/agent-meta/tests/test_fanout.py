@@ -0,0 +1,47 @@
+import argparse
+import os
+
+import pytest
+
+from agent_meta.fanout import add_jobs_argument, map_files
+
+
+def _files(tmp_path, sizes):
+    paths = []
+    for i, size in enumerate(sizes):
+        path = tmp_path / f"{i}.jsonl"
+        path.write_bytes(b"x" * size)
+        paths.append(path)
+    return paths
+
+
+class TestMapFiles:
+    def test_serial(self, tmp_path):
+        paths = _files(tmp_path, [3, 1, 2])
+        assert list(map_files(os.path.getsize, paths)) == [3, 1, 2]
+
+    def test_parallel_results_come_back_in_input_order(self, tmp_path):
+        # The largest file is handed out first, but still comes back in place.
+        paths = _files(tmp_path, [1, 50, 2, 40, 3])
+        assert list(map_files(os.path.getsize, paths, jobs=2)) == [1, 50, 2, 40, 3]
+
+    def test_one_per_cpu(self, tmp_path):
+        paths = _files(tmp_path, [1, 2])
+        assert list(map_files(os.path.getsize, paths, jobs=0)) == [1, 2]
+
+    def test_worker_errors_propagate(self, tmp_path):
+        paths = _files(tmp_path, [1, 2])
+        paths[1].unlink()
+        with pytest.raises(OSError):
+            list(map_files(os.path.getsize, paths, jobs=2))
+
+    def test_no_files(self):
+        assert list(map_files(os.path.getsize, [], jobs=4)) == []
+
+
+def test_jobs_argument():
+    parser = argparse.ArgumentParser()
+    add_jobs_argument(parser)
+    assert parser.parse_args([]).jobs == 1
+    assert parser.parse_args(["-j", "0"]).jobs == 0
+    assert parser.parse_args(["--jobs", "4"]).jobs == 4
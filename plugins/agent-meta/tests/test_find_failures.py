@@ -0,0 +1,140 @@
+import json
+
+from agent_meta.checkpoint import Checkpoints
+from agent_meta.index import TranscriptIndex
+
+from .scripts import load_script
+from .sessions import (
+    assistant,
+    failing_session,
+    lines,
+    tool_result,
+    tool_use,
+    user,
+    varied_session,
+    write_jsonl,
+)
+
+
+def _pairs(failures):
+    return [(f["response_uuid"], f["request_uuid"]) for f in failures]
+
+
+class TestFastPath:
+    """`find_failures` decodes only the lines it finds by byte search; it
+    must agree with a full decode."""
+
+    def setup_method(self):
+        self.find_failures = load_script("find-failures")
+
+    def test_matches_a_full_pass(self, tmp_path):
+        for n in (1, 4, 13, 40):
+            path = write_jsonl(tmp_path / f"{n}.jsonl", varied_session(n))
+            assert self.find_failures.find_failures(path) == self.find_failures.find_failures_full(path)
+
+    def test_unique_ids_need_no_full_pass(self, tmp_path, monkeypatch):
+        path = write_jsonl(tmp_path / "s.jsonl", failing_session(3))
+        monkeypatch.setattr(self.find_failures, "find_failures_full", None)
+        assert _pairs(self.find_failures.find_failures(path)) == [("u0", "a0"), ("u1", "a1"), ("u2", "a2")]
+
+    def test_repeated_tool_use_id_falls_back_to_a_full_pass(self, tmp_path, monkeypatch):
+        # varied_session reuses t{i % 7} at i = 4, 9, 14: t0 is made twice.
+        path = write_jsonl(tmp_path / "s.jsonl", varied_session(15))
+        full = self.find_failures.find_failures_full
+        calls = []
+        monkeypatch.setattr(
+            self.find_failures, "find_failures_full", lambda *a, **kw: calls.append(a) or full(*a, **kw)
+        )
+        failures = self.find_failures.find_failures(path)
+        assert calls
+        assert failures == full(path)
+
+    def test_other_spacing_around_is_error(self, tmp_path):
+        entries = failing_session(1)
+        path = tmp_path / "s.jsonl"
+        path.write_bytes(
+            json.dumps(entries[0]).encode() + b"\n"
+            + json.dumps(entries[1], separators=(" , ", " : ")).encode() + b"\n"
+        )
+        assert _pairs(self.find_failures.find_failures(path)) == [("u0", "a0")]
+
+    def test_half_written_last_line_is_ignored(self, tmp_path):
+        whole = lines(failing_session(2))
+        path = tmp_path / "s.jsonl"
+        path.write_bytes(whole[:-20])
+        assert _pairs(self.find_failures.find_failures(path)) == [("u0", "a0")]
+
+    def test_since_last_waits_for_the_last_line_to_finish(self, tmp_path):
+        whole = lines(failing_session(2))
+        path = tmp_path / "s.jsonl"
+        # The last line is valid JSON, just not terminated yet.
+        path.write_bytes(whole[:-1])
+        with Checkpoints("find-failures", tmp_path / "cp.json") as checkpoints:
+            failures = self.find_failures.find_failures_since_last(path, checkpoints)
+        assert _pairs(failures) == [("u0", "a0")]
+        assert checkpoints.files[str(path.resolve())]["offset"] == whole.rindex(b"\n", 0, -1) + 1
+
+        path.write_bytes(whole)
+        with Checkpoints("find-failures", tmp_path / "cp.json") as checkpoints:
+            failures = self.find_failures.find_failures_since_last(path, checkpoints)
+        assert _pairs(failures) == [("u0", "a0"), ("u1", "a1")]
+
+    def test_error_without_a_tool_use_is_unknown(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", [
+            assistant("a0", None, tool_use("t0", "Bash", command="ls")),
+            user("u0", "a0", tool_result("t9", "boom", is_error=True)),
+        ])
+        [failure] = self.find_failures.find_failures(path)
+        assert (failure["request_uuid"], failure["tool_name"], failure["tool_use_id"]) == ("unknown", "unknown", "t9")
+
+
+class TestRepeatedEntryLines:
+    """A line written twice is one entry, as in the uuid → entry map the
+    script used to build: reported once, in its first copy's place."""
+
+    def setup_method(self):
+        self.find_failures = load_script("find-failures")
+
+    def _session(self, tmp_path):
+        entries = failing_session(3)
+        entries += [entries[3], entries[3]]  # u1's error, twice more
+        return write_jsonl(tmp_path / "s.jsonl", entries)
+
+    def test_fast_path(self, tmp_path):
+        path = self._session(tmp_path)
+        assert _pairs(self.find_failures.find_failures(path)) == [("u0", "a0"), ("u1", "a1"), ("u2", "a2")]
+
+    def test_full_pass(self, tmp_path):
+        path = self._session(tmp_path)
+        assert _pairs(self.find_failures.find_failures_full(path)) == [("u0", "a0"), ("u1", "a1"), ("u2", "a2")]
+
+    def test_index(self, tmp_path):
+        path = self._session(tmp_path)
+        with TranscriptIndex(tmp_path / "index.sqlite3") as index:
+            index.update([path])
+            failures = index.failures(index.file_id(path))
+        assert _pairs(failures) == [("u0", "a0"), ("u1", "a1"), ("u2", "a2")]
+
+    def test_copy_ahead_of_its_tool_use_resolves_from_the_last_copy(self, tmp_path):
+        entries = failing_session(2)
+        path = write_jsonl(tmp_path / "s.jsonl", [entries[3]] + entries)
+        for find in (self.find_failures.find_failures, self.find_failures.find_failures_full):
+            assert _pairs(find(path)) == [("u1", "a1"), ("u0", "a0")]
+
+    def test_copy_in_a_later_run_is_not_reported_again(self, tmp_path):
+        entries = failing_session(2)
+        path = write_jsonl(tmp_path / "s.jsonl", entries)
+        with Checkpoints("find-failures", tmp_path / "cp.json") as checkpoints:
+            self.find_failures.find_failures_since_last(path, checkpoints)
+        path.write_bytes(lines(entries + [entries[1]]))
+        with Checkpoints("find-failures", tmp_path / "cp.json") as checkpoints:
+            failures = self.find_failures.find_failures_since_last(path, checkpoints)
+        assert _pairs(failures) == [("u0", "a0"), ("u1", "a1")]
+
+    def test_replayed_ids_and_repeats(self, tmp_path):
+        entries = varied_session(30)
+        # Repeat a failure whose tool_use id is replayed later (u0/t0 and a14).
+        path = write_jsonl(tmp_path / "s.jsonl", entries + [entries[1]])
+        fast = self.find_failures.find_failures(path)
+        assert fast == self.find_failures.find_failures_full(path)
+        assert [uuid for uuid, _ in _pairs(fast)].count("u0") == 1
@@ -0,0 +1,134 @@
+import os
+
+from agent_meta.index import TranscriptIndex
+
+from .sessions import (
+    append_jsonl,
+    assistant,
+    failing_session,
+    text,
+    tool_use,
+    user,
+    write_jsonl,
+)
+
+
+def _index(tmp_path):
+    return TranscriptIndex(tmp_path / "index.sqlite3")
+
+
+class TestIncrementalIngest:
+    def test_new_file_is_ingested(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", failing_session(2))
+        with _index(tmp_path) as index:
+            stats = index.update([path])
+            file_id = index.file_id(path)
+            failures = index.failures(file_id)
+
+            assert (stats.added, stats.entries) == (1, 4)
+            assert index.entry_count(file_id) == 4
+        assert [f["request_uuid"] for f in failures] == ["a0", "a1"]
+        assert failures[1]["tool_input"] == {"command": "cat /tmp/x1"}
+        assert failures[1]["error_content"] == "cat: /tmp/x1: No such file"
+
+    def test_unchanged_file_is_skipped(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", failing_session(2))
+        with _index(tmp_path) as index:
+            index.update([path])
+            stats = index.update([path])
+        assert (stats.unchanged, stats.entries) == (1, 0)
+
+    def test_appended_lines_are_read_from_the_saved_offset(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", failing_session(2))
+        with _index(tmp_path) as index:
+            index.update([path])
+            # Blank out the first line in place: a re-read from the start
+            # would lose that entry.
+            with open(path, "r+b") as f:
+                first = f.readline()
+                f.seek(0)
+                f.write(b" " * (len(first) - 1))
+            append_jsonl(path, [assistant("a9", "u1", tool_use("t9", "Read", file_path="x"))])
+            stats = index.update([path])
+            file_id = index.file_id(path)
+
+            assert (stats.appended, stats.entries) == (1, 1)
+            assert index.entry_count(file_id) == 5
+            assert [c["uuid"] for c in index.tool_calls(file_id)] == ["a0", "a1", "a9"]
+
+    def test_truncated_file_is_reingested(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", failing_session(3))
+        with _index(tmp_path) as index:
+            index.update([path])
+            inode = path.stat().st_ino
+            write_jsonl(path, failing_session(1))  # same inode, shorter
+            assert path.stat().st_ino == inode
+            stats = index.update([path])
+            file_id = index.file_id(path)
+
+            assert (stats.reindexed, stats.entries) == (1, 2)
+            assert index.entry_count(file_id) == 2
+            assert len(index.failures(file_id)) == 1
+
+    def test_replaced_file_is_reingested(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", failing_session(1))
+        with _index(tmp_path) as index:
+            index.update([path])
+            # Same size, new inode.
+            replacement = write_jsonl(tmp_path / "new.jsonl", failing_session(1, prefix="b"))
+            os.replace(replacement, path)
+            stats = index.update([path])
+            file_id = index.file_id(path)
+
+            assert stats.reindexed == 1
+            assert [c["uuid"] for c in index.tool_calls(file_id)] == ["ba0"]
+
+    def test_trailing_partial_line_waits_for_the_next_run(self, tmp_path):
+        entries = failing_session(2)
+        whole = write_jsonl(tmp_path / "whole.jsonl", entries[-1:]).read_bytes()
+        path = write_jsonl(tmp_path / "s.jsonl", entries[:-1], tail=whole[:20])
+        with _index(tmp_path) as index:
+            stats = index.update([path])
+            assert stats.entries == 3
+
+            with open(path, "ab") as f:
+                f.write(whole[20:])
+            stats = index.update([path])
+            file_id = index.file_id(path)
+
+            assert (stats.appended, stats.entries) == (1, 1)
+            assert [f["response_uuid"] for f in index.failures(file_id)] == ["u0", "u1"]
+
+    def test_system_reminders_and_timestamps(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", [
+            user("u0", None, text("hi <system-reminder>be brief</system-reminder>")),
+            assistant("a0", "u0", text("ok"), timestamp=1767225600000),
+        ])
+        with _index(tmp_path) as index:
+            index.update([path])
+            file_id = index.file_id(path)
+            reminders = index.conn.execute(
+                "SELECT text FROM system_reminders WHERE file_id = ?", (file_id,)
+            ).fetchall()
+
+            assert reminders == [("be brief",)]
+            assert index.timestamps(file_id) == ["2026-01-01T00:00:01Z", 1767225600000]
+
+    def test_deleted_files_are_pruned(self, tmp_path):
+        kept = write_jsonl(tmp_path / "kept.jsonl", failing_session(1))
+        gone = write_jsonl(tmp_path / "gone.jsonl", failing_session(1))
+        with _index(tmp_path) as index:
+            index.update([kept, gone])
+            gone.unlink()
+
+            assert index.prune() == 1
+            assert index.file_id(kept) is not None
+            assert index.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 2
+
+    def test_rebuild_starts_over(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", failing_session(1))
+        with _index(tmp_path) as index:
+            index.update([path])
+            index.rebuild()
+            stats = index.update([path])
+        assert (stats.added, stats.entries) == (1, 2)
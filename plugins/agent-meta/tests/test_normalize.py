@@ -0,0 +1,88 @@
+import random
+import re
+
+from agent_meta.normalize import Normalizer
+
+from .scripts import load_script
+
+_STEPS = [(r"/[\w/.-]+", "<path>"), (r"\d+", "<n>")]
+
+
+def _reference(text, limit=150):
+    """Normalize everything, then cut: what a Normalizer must match."""
+    for pattern, replacement in _STEPS:
+        text = re.sub(pattern, replacement, text)
+    return text[:limit]
+
+
+def _fuzz_strings(n, seed=0):
+    rng = random.Random(seed)
+    alphabet = ["/", "a", "Z", "_", ".", "-", "0", "42", " ", "\n", ":", "é", "/usr/lib/x-1.2", "<", ">"]
+    for _ in range(n):
+        yield "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 120)))
+
+
+class TestNormalizer:
+    def test_masks_paths_and_numbers(self):
+        normalize = Normalizer(_STEPS)
+        assert normalize("cat: /tmp/x1.py: line 12") == "cat: <path>: line <n>"
+
+    def test_cuts_to_limit(self):
+        normalize = Normalizer(_STEPS, limit=10)
+        assert normalize("error 1 " * 100) == "error <n> "
+
+    def test_stops_reading_once_the_limit_is_reached(self):
+        class Endless(str):
+            def __getitem__(self, index):
+                if isinstance(index, slice) and index.start and index.start > 1000:
+                    raise AssertionError("read past the limit")
+                return str.__getitem__(self, index)
+
+        text = Endless("x" * 100 + " /a/b" * 10_000)
+        assert Normalizer(_STEPS, chunk=64)(text) == _reference(text)
+
+    def test_then_appends_a_step(self):
+        normalize = Normalizer(_STEPS[:1]).then(r"\d+", "<n>")
+        assert normalize("/a/b 7") == "<path> <n>"
+        assert len(Normalizer(_STEPS[:1]).steps) == 1
+
+    def test_chunked_matches_whole_text(self):
+        for chunk in (1, 2, 3, 5, 8, 17, 64, 256):
+            normalize = Normalizer(_STEPS, limit=40, chunk=chunk)
+            for text in _fuzz_strings(1500, seed=chunk):
+                assert normalize(text) == _reference(text, limit=40), (chunk, text)
+
+    def test_long_token_runs_are_not_split(self):
+        text = "/" + "a" * 1000 + " 12"
+        assert Normalizer(_STEPS, chunk=16)(text) == _reference(text)
+
+
+class TestIdentifySkillsMatchers:
+    """The one-pass matchers agree with the per-call regexes they replaced."""
+
+    def setup_method(self):
+        self.identify_skills = load_script("identify-skills")
+        self.bench = load_script("bench-identify-skills")
+
+    def test_misuse_matcher_finds_each_pattern_present(self):
+        rng = random.Random(1)
+        words = ["cat", "head", "tail", "grep", "rg", "find", "ls", "concat", "-n", "*", "x", "|", "&&"]
+        for _ in range(3000):
+            command = "".join(rng.choice(words) + rng.choice([" ", "", "\t", "/"]) for _ in range(rng.randint(0, 8)))
+            found = {
+                int(match.lastgroup[1:])
+                for match in self.identify_skills._BASH_MISUSE_MATCHER.finditer(command)
+            }
+            expected = {
+                i for i, (pattern, _, _) in enumerate(self.identify_skills.BASH_MISUSE)
+                if re.search(pattern, command)
+            }
+            assert found == expected, command
+
+    def test_same_candidates_as_the_old_regexes(self):
+        calls = self.bench.synthetic_tool_calls(600, seed=3)
+        assert self.identify_skills.find_tool_misuse(calls) == self.bench.baseline_find_tool_misuse(calls)
+        assert (
+            self.identify_skills.find_repeated_failures(calls)
+            == self.bench.baseline_find_repeated_failures(calls)
+        )
@@ -0,0 +1,35 @@
+"""The scripts moved onto the shared reader still say what they said before.
+
+The fixtures are the output of the scripts as they were when each decoded
+whole transcripts with its own `parse_session`, run on `varied_session(40)`.
+"""
+import json
+from pathlib import Path
+
+import pytest
+
+from .scripts import load_script
+from .sessions import varied_session, write_jsonl
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+# script -> (analysis function, formatter)
+_SCRIPTS = {
+    "summarize-session": ("summarize_session", "format_summary"),
+    "analyze-routing": ("analyze_routing", "format_analysis"),
+    "trace-hooks": ("trace_hooks", "format_trace"),
+}
+
+
+@pytest.mark.parametrize("script", sorted(_SCRIPTS))
+def test_same_output_as_before(tmp_path, script):
+    module = load_script(script)
+    analyze, format_result = (getattr(module, name) for name in _SCRIPTS[script])
+    path = write_jsonl(tmp_path / "session.jsonl", varied_session(40))
+
+    result = analyze(path)
+    as_json = json.dumps(result, indent=2).replace(str(path.resolve()), "<path>")
+    text = format_result(result).replace(str(path.resolve()), "<path>")
+
+    assert json.loads(as_json) == json.loads((FIXTURES / f"{script}.json").read_text())
+    assert text + "\n" == (FIXTURES / f"{script}.txt").read_text()
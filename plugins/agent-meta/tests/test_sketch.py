@@ -0,0 +1,127 @@
+import random
+from collections import Counter
+
+from agent_meta.sketch import CountMinSketch, TopKCounter
+
+from .scripts import load_script
+from .sessions import failing_session, write_jsonl
+
+
+def _zipf_stream(n, keys, seed=0):
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, keys + 1)]
+    return rng.choices(range(keys), weights, k=n)
+
+
+def _key_bytes(key):
+    return str(key).encode()
+
+
+class TestCountMinSketch:
+    def test_never_undercounts(self):
+        sketch = CountMinSketch(width=64, depth=3)
+        exact = Counter(_zipf_stream(5000, 500))
+        for key, count in exact.items():
+            sketch.add(_key_bytes(key), count)
+        assert sketch.total == 5000
+        assert all(sketch.estimate(_key_bytes(key)) >= count for key, count in exact.items())
+
+    def test_exact_when_wide(self):
+        sketch = CountMinSketch()
+        assert sketch.add(b"a") == 1
+        assert sketch.add(b"a", 4) == 5
+        assert sketch.estimate(b"a") == 5
+        assert sketch.estimate(b"b") == 0
+
+    def test_same_estimates_on_every_run(self):
+        # BLAKE2b, not the per-process salted hash().
+        first, second = CountMinSketch(width=16, depth=2), CountMinSketch(width=16, depth=2)
+        for key in range(100):
+            first.add(_key_bytes(key))
+            second.add(_key_bytes(key))
+        assert first._rows == second._rows
+
+
+class TestTopKCounter:
+    def test_keeps_details_of_top_keys(self):
+        top = TopKCounter(2, _key_bytes)
+        top.add("a", new_details=list).append(1)
+        top.add("a", new_details=list).append(2)
+        assert top.add("b", new_details=list) == []
+        assert top.items() == [("a", 2, [1, 2]), ("b", 1, [])]
+
+    def test_newcomer_at_the_floor_is_only_counted(self):
+        top = TopKCounter(2, _key_bytes)
+        top.add("a")
+        top.add("b")
+        assert top.add("c", new_details=dict) is None
+        assert "c" not in top
+        assert top.sketch.estimate(b"c") == 1
+
+    def test_newcomer_that_outranks_the_smallest_evicts_it(self):
+        top = TopKCounter(2, _key_bytes)
+        top.add("a", 3)
+        top.add("b")
+        top.add("c")  # ties b: stays out
+        assert top.add("c", new_details=lambda: "c's") == "c's"
+        assert [key for key, _, _ in top.items()] == ["a", "c"]
+        assert len(top) == 2
+
+    def test_stale_heap_entries_are_skipped(self):
+        top = TopKCounter(2, _key_bytes)
+        top.add("a")
+        top.add("b")
+        for _ in range(5):
+            top.add("a")  # leaves stale (1, a), (2, a), ... behind
+        top.add("c")
+        top.add("c")
+        assert [key for key, _, _ in top.items()] == ["a", "c"]
+
+    def test_heap_is_compacted(self):
+        top = TopKCounter(2, _key_bytes)
+        for _ in range(50):
+            top.add("a")
+        assert len(top._heap) <= 4 * top.capacity + 1
+
+    def test_top_keys_match_exact_counts_on_a_zipf_stream(self):
+        stream = _zipf_stream(100_000, 20_000)
+        top = TopKCounter(200, _key_bytes)
+        for key in stream:
+            top.add(key)
+
+        exact = Counter(stream).most_common(20)
+        found = top.items()[:20]
+        assert [key for key, _, _ in found] == [key for key, _ in exact]
+        overcounts = [count - exact_count for (_, count, _), (_, exact_count) in zip(found, exact)]
+        assert 0 <= min(overcounts) and max(overcounts) <= 0.002 * len(stream)
+
+
+class TestRecurringPatterns:
+    def test_reports_patterns_from_more_than_one_session(self, tmp_path):
+        identify_skills = load_script("identify-skills")
+        recurring = identify_skills.RecurringPatterns()
+        sessions = [
+            write_jsonl(tmp_path / "a.jsonl", failing_session(3)),
+            write_jsonl(tmp_path / "b.jsonl", failing_session(2, prefix="b")),
+            write_jsonl(tmp_path / "c.jsonl", []),
+        ]
+        for path in sessions:
+            recurring.add(identify_skills.session_patterns(path))
+
+        report = recurring.report(top=10)
+        assert (report["session_count"], report["tool_call_count"], report["failure_count"]) == (3, 5, 5)
+        [failure] = report["recurring_failures"]
+        assert failure["tool"] == "Bash"
+        assert failure["pattern"] == "cat: <path>: No such file"
+        assert (failure["count"], failure["sessions"]) == (5, 2)
+        # One example per session, pointing back into it.
+        assert [(e["file_path"], e["uuid"], e["tool_use_id"]) for e in failure["examples"]] == [
+            (str(sessions[0].resolve()), "a0", "t0"),
+            (str(sessions[1].resolve()), "ba0", "bt0"),
+        ]
+
+    def test_single_session_patterns_are_left_out(self, tmp_path):
+        identify_skills = load_script("identify-skills")
+        recurring = identify_skills.RecurringPatterns()
+        recurring.add(identify_skills.session_patterns(write_jsonl(tmp_path / "a.jsonl", failing_session(4))))
+        assert recurring.report(top=10)["recurring_failures"] == []
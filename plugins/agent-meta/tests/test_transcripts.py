@@ -0,0 +1,218 @@
+import json
+
+from agent_meta.transcripts import (
+    Entry,
+    ReadStats,
+    SystemReminder,
+    Text,
+    ToolResult,
+    ToolUse,
+    by_entry,
+    entry_text,
+    key_pattern,
+    line_at,
+    line_matches,
+    mapped,
+    read_events,
+)
+
+from .sessions import (
+    assistant,
+    failing_session,
+    lines,
+    text,
+    tool_result,
+    tool_use,
+    user,
+    varied_session,
+    write_jsonl,
+)
+
+
+def _shape(event):
+    """An event as (kind, entry uuid, its main field), for comparing streams."""
+    if isinstance(event, Entry):
+        return ("entry", event.uuid, event.index)
+    value = {
+        ToolUse: lambda e: e.name,
+        ToolResult: lambda e: (e.tool_use_id, e.content, e.is_error),
+        Text: lambda e: e.text,
+        SystemReminder: lambda e: e.text,
+    }[type(event)](event)
+    return (type(event).__name__, event.entry.uuid, value)
+
+
+class TestReadEvents:
+    def test_events_in_order(self, tmp_path):
+        reminder = "<system-reminder>hook said hi</system-reminder>"
+        path = write_jsonl(tmp_path / "s.jsonl", [
+            assistant("a0", None, text("let me look"), tool_use("t0", "Bash", command="ls")),
+            user("u0", "a0", tool_result("t0", f"out\n{reminder}", is_error=True)),
+            user("m0", "u0", "plain string item", text(f"first {reminder} second {reminder}")),
+        ])
+        assert [_shape(event) for event in read_events(path)] == [
+            ("entry", "a0", 0),
+            ("Text", "a0", "let me look"),
+            ("ToolUse", "a0", "Bash"),
+            ("entry", "u0", 1),
+            ("ToolResult", "u0", ("t0", f"out\n{reminder}", True)),
+            ("SystemReminder", "u0", "hook said hi"),
+            ("entry", "m0", 2),
+            ("Text", "m0", "plain string item"),
+            ("Text", "m0", f"first {reminder} second {reminder}"),
+            ("SystemReminder", "m0", "hook said hi"),
+            ("SystemReminder", "m0", "hook said hi"),
+        ]
+
+    def test_entry_fields(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", failing_session(1))
+        first = next(read_events(path))
+        assert first == Entry(
+            index=0, uuid="a0", parent_uuid=None, type="assistant", role="assistant",
+            timestamp="2026-01-01T00:00:00Z",
+        )
+
+    def test_string_content_and_multiline_reminders(self, tmp_path):
+        entry = user("u0", None)
+        entry["message"]["content"] = "<system-reminder>line one\nline two</system-reminder>"
+        path = write_jsonl(tmp_path / "s.jsonl", [entry])
+        assert [_shape(event) for event in read_events(path)][1:] == [
+            ("Text", "u0", entry["message"]["content"]),
+            ("SystemReminder", "u0", "line one\nline two"),
+        ]
+
+    def test_blank_and_malformed_lines_are_skipped_unnumbered(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        path.write_bytes(
+            b"\n"
+            + lines(failing_session(1)[:1])
+            + b"not json\n[1, 2]\n  \n"
+            + lines(failing_session(1)[1:])
+        )
+        stats = ReadStats()
+        entries = [e for e in read_events(path, stats=stats) if isinstance(e, Entry)]
+        assert [(e.index, e.uuid) for e in entries] == [(0, "a0"), (1, "u0")]
+        assert (stats.entries, stats.decoded, stats.offset) == (2, 2, path.stat().st_size)
+
+    def test_odd_shapes_yield_just_the_entry(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        path.write_bytes(
+            b'{"uuid": "x0", "message": "a string"}\n'
+            b'{"uuid": "x1", "message": {"content": 5}}\n'
+            b'{"uuid": "x2", "message": {"content": [5, null, {"type": "image"}]}}\n'
+            b'{"uuid": "x3"}\n'
+        )
+        assert [_shape(event) for event in read_events(path)] == [
+            ("entry", f"x{i}", i) for i in range(4)
+        ]
+
+    def test_resumes_numbering_from_stats(self, tmp_path):
+        whole = lines(failing_session(2))
+        path = tmp_path / "s.jsonl"
+        path.write_bytes(whole)
+        stats = ReadStats()
+        first = [e.uuid for e in read_events(path, stats=stats) if isinstance(e, Entry)]
+        assert first == ["a0", "u0", "a1", "u1"]
+
+        path.write_bytes(whole + lines(failing_session(1, prefix="b")))
+        later = [(e.index, e.uuid) for e in read_events(path, stats=stats) if isinstance(e, Entry)]
+        assert later == [(4, "ba0"), (5, "bu0")]
+
+    def test_partial_last_line(self, tmp_path):
+        whole = lines(failing_session(1))
+        path = tmp_path / "s.jsonl"
+        path.write_bytes(whole[:-1])  # valid JSON, no newline yet
+        assert [e.uuid for e in read_events(path) if isinstance(e, Entry)] == ["a0", "u0"]
+        stats = ReadStats()
+        assert [e.uuid for e in read_events(path, stats=stats, partial=False) if isinstance(e, Entry)] == ["a0"]
+        assert stats.offset == whole.index(b"\n") + 1
+
+
+class TestGrouping:
+    def test_by_entry_groups_content_under_each_entry(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", varied_session(6))
+        groups = list(by_entry(read_events(path)))
+        assert [entry.index for entry, _ in groups] == list(range(len(groups)))
+        assert all(event.entry is entry for entry, events in groups for event in events)
+        assert sum(1 + len(events) for _, events in groups) == len(list(read_events(path)))
+
+    def test_entry_without_content_still_forms_a_group(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        path.write_bytes(b'{"uuid": "x0"}\n{"uuid": "x1"}\n')
+        assert [(entry.uuid, events) for entry, events in by_entry(read_events(path))] == [("x0", []), ("x1", [])]
+
+    def test_entry_text_joins_text_and_string_output(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", [
+            user("u0", None, text("one"), tool_result("t0", "two"), tool_result("t1", [{"type": "text"}]), "three"),
+        ])
+        [(_, events)] = by_entry(read_events(path))
+        assert entry_text(events) == "one\ntwo\nthree"
+
+
+class TestByteMatching:
+    def test_key_pattern_allows_any_spacing(self):
+        pattern = key_pattern("is_error", "true")
+        assert pattern.search(b'{"is_error": true}')
+        assert pattern.search(b'{"is_error" :\ttrue}')
+        assert pattern.search(b'{"is_error":true}')
+        assert not pattern.search(b'{"is_error": false}')
+
+    def test_key_pattern_skips_escaped_keys_in_strings(self):
+        line = json.dumps({"content": 'echo \'{"is_error": true}\''}).encode()
+        assert not key_pattern("is_error", "true").search(line)
+
+    def test_line_matches_yield_line_starts(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", failing_session(3))
+        with mapped(path) as buf:
+            found = [offset for offset, _ in line_matches(buf, key_pattern("is_error", "true"))]
+            assert [json.loads(line_at(buf, offset))["uuid"] for offset in found] == ["u0", "u1", "u2"]
+            assert all(offset == 0 or buf[offset - 1:offset] == b"\n" for offset in found)
+
+            # From the second error line's start on, and up to the third's.
+            assert [offset for offset, _ in line_matches(buf, key_pattern("is_error", "true"), found[1])] == found[1:]
+            assert [offset for offset, _ in line_matches(buf, key_pattern("is_error", "true"), 0, found[2])] == found[:2]
+
+    def test_match_on_the_first_line(self):
+        buf = lines(failing_session(1)[1:])
+        assert [offset for offset, _ in line_matches(buf, key_pattern("is_error", "true"))] == [0]
+
+    def test_line_at_returns_an_unterminated_last_line(self):
+        buf = b'{"a": 1}\n{"b": 2}'
+        assert line_at(buf, 0) == b'{"a": 1}\n'
+        assert line_at(buf, 9) == b'{"b": 2}'
+
+    def test_empty_file_maps_to_nothing(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        path.write_bytes(b"")
+        with mapped(path) as buf:
+            assert list(line_matches(buf, key_pattern("is_error", "true"))) == []
+
+
+class TestPrefilter:
+    def _entries(self, path, **kwargs):
+        return [e for e in read_events(path, **kwargs) if isinstance(e, Entry)]
+
+    def test_rejected_lines_still_count_as_entries(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", varied_session(10))
+        everything = self._entries(path)
+        stats = ReadStats()
+        errors_only = self._entries(path, prefilter=key_pattern("is_error", "true").search, stats=stats)
+
+        assert [e.uuid for e in errors_only] == ["u0", "u3", "u6", "u9"]
+        by_index = {e.index: e for e in everything}
+        assert all(by_index[e.index] == e for e in errors_only)
+        assert (stats.entries, stats.decoded, stats.skipped) == (len(everything), 4, len(everything) - 4)
+
+    def test_blank_lines_are_not_entries(self, tmp_path):
+        path = tmp_path / "s.jsonl"
+        path.write_bytes(b"\n" + lines(failing_session(1)) + b"  \n")
+        stats = ReadStats()
+        entries = self._entries(path, prefilter=lambda line: False, stats=stats)
+        assert entries == []
+        assert stats.entries == 2
+
+    def test_unterminated_last_line_is_decoded_not_filtered(self, tmp_path):
+        path = write_jsonl(tmp_path / "s.jsonl", [], tail=lines(failing_session(1)).rstrip(b"\n"))
+        entries = self._entries(path, prefilter=lambda line: False)
+        # The first line is whole and filtered out; the last isn't, so it's read.
+        assert [(e.index, e.uuid) for e in entries] == [(1, "u0")]
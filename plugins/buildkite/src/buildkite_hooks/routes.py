@@ -0,0 +1,182 @@
+"""tool-routing route provider that enforces buildkite tool preferences.
+
+Reads config from ~/.config/pickled-claude-plugins/buildkite.yml (user)
+or config/defaults.yml (plugin fallback) and turns the intercepted bk CLI
+subcommands into a single Bash route, blocking or warning based on the strict
+setting. tool-routing imports this file (it's listed in
+.claude-plugin/routes.json) and calls ``tool_routes()`` on every check, so
+the intercepts ride along in its one matching pass instead of a hook of their
+own. Stick to the standard library and PyYAML here, and locate files relative
+to this module: CLAUDE_PLUGIN_ROOT points at tool-routing when this runs.
+
+The config is compiled once (all intercept patterns merged into one regex)
+and cached, keyed on the config file's mtime and size, so YAML is only parsed
+after the file changes.
+"""
+
+import marshal
+import os
+import re
+import sys
+from pathlib import Path
+
+# Bump when the compiled shape changes so stale caches get rebuilt.
+_COMPILED_FORMAT = 1
+
+_DEFAULT_PREFERENCE = ["bktide", "mcp", "bk"]
+
+# `bk` as a command: at the start, or after a control operator, `(`, or a
+# command substitution opener.
+_BK_COMMAND = r"(?:^|[;&|(\n`]|\$\()\s*bk(?:\s|$)"
+
+_PLUGIN_ROOT = Path(__file__).resolve().parents[2]
+
+ROUTE_NAME = "buildkite-bk-cli"
+
+# str.format template rendered by tool-routing with the route's message_vars
+# plus {value}, the intercepted command.
+MESSAGE_TEMPLATE = (
+    "Your buildkite tool preference is: {preference}\n"
+    "\n"
+    "The command `{value}` was intercepted. Your preferred tool is {preferred}.\n"
+    "Use `npx bktide@latest snapshot <buildkite-url>` for build investigation,\n"
+    "or `npx bktide@latest --help` for other commands."
+)
+
+_STRICT_FOOTER = (
+    "\n\nTo allow bk commands, set `strict: false` in "
+    "~/.config/pickled-claude-plugins/buildkite.yml"
+)
+
+
+def config_path():
+    """The config file in effect: user config, else plugin defaults, else None."""
+    user_config = Path.home() / ".config" / "pickled-claude-plugins" / "buildkite.yml"
+    plugin_config = _PLUGIN_ROOT / "config" / "defaults.yml"
+
+    for path in [user_config, plugin_config]:
+        if path.is_file():
+            return path
+    return None
+
+
+def load_config():
+    """Load config from user location, falling back to plugin defaults."""
+    path = config_path()
+    if path is None:
+        return None
+
+    import yaml  # only needed when the compiled cache is stale
+
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+def compile_config(config):
+    """Reduce a parsed config to the marshal-able fields the route needs.
+
+    Intercept patterns are merged into one alternation (``intercept_pattern``,
+    None when there are none); invalid patterns are dropped.
+    """
+    patterns = []
+    for entry in config.get("intercept") or []:
+        pattern = entry.get("pattern") if isinstance(entry, dict) else None
+        if not pattern:
+            continue
+        try:
+            re.compile(pattern)
+        except re.error:
+            continue
+        patterns.append(f"(?:{pattern})")
+    return {
+        "format": _COMPILED_FORMAT,
+        "tool_preference": [
+            str(p) for p in config.get("tool_preference") or _DEFAULT_PREFERENCE
+        ],
+        "strict": bool(config.get("strict", True)),
+        "intercept_pattern": "|".join(patterns) or None,
+    }
+
+
+def _cache_path():
+    base = os.environ.get("BUILDKITE_HOOKS_CACHE_DIR", "")
+    if not base:
+        xdg = os.environ.get("XDG_CACHE_HOME", "") or os.path.join(
+            os.environ.get("HOME", ""), ".cache"
+        )
+        base = os.path.join(xdg, "pickled-claude-plugins", "buildkite")
+    # marshal's format is tied to the interpreter version.
+    return Path(base) / "config-py{}{}.marshal".format(*sys.version_info[:2])
+
+
+def _write_cache(path, compiled):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(marshal.dumps(compiled))
+        os.replace(tmp, path)
+    except (OSError, ValueError):
+        pass  # caching is best-effort
+
+
+def load_compiled_config():
+    """Return the compiled config, rebuilding the cache only when it's stale."""
+    path = config_path()
+    if path is None:
+        return None
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    key = [str(path), st.st_mtime_ns, st.st_size]
+
+    cache = _cache_path()
+    try:
+        cached = marshal.loads(cache.read_bytes())
+        if cached.get("format") == _COMPILED_FORMAT and cached.get("key") == key:
+            return cached
+    except (OSError, EOFError, ValueError, TypeError, AttributeError):
+        pass
+
+    config = load_config()
+    if not isinstance(config, dict):
+        return None
+    compiled = compile_config(config)
+    compiled["key"] = key
+    _write_cache(cache, compiled)
+    return compiled
+
+
+def route_pattern(intercept_pattern):
+    """The route's regex: the intercepts, gated on `bk` running at all.
+
+    tool-routing searches with re.IGNORECASE, so the pattern scopes it off
+    (``(?-i:...)``) to keep intercepts case-sensitive. The anchored lookahead
+    is the hook's old pre-check: a command that never runs `bk` at a command
+    boundary fails it once, without trying any intercept.
+    """
+    return rf"(?-i:\A(?=[\s\S]*?{_BK_COMMAND})[\s\S]*?(?:{intercept_pattern}))"
+
+
+def build_route(config):
+    """Build the tool-routing route dict for a compiled config."""
+    prefs = config.get("tool_preference") or _DEFAULT_PREFERENCE
+    strict = config.get("strict", True)
+    return {
+        "tool": "Bash",
+        "pattern": route_pattern(config["intercept_pattern"]),
+        "strict": strict,
+        "message": MESSAGE_TEMPLATE + (_STRICT_FOOTER if strict else ""),
+        "message_vars": {
+            "preference": " > ".join(prefs),
+            "preferred": prefs[0],
+        },
+    }
+
+
+def tool_routes():
+    """tool-routing provider entry point: routes keyed by name."""
+    config = load_compiled_config()
+    if not config or not config.get("intercept_pattern"):
+        return {}
+    return {ROUTE_NAME: build_route(config)}
@@ -0,0 +1,17 @@
+"""Pytest configuration for buildkite route provider tests."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_config(tmp_path, monkeypatch):
+    """Point the route provider at the plugin defaults and a throwaway cache.
+
+    HOME is a temp dir, so no personal buildkite.yml leaks in; tests that
+    want one write it under ``home / ".config" / "pickled-claude-plugins"``.
+    """
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("BUILDKITE_HOOKS_CACHE_DIR", str(tmp_path / "cache"))
+    return home
@@ -0,0 +1,159 @@
+"""Tests for the buildkite tool-routing route provider."""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from buildkite_hooks import routes
+
+PLUGIN_ROOT = Path(__file__).parent.parent
+PROVIDER = PLUGIN_ROOT / "src" / "buildkite_hooks" / "routes.py"
+TOOL_ROUTING_SRC = PLUGIN_ROOT.parent / "tool-routing" / "src"
+
+
+def write_user_config(home, contents):
+    path = home / ".config" / "pickled-claude-plugins" / "buildkite.yml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(contents)
+    return path
+
+
+def matches(route, command):
+    # tool-routing matches with re.search and re.IGNORECASE.
+    return re.search(route["pattern"], command, re.IGNORECASE) is not None
+
+
+def render(route, command):
+    return route["message"].format(**route["message_vars"], value=command)
+
+
+def run_tool_routing(command, session_id=None):
+    tool_call = {"tool_name": "Bash", "tool_input": {"command": command}}
+    if session_id:
+        tool_call["session_id"] = session_id
+    return subprocess.run(
+        [sys.executable, "-m", "tool_routing", "check"],
+        input=json.dumps(tool_call),
+        capture_output=True,
+        text=True,
+        env={
+            **os.environ,
+            "PYTHONPATH": str(TOOL_ROUTING_SRC),
+            "TOOL_ROUTING_ROUTES": str(PROVIDER),
+        },
+    )
+
+
+def test_manifest_lists_provider():
+    manifest = json.loads((PLUGIN_ROOT / ".claude-plugin" / "routes.json").read_text())
+    assert "./src/buildkite_hooks/routes.py" in manifest["routes"]
+
+
+def test_defaults_provide_one_strict_route():
+    provided = routes.tool_routes()
+    assert list(provided) == [routes.ROUTE_NAME]
+    route = provided[routes.ROUTE_NAME]
+    assert route["tool"] == "Bash"
+    assert route["strict"] is True
+    assert matches(route, "bk build view 1")
+    assert matches(route, "bk api /pipelines/x/builds")
+    assert not matches(route, "bk pipeline list")
+    assert not matches(route, "npx bktide@latest snapshot URL")
+
+
+def test_intercepts_stay_case_sensitive():
+    route = routes.tool_routes()[routes.ROUTE_NAME]
+    assert not matches(route, "BK build view 1")
+    assert not matches(route, "bk BUILD view 1")
+
+
+def test_intercepts_need_bk_to_run(isolated_config):
+    write_user_config(isolated_config, "intercept:\n  - pattern: 'bk build'\n")
+    route = routes.tool_routes()[routes.ROUTE_NAME]
+    assert matches(route, "cd app && bk build view 1")
+    assert matches(route, "echo $(bk build view 1)")
+    assert not matches(route, "echo bk build")
+    assert not matches(route, "git log --grep 'bk build'")
+
+
+def test_message_template_renders_preference_and_command():
+    route = routes.tool_routes()[routes.ROUTE_NAME]
+    message = render(route, "bk build view 1")
+    assert "bktide > mcp > bk" in message
+    assert "`bk build view 1`" in message
+    assert "Your preferred tool is bktide" in message
+    assert "strict: false" in message
+
+
+def test_non_strict_config_provides_warn_route(isolated_config):
+    write_user_config(
+        isolated_config,
+        "tool_preference: [mcp, bk]\nstrict: false\n"
+        "intercept:\n  - pattern: '^bk build'\n",
+    )
+    route = routes.tool_routes()[routes.ROUTE_NAME]
+    assert route["strict"] is False
+    message = render(route, "bk build")
+    assert "Your preferred tool is mcp" in message
+    assert "strict: false" not in message
+
+
+def test_no_intercepts_provides_no_routes(isolated_config):
+    write_user_config(isolated_config, "strict: true\nintercept: []\n")
+    assert routes.tool_routes() == {}
+
+
+def test_invalid_pattern_dropped():
+    compiled = routes.compile_config(
+        {"intercept": [{"pattern": "("}, {"pattern": "^bk build\\b"}]}
+    )
+    assert compiled["intercept_pattern"] == "(?:^bk build\\b)"
+
+
+def test_warm_load_skips_yaml(monkeypatch):
+    routes.load_compiled_config()
+    monkeypatch.setattr(routes, "load_config", lambda: pytest.fail("reparsed"))
+    assert routes.load_compiled_config()["strict"] is True
+
+
+def test_changed_config_invalidates_cache(isolated_config):
+    path = write_user_config(isolated_config, "strict: true\nintercept: []\n")
+    assert routes.load_compiled_config()["strict"] is True
+    path.write_text("strict: false\nintercept:\n  - pattern: '^bk build'\n")
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 10**9))
+    compiled = routes.load_compiled_config()
+    assert compiled["strict"] is False
+    assert compiled["intercept_pattern"] == "(?:^bk build)"
+
+
+@pytest.mark.skipif(not TOOL_ROUTING_SRC.is_dir(), reason="tool-routing not present")
+def test_tool_routing_denies_intercepted_command():
+    result = run_tool_routing("bk build view 123")
+    assert result.returncode == 0
+    output = json.loads(result.stdout)["hookSpecificOutput"]
+    assert output["permissionDecision"] == "deny"
+    assert "`bk build view 123`" in output["permissionDecisionReason"]
+
+
+@pytest.mark.skipif(not TOOL_ROUTING_SRC.is_dir(), reason="tool-routing not present")
+def test_tool_routing_ignores_unrelated_command():
+    result = run_tool_routing("git status")
+    assert result.returncode == 0
+    assert result.stdout == ""
+
+
+@pytest.mark.skipif(not TOOL_ROUTING_SRC.is_dir(), reason="tool-routing not present")
+def test_tool_routing_warns_once_when_not_strict(isolated_config):
+    write_user_config(
+        isolated_config, "strict: false\nintercept:\n  - pattern: '^bk build'\n"
+    )
+    first = run_tool_routing("bk build view 1", session_id="s1")
+    output = json.loads(first.stdout)["hookSpecificOutput"]
+    assert "permissionDecision" not in output
+    assert "`bk build view 1`" in output["additionalContext"]
+    assert run_tool_routing("bk build view 2", session_id="s1").stdout == ""
@@ -0,0 +1,141 @@
+"""Size-bounded on-disk cache for `gh` responses.
+
+Entries are files named by a hash of their key, under
+`$GHA_SNAPSHOT_CACHE_DIR` (default
+`${XDG_CACHE_HOME:-~/.cache}/pickled-claude-plugins/github-actions`). A hit
+refreshes the entry's mtime; after each write the oldest entries are evicted
+until the directory fits in `max_bytes`, so the cache behaves as an LRU.
+
+What is safe to cache is the caller's call (see GhClient). Every failure here
+is swallowed: a broken cache just means fetching from GitHub again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import IO, Optional
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Spool files older than this were abandoned by a crashed run.
+_STALE_SPOOL_SECONDS = 60 * 60
+
+
+def default_cache_dir() -> Path:
+    base = os.environ.get("GHA_SNAPSHOT_CACHE_DIR", "")
+    if not base:
+        xdg = os.environ.get("XDG_CACHE_HOME", "") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        base = os.path.join(xdg, "pickled-claude-plugins", "github-actions")
+    return Path(base)
+
+
+class ResponseCache:
+    """Key → text store with LRU eviction by total size."""
+
+    def __init__(self, root: Optional[Path] = None, *, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root if root is not None else default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def _path(self, key: tuple) -> Path:
+        digest = hashlib.sha256(json.dumps(key).encode()).hexdigest()
+        return self.root / digest
+
+    def open(self, *key) -> Optional[IO[str]]:
+        """The entry as an open text file (iterate it for lines), or None."""
+        path = self._path(key)
+        try:
+            f = open(path, encoding="utf-8")
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return f
+
+    def get(self, *key) -> Optional[str]:
+        f = self.open(*key)
+        if f is None:
+            return None
+        with f:
+            try:
+                return f.read()
+            except (OSError, UnicodeDecodeError):
+                return None
+
+    def put(self, *key, value: str) -> None:
+        spool = self.spool()
+        if spool is None:
+            return
+        try:
+            with spool:
+                spool.write(value)
+        except OSError:
+            self.discard(spool.name)
+            return
+        self.adopt(spool.name, *key)
+
+    def spool(self) -> Optional[IO[str]]:
+        """A new temp file in the cache dir, to be written then `adopt`ed.
+
+        Lets a large response be cached while it streams, without holding it
+        in memory.
+        """
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            fd, name = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            os.close(fd)
+            # Reopened by name so the file object's `.name` is its path.
+            return open(name, "w", encoding="utf-8")
+        except OSError:
+            return None
+
+    def adopt(self, spool_path: str, *key) -> None:
+        """Move a finished spool file into place as the entry for `key`."""
+        try:
+            os.replace(spool_path, self._path(key))
+        except OSError:
+            self.discard(spool_path)
+            return
+        self._evict()
+
+    @staticmethod
+    def discard(spool_path: str) -> None:
+        try:
+            os.unlink(spool_path)
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        stale = time.time() - _STALE_SPOOL_SECONDS
+        try:
+            with os.scandir(self.root) as it:
+                for entry in it:
+                    st = entry.stat()
+                    if entry.name.endswith(".tmp"):
+                        if st.st_mtime < stale:
+                            self.discard(entry.path)
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+        except OSError:
+            return
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
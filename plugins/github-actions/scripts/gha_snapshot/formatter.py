@@ -1,11 +1,12 @@
-"""Render a run-view JSON + log text into a human-readable snapshot block."""
+"""Render a run-view JSON + failed log into a human-readable snapshot block."""
 
 from __future__ import annotations
 
 import re
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Sequence, Tuple, Union
 
+from .log_parser import FailedLog, parse_failed_log
 from .url_parser import RunRef
 
 _ICONS = {
@@ -19,23 +20,115 @@ _ICONS = {
 }
 _DEFAULT_ICON = "…"
 
-# `gh run view --log-failed` emits lines like:
-#   <job-name>\t<step-name>\t<line>
-_LOG_LINE = re.compile(r"^(?P<job>[^\t]+)\t(?P<step>[^\t]+)\t(?P<content>.*)$")
-_ANNOTATION = re.compile(r"::(error|warning|notice)[^:]*::.+")
+# Job conclusions that count as a failure.
+FAILED_CONCLUSIONS = frozenset({"failure", "timed_out", "startup_failure"})
 
+# Failure fingerprints ignore what differs between otherwise identical
+# failures: gh's leading timestamp, hex ids/SHAs, and numbers (durations,
+# PIDs, ports, matrix values).
+_LEADING_TIMESTAMP = re.compile(r"^\d{4}-\d\d-\d\dT[\d:.]+Z ?")
+_VOLATILE = re.compile(r"\b[0-9a-f]{7,40}\b|\d+")
 
-def format_snapshot(run: dict[str, Any], log_failed: str, ref: RunRef, *, tail: int) -> str:
+Snapshot = Tuple[dict, Union[str, FailedLog], RunRef]
+
+
+def format_snapshot(
+    run: dict[str, Any], log_failed: Union[str, FailedLog], ref: RunRef, *, tail: int
+) -> str:
+    """Render a snapshot block.
+
+    `log_failed` is raw `--log-failed` text, or a FailedLog already digested
+    by `parse_failed_log` (with the same `tail`) so the whole log never has
+    to be held in memory. When `ref` names a job, only that job's failed
+    step is shown (its log is all that was fetched).
+    """
+    log_failed = _digest(log_failed, tail)
     sections = [
         _format_header(run),
         _format_jobs(run),
-        _format_failed_steps(run, log_failed, tail),
+        _format_failed_steps(run, log_failed, ref.job_id),
         _format_annotations(log_failed),
         _format_links(run, ref),
     ]
     return "\n\n".join(s for s in sections if s)
 
 
+def format_report(snapshots: Sequence[Snapshot], *, tail: int) -> str:
+    """Render several runs (e.g. every failed run on a PR) as one report.
+
+    Each run gets its header and job list. Failed-step outputs and
+    annotations are merged across runs, and ones with the same fingerprint
+    (see `_fingerprint`), like a matrix failing the same way on every leg,
+    are shown once with every job that hit them.
+    """
+    digested = [(run, _digest(log, tail), ref) for run, log, ref in snapshots]
+    sections = []
+    for run, _, _ in digested:
+        sections += [_format_header(run), _format_jobs(run)]
+
+    outputs: dict[tuple, list] = {}
+    annotations: dict[str, list] = {}
+    links = ["Links:"]
+    for run, log, _ in digested:
+        prefix = f"{run.get('workflowName', '?')} / "
+        for job, step, lines in _failed_step_outputs(run, log):
+            entry = outputs.setdefault(_fingerprint(lines), [step["name"], lines, []])
+            entry[2].append(prefix + job["name"])
+        for job_name, anns in log.annotations.items():
+            for ann in anns:
+                labels = annotations.setdefault(_normalize(ann), [ann, []])[1]
+                if prefix + job_name not in labels:
+                    labels.append(prefix + job_name)
+        links.append(f"  {prefix}run: {run.get('url', '?')}")
+        links += [f"  {prefix}{line}" for line in _failed_job_links(run)]
+
+    for step_name, lines, labels in outputs.values():
+        also = f"; same failure in {', '.join(labels[1:])}" if len(labels) > 1 else ""
+        sections.append(
+            f'Failed step output ({labels[0]} → "{step_name}", last {len(lines)} lines{also}):\n'
+            + "\n".join(f"  {line}" for line in lines)
+        )
+    if annotations:
+        sections.append("\n".join(
+            ["Annotations:"]
+            + [f"  {', '.join(labels)}: {ann}" for ann, labels in annotations.values()]
+        ))
+    sections.append("\n".join(links))
+    return "\n\n".join(s for s in sections if s)
+
+
+def format_job_failure(job: dict[str, Any], log_failed: Union[str, FailedLog], *, tail: int) -> str:
+    """Render one newly failed job: its failed step's output and annotations."""
+    log_failed = _digest(log_failed, tail)
+    sections = [
+        "Job failed:\n" + _job_line(job),
+        _format_failed_steps({"jobs": [job]}, log_failed),
+        _format_annotations(log_failed),
+    ]
+    return "\n\n".join(s for s in sections if s)
+
+
+def format_run_summary(run: dict[str, Any], ref: RunRef) -> str:
+    """Header, job list and links, without any log output."""
+    sections = [_format_header(run), _format_jobs(run), _format_links(run, ref)]
+    return "\n\n".join(s for s in sections if s)
+
+
+def _digest(log_failed: Union[str, FailedLog], tail: int) -> FailedLog:
+    if isinstance(log_failed, str):
+        return parse_failed_log(log_failed.splitlines(), tail=tail)
+    return log_failed
+
+
+def _normalize(line: str) -> str:
+    return _VOLATILE.sub("#", _LEADING_TIMESTAMP.sub("", line.strip()))
+
+
+def _fingerprint(lines: list[str]) -> tuple:
+    """Identity of a failure's output, normalized the same way for every job."""
+    return tuple(_normalize(line) for line in lines)
+
+
 def _format_header(run: dict[str, Any]) -> str:
     duration = _duration(run.get("createdAt"), run.get("updatedAt"))
     sha = (run.get("headSha") or "")[:7]
@@ -51,31 +144,48 @@ def _format_header(run: dict[str, Any]) -> str:
 def _format_jobs(run: dict[str, Any]) -> str:
     out = ["Jobs:"]
     for job in run.get("jobs", []):
-        icon = _ICONS.get(job.get("conclusion") or "", _DEFAULT_ICON)
-        duration = _duration(job.get("startedAt"), job.get("completedAt"))
-        line = f"  {icon} {job['name']} ({duration})"
-        if job.get("conclusion") == "failure":
-            failed_step = _first_failed_step(job)
-            if failed_step:
-                line += f' — failed at step "{failed_step["name"]}"'
-        elif job.get("conclusion") == "skipped":
-            line += " (skipped — dependency failed)"
-        out.append(line)
+        out.append(_job_line(job))
     return "\n".join(out)
 
 
-def _format_failed_steps(run: dict[str, Any], log_failed: str, tail: int) -> str:
-    failed_jobs = [j for j in run.get("jobs", []) if j.get("conclusion") == "failure"]
-    if not failed_jobs:
-        return ""
-    blocks = []
-    for job in failed_jobs:
+def _job_line(job: dict[str, Any]) -> str:
+    icon = _ICONS.get(job.get("conclusion") or "", _DEFAULT_ICON)
+    duration = _duration(job.get("startedAt"), job.get("completedAt"))
+    line = f"  {icon} {job['name']} ({duration})"
+    if job.get("conclusion") in FAILED_CONCLUSIONS:
+        failed_step = _first_failed_step(job)
+        if failed_step:
+            line += f' — failed at step "{failed_step["name"]}"'
+    elif job.get("conclusion") == "skipped":
+        line += " (skipped — dependency failed)"
+    return line
+
+
+def _failed_step_outputs(
+    run: dict[str, Any], log_failed: FailedLog, job_id: int | None = None
+):
+    """(job, failed step, log tail) for each failed job with output.
+
+    Limited to the job `job_id` when given.
+    """
+    for job in run.get("jobs", []):
+        if job.get("conclusion") not in FAILED_CONCLUSIONS:
+            continue
+        if job_id is not None and not _is_job(job, job_id):
+            continue
         step = _first_failed_step(job)
         if not step:
             continue
-        relevant = _log_lines_for(log_failed, job["name"], step["name"], tail)
-        if not relevant:
-            continue
+        relevant = log_failed.lines_for(job["name"], step["name"])
+        if relevant:
+            yield job, step, relevant
+
+
+def _format_failed_steps(
+    run: dict[str, Any], log_failed: FailedLog, job_id: int | None = None
+) -> str:
+    blocks = []
+    for job, step, relevant in _failed_step_outputs(run, log_failed, job_id):
         blocks.append(
             f'Failed step output ({job["name"]} → "{step["name"]}", last {len(relevant)} lines):\n'
             + "\n".join(f"  {line}" for line in relevant)
@@ -83,18 +193,11 @@ def _format_failed_steps(run: dict[str, Any], log_failed: str, tail: int) -> str
     return "\n\n".join(blocks)
 
 
-def _format_annotations(log_failed: str) -> str:
-    by_job: dict[str, list[str]] = {}
-    for line in log_failed.splitlines():
-        m = _LOG_LINE.match(line)
-        if not m:
-            continue
-        if _ANNOTATION.search(m["content"]):
-            by_job.setdefault(m["job"], []).append(m["content"].strip())
-    if not by_job:
+def _format_annotations(log_failed: FailedLog) -> str:
+    if not log_failed.annotations:
         return ""
     out = ["Annotations:"]
-    for job_name, anns in by_job.items():
+    for job_name, anns in log_failed.annotations.items():
         for ann in anns:
             out.append(f"  {job_name}: {ann}")
     return "\n".join(out)
@@ -102,12 +205,24 @@ def _format_annotations(log_failed: str) -> str:
 
 def _format_links(run: dict[str, Any], ref: RunRef) -> str:
     out = ["Links:", f"  Run:  {run.get('url', '?')}"]
-    for job in run.get("jobs", []):
-        if job.get("conclusion") == "failure":
-            out.append(f"  {job['name']}: {job.get('url', '?')}")
+    out += [f"  {line}" for line in _failed_job_links(run)]
     return "\n".join(out)
 
 
+def _failed_job_links(run: dict[str, Any]) -> list[str]:
+    return [
+        f"{job['name']}: {job.get('url', '?')}"
+        for job in run.get("jobs", [])
+        if job.get("conclusion") in FAILED_CONCLUSIONS
+    ]
+
+
+def _is_job(job: dict[str, Any], job_id: int) -> bool:
+    if job.get("databaseId") is not None:
+        return job["databaseId"] == job_id
+    return (job.get("url") or "").endswith(f"/job/{job_id}")
+
+
 def _first_failed_step(job: dict[str, Any]) -> dict[str, Any] | None:
     for step in job.get("steps", []):
         if step.get("conclusion") == "failure":
@@ -115,40 +230,6 @@ def _first_failed_step(job: dict[str, Any]) -> dict[str, Any] | None:
     return None
 
 
-def _log_lines_for(log: str, job_name: str, step_name: str, tail: int) -> list[str]:
-    """Extract log lines for a given job + step.
-
-    `gh run view --log-failed` sometimes emits "UNKNOWN STEP" in the step
-    column when the runner couldn't resolve a display name (common on
-    short-lived steps). When step-name matching yields nothing, fall back
-    to all lines for the job, then trim everything after the last
-    `##[error]` marker so post-step cleanup output doesn't drown the
-    actual failure context.
-    """
-    job_matches = []
-    step_matches = []
-    for line in log.splitlines():
-        m = _LOG_LINE.match(line)
-        if not m or m["job"] != job_name:
-            continue
-        job_matches.append(m["content"])
-        if m["step"] == step_name:
-            step_matches.append(m["content"])
-    if step_matches:
-        return step_matches[-tail:]
-    last_error = _last_index(job_matches, "##[error]")
-    if last_error is not None:
-        job_matches = job_matches[: last_error + 1]
-    return job_matches[-tail:]
-
-
-def _last_index(lines: list[str], needle: str) -> int | None:
-    for i in range(len(lines) - 1, -1, -1):
-        if needle in lines[i]:
-            return i
-    return None
-
-
 def _duration(start: str | None, end: str | None) -> str:
     if not start or not end:
         return "—"
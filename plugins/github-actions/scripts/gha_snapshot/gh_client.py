@@ -7,8 +7,14 @@ captured JSON fixtures rather than live network calls.
 from __future__ import annotations
 
 import json
+import os
 import subprocess
-from typing import Any
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Callable, Iterable, Iterator, Optional, TypeVar
+
+from .cache import ResponseCache
 
 
 class GhError(RuntimeError):
@@ -16,10 +22,40 @@ class GhError(RuntimeError):
 
 
 _RUN_VIEW_FIELDS = (
-    "conclusion,createdAt,databaseId,displayTitle,event,headBranch,"
+    "attempt,conclusion,createdAt,databaseId,displayTitle,event,headBranch,"
     "headSha,jobs,name,number,startedAt,status,updatedAt,url,workflowName"
 )
 
+T = TypeVar("T")
+
+# `run_jobs`' per-page state: (ETag, whether a next page follows, jobs).
+JobPages = tuple[tuple[Optional[str], bool, list[dict[str, Any]]], ...]
+
+# How long `current_repo` (a network call) is trusted for a directory.
+_REPO_TTL = 5 * 60
+
+
+def is_final(run: dict[str, Any]) -> bool:
+    """True once a run attempt has completed; its data can no longer change."""
+    return run.get("status") == "completed" and bool(run.get("conclusion"))
+
+
+def run_concurrently(
+    *calls: Callable[[], Any], max_workers: Optional[int] = None
+) -> list[Any]:
+    """Run independent client calls in parallel; return results in order.
+
+    Each call is mostly a `gh` subprocess waiting on the network, so threads
+    overlap the round trips. At most `max_workers` run at once (default: all
+    of them). The first call to fail re-raises its exception (after the
+    others have finished).
+    """
+    if len(calls) < 2:
+        return [call() for call in calls]
+    with ThreadPoolExecutor(max_workers=min(len(calls), max_workers or len(calls))) as pool:
+        futures = [pool.submit(call) for call in calls]
+        return [f.result() for f in futures]
+
 
 class GhClient:
     """Wraps `gh` CLI calls.
@@ -27,8 +63,30 @@ class GhClient:
     Methods return parsed JSON (for `--json` calls) or raw stdout (for
     log calls). All methods raise GhError on non-zero exit, with stderr
     captured in the exception message.
+
+    With a `cache`, responses that can't change are kept on disk: run
+    metadata and failed logs of a completed attempt, keyed by (owner, repo,
+    run_id, attempt), the attempt each job belongs to, plus `current_repo`
+    for a few minutes. `refresh` skips cache reads but still stores what it
+    fetches.
     """
 
+    def __init__(self, cache: Optional[ResponseCache] = None, *, refresh: bool = False):
+        self.cache = cache
+        self.refresh = refresh
+        # (owner, repo, run_id, job_id) -> spooled log not yet known to be
+        # final, kept until store_log_failed learns whether the run was.
+        self._spooled: dict[tuple[str, str, int, Optional[int]], str] = {}
+
+    def _cached(self, *key) -> Optional[str]:
+        if self.cache is None or self.refresh:
+            return None
+        return self.cache.get(*key)
+
+    def _store(self, *key, value: str) -> None:
+        if self.cache is not None:
+            self.cache.put(*key, value=value)
+
     def _run(self, args: list[str]) -> str:
         result = subprocess.run(
             args,
@@ -40,20 +98,138 @@ class GhClient:
             raise GhError(result.stderr.strip() or f"gh exited {result.returncode}")
         return result.stdout
 
-    def run_view(self, *, owner: str, repo: str, run_id: int) -> dict[str, Any]:
-        out = self._run([
-            "gh", "run", "view", str(run_id),
-            "--repo", f"{owner}/{repo}",
-            "--json", _RUN_VIEW_FIELDS,
-        ])
-        return json.loads(out)
+    def _stream(self, args: list[str]) -> Iterator[str]:
+        """Yield stdout lines as `gh` produces them; GhError on non-zero exit."""
+        with tempfile.TemporaryFile() as err:
+            proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=err, text=True)
+            try:
+                with proc.stdout:
+                    yield from proc.stdout
+                returncode = proc.wait()
+            finally:
+                if proc.poll() is None:  # consumer stopped early
+                    proc.kill()
+                    proc.wait()
+            if returncode != 0:
+                err.seek(0)
+                message = err.read().decode(errors="replace").strip()
+                raise GhError(message or f"gh exited {returncode}")
 
-    def run_log_failed(self, *, owner: str, repo: str, run_id: int) -> str:
-        return self._run([
-            "gh", "run", "view", str(run_id),
-            "--repo", f"{owner}/{repo}",
-            "--log-failed",
-        ])
+    def run_view(
+        self, *, owner: str, repo: str, run_id: int, attempt: Optional[int] = None
+    ) -> dict[str, Any]:
+        """Run metadata; the latest attempt unless `attempt` is given.
+
+        Only a request for a specific attempt can be answered from the
+        cache, since a run can be re-run after it completes.
+        """
+        if attempt is not None:
+            cached = self._cached("run_view", owner, repo, run_id, attempt)
+            if cached is not None:
+                return json.loads(cached)
+        args = ["gh", "run", "view", str(run_id), "--repo", f"{owner}/{repo}"]
+        if attempt is not None:
+            args += ["--attempt", str(attempt)]
+        out = self._run(args + ["--json", _RUN_VIEW_FIELDS])
+        run = json.loads(out)
+        if is_final(run) and run.get("attempt"):
+            self._store("run_view", owner, repo, run_id, run["attempt"], value=out)
+            self._store("attempt", owner, repo, run_id, value=str(run["attempt"]))
+        return run
+
+    def run_log_failed(
+        self,
+        *,
+        owner: str,
+        repo: str,
+        run_id: int,
+        attempt: Optional[int] = None,
+        job_id: Optional[int] = None,
+        consume: Callable[[Iterable[str]], T] = "".join,
+    ) -> T:
+        """Failed-step log; the latest attempt unless `attempt` is given.
+
+        With `job_id`, only that job's log is downloaded (`gh run view
+        --job`), rather than every failed job's in the run.
+
+        The log's lines are streamed into `consume` (which must read them
+        all) as gh writes them, and its result returned; the default joins
+        them into one string. For a specific attempt whose run metadata is
+        cached (i.e. it had completed), the log is served from and stored in
+        the cache. Otherwise it is spooled to the cache dir until
+        `store_log_failed` says whether to keep it.
+        """
+        key = ("log_failed", owner, repo, run_id, attempt) + ((job_id,) if job_id else ())
+        if attempt is not None and self.cache is not None and not self.refresh:
+            f = self.cache.open(*key)
+            if f is not None:
+                with f:
+                    return consume(f)
+        if job_id is not None:
+            # A job ID already pins the attempt.
+            args = ["gh", "run", "view", "--job", str(job_id), "--repo", f"{owner}/{repo}"]
+        else:
+            args = ["gh", "run", "view", str(run_id), "--repo", f"{owner}/{repo}"]
+            if attempt is not None:
+                args += ["--attempt", str(attempt)]
+        lines = self._stream(args + ["--log-failed"])
+        spool = self.cache.spool() if self.cache is not None else None
+        if spool is None:
+            return consume(lines)
+        try:
+            with spool:
+                result = consume(_tee(lines, spool))
+        except BaseException:
+            self.cache.discard(spool.name)
+            raise
+        if attempt is not None and self._cached("run_view", owner, repo, run_id, attempt):
+            self.cache.adopt(spool.name, *key)
+        else:
+            self._spooled[(owner, repo, run_id, job_id)] = spool.name
+        return result
+
+    def store_log_failed(
+        self,
+        *,
+        owner: str,
+        repo: str,
+        run_id: int,
+        run: Optional[dict[str, Any]],
+        job_id: Optional[int] = None,
+    ) -> None:
+        """Keep or drop a log `run_log_failed` spooled pending its run.
+
+        `run` is the run_view fetched alongside it; the log is kept only if
+        that attempt was final. None (run_view failed) drops it.
+        """
+        spooled = self._spooled.pop((owner, repo, run_id, job_id), None)
+        if spooled is None:
+            return
+        if run is not None and is_final(run) and run.get("attempt"):
+            key = ("log_failed", owner, repo, run_id, run["attempt"])
+            self.cache.adopt(spooled, *key + ((job_id,) if job_id else ()))
+        else:
+            self.cache.discard(spooled)
+
+    def known_attempt(self, *, owner: str, repo: str, run_id: int) -> Optional[int]:
+        """Latest completed attempt seen for this run, if any is cached."""
+        cached = self._cached("attempt", owner, repo, run_id)
+        return int(cached) if cached and cached.isdigit() else None
+
+    def job_attempt(self, *, owner: str, repo: str, job_id: int) -> int:
+        """The run attempt a job belongs to, which may not be the latest."""
+        cached = self._cached("job_attempt", owner, repo, job_id)
+        if cached and cached.isdigit():
+            return int(cached)
+        out = self._run([
+            "gh", "api", f"repos/{owner}/{repo}/actions/jobs/{job_id}",
+            "--jq", ".run_attempt",
+        ]).strip()
+        if not out.isdigit():
+            raise GhError(f"job {job_id}: no run attempt in response")
+        # A job never moves to another attempt, so this can be kept for good.
+        self._store("job_attempt", owner, repo, job_id, value=out)
+        return int(out)
 
     def run_list_branch(
         self, *, owner: str, repo: str, branch: str, status: str = "failure", limit: int = 1
@@ -76,13 +252,84 @@ class GhClient:
         ])
         return json.loads(out)
 
+    def run_jobs(
+        self,
+        *,
+        owner: str,
+        repo: str,
+        run_id: int,
+        attempt: Optional[int] = None,
+        etag: Optional[JobPages] = None,
+    ) -> tuple[Optional[list[dict[str, Any]]], JobPages]:
+        """Jobs of a run attempt (the latest unless `attempt` is given), via
+        conditional REST requests.
+
+        Returns (jobs, etag), `etag` holding each page's ETag and jobs. Pass
+        it back and every page is requested with its ETag: an unchanged page
+        comes back 304, which doesn't count against the rate limit, and if
+        no page changed the result is (None, etag). Pages are followed while
+        GitHub's `Link` header has a `rel="next"`, so runs with more than 100
+        jobs (big matrices) are seen in full. Jobs use the same shape as
+        `run_view`'s. (`gh run view` can't send If-None-Match, hence the raw
+        API call.)
+        """
+        previous = list(etag or ())
+        path = f"repos/{owner}/{repo}/actions/runs/{run_id}"
+        if attempt is not None:
+            path += f"/attempts/{attempt}"
+        pages = []
+        changed = False
+        has_next = True
+        while has_next:
+            number = len(pages) + 1
+            known = previous[number - 1] if number <= len(previous) else None
+            args = [
+                "gh", "api", "--include",
+                f"{path}/jobs?per_page=100&page={number}",
+            ]
+            if known and known[0]:
+                args += ["-H", f"If-None-Match: {known[0]}"]
+            result = subprocess.run(args, capture_output=True, text=True, check=False)
+            status, headers, body = _parse_http_response(result.stdout)
+            if known and (status == 304 or "HTTP 304" in result.stderr):
+                page = known
+            elif result.returncode != 0:
+                raise GhError(result.stderr.strip() or f"gh exited {result.returncode}")
+            else:
+                changed = True
+                page = (
+                    headers.get("etag"),
+                    _has_next_page(headers.get("link", "")),
+                    [_job_from_api(job) for job in json.loads(body).get("jobs", [])],
+                )
+            pages.append(page)
+            has_next = page[1]
+        if len(pages) != len(previous):
+            changed = True
+        jobs = [job for _, _, page_jobs in pages for job in page_jobs] if changed else None
+        return jobs, tuple(pages)
+
     def current_repo(self) -> tuple[str, str]:
+        cwd = os.getcwd()
+        cached = self._cached("current_repo", cwd)
+        if cached is not None:
+            try:
+                entry = json.loads(cached)
+                if time.time() - entry["at"] < _REPO_TTL:
+                    return entry["owner"], entry["name"]
+            except (ValueError, KeyError, TypeError):
+                pass
         out = self._run([
             "gh", "repo", "view",
             "--json", "owner,name",
         ])
         data = json.loads(out)
-        return data["owner"]["login"], data["name"]
+        owner, name = data["owner"]["login"], data["name"]
+        self._store(
+            "current_repo", cwd,
+            value=json.dumps({"at": time.time(), "owner": owner, "name": name}),
+        )
+        return owner, name
 
     def current_branch(self) -> str:
         result = subprocess.run(
@@ -92,3 +339,54 @@ class GhClient:
         if result.returncode != 0:
             raise GhError(result.stderr.strip() or "git rev-parse failed")
         return result.stdout.strip()
+
+
+def _tee(lines: Iterable[str], sink: IO[str]) -> Iterator[str]:
+    for line in lines:
+        sink.write(line)
+        yield line
+
+
+def _parse_http_response(text: str) -> tuple[Optional[int], dict[str, str], str]:
+    """Split `gh api --include` output into (status, headers, body)."""
+    head, sep, body = text.partition("\r\n\r\n")
+    if not sep:
+        head, _, body = text.partition("\n\n")
+    lines = head.splitlines()
+    status = None
+    if lines and lines[0].startswith("HTTP/"):
+        parts = lines[0].split()
+        if len(parts) > 1 and parts[1].isdigit():
+            status = int(parts[1])
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return status, headers, body
+
+
+def _has_next_page(link: str) -> bool:
+    """Whether a `Link` response header points to a next page."""
+    return any('rel="next"' in part for part in link.split(","))
+
+
+def _job_from_api(job: dict[str, Any]) -> dict[str, Any]:
+    """REST job payload → the camelCase shape `gh run view --json jobs` uses."""
+    return {
+        "databaseId": job.get("id"),
+        "name": job.get("name"),
+        "status": job.get("status"),
+        "conclusion": job.get("conclusion"),
+        "startedAt": job.get("started_at"),
+        "completedAt": job.get("completed_at"),
+        "url": job.get("html_url"),
+        "steps": [
+            {
+                "name": step.get("name"),
+                "status": step.get("status"),
+                "conclusion": step.get("conclusion"),
+                "number": step.get("number"),
+            }
+            for step in job.get("steps") or []
+        ],
+    }
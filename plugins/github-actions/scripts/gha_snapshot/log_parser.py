@@ -0,0 +1,93 @@
+"""Single-pass, bounded-memory digest of `gh run view --log-failed` output.
+
+`--log-failed` can run to hundreds of MB on a big matrix build, but a
+snapshot only shows the last few lines of each failed step plus the
+annotations. `parse_failed_log` reads the lines once, as they arrive, and
+keeps just that: a tail deque per (job, step), a tail per job for the
+"UNKNOWN STEP" fallback, and the annotation lines.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from itertools import islice
+from typing import Iterable
+
+_ANNOTATION = re.compile(r"::(error|warning|notice)[^:]*::.+")
+_ERROR_MARKER = "##[error]"
+
+
+class FailedLog:
+    """What the formatter needs from a failed-log stream.
+
+    Memory is O(job/step pairs × tail) plus the annotations, independent of
+    the log's length.
+    """
+
+    def __init__(self, tail: int):
+        self.tail = tail
+        # (job, step) -> last `tail` lines of that step.
+        self.steps: dict[tuple[str, str], deque[str]] = {}
+        # job -> last `tail` lines of the job, across steps.
+        self.jobs: dict[str, deque[str]] = {}
+        # job -> the job's tail as of its last `##[error]` line.
+        self.jobs_at_error: dict[str, list[str]] = {}
+        # With no tail limit, copying the job's lines at every error would be
+        # quadratic; keep how many it had then instead, and slice once.
+        self.job_lines_at_error: dict[str, int] = {}
+        # job -> annotation lines (`::error ...::msg`), in log order.
+        self.annotations: dict[str, list[str]] = {}
+
+    def lines_for(self, job_name: str, step_name: str) -> list[str]:
+        """Tail of log lines for a given job + step.
+
+        `gh run view --log-failed` sometimes emits "UNKNOWN STEP" in the step
+        column when the runner couldn't resolve a display name (common on
+        short-lived steps). When step-name matching yields nothing, fall back
+        to the job's lines up to its last `##[error]` marker, so post-step
+        cleanup output doesn't drown the actual failure context.
+        """
+        step = self.steps.get((job_name, step_name))
+        if step:
+            return list(step)
+        if job_name in self.jobs_at_error:
+            return self.jobs_at_error[job_name]
+        if job_name in self.job_lines_at_error:
+            return list(islice(self.jobs[job_name], self.job_lines_at_error[job_name]))
+        return list(self.jobs.get(job_name, ()))
+
+
+def parse_failed_log(lines: Iterable[str], *, tail: int) -> FailedLog:
+    """Digest `--log-failed` lines (`<job>\\t<step>\\t<content>`) in one pass.
+
+    `lines` may be any iterable, e.g. a subprocess pipe or an open file; line
+    endings are stripped. Lines not in that shape are ignored. A `tail` of
+    0 or less keeps every line, as `--tail 0` always has.
+    """
+    log = FailedLog(tail)
+    steps, jobs = log.steps, log.jobs
+    maxlen = tail if tail > 0 else None
+    for line in lines:
+        parts = line.rstrip("\r\n").split("\t", 2)
+        if len(parts) != 3:
+            continue
+        job, step, content = parts
+        if not job or not step:
+            continue
+        step_lines = steps.get((job, step))
+        if step_lines is None:
+            step_lines = steps[(job, step)] = deque(maxlen=maxlen)
+        step_lines.append(content)
+        job_lines = jobs.get(job)
+        if job_lines is None:
+            job_lines = jobs[job] = deque(maxlen=maxlen)
+        job_lines.append(content)
+        if _ERROR_MARKER in content:
+            if maxlen is None:
+                log.job_lines_at_error[job] = len(job_lines)
+            else:
+                log.jobs_at_error[job] = list(job_lines)
+        if "::" in content and _ANNOTATION.search(content):
+            log.annotations.setdefault(job, []).append(content.strip())
+    return log
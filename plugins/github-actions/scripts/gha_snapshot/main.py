@@ -4,11 +4,19 @@ from __future__ import annotations
 
 import argparse
 import sys
+from functools import partial
 from typing import Optional, Sequence
 
-from .formatter import format_snapshot
-from .gh_client import GhClient, GhError
-from .resolver import ResolveError, resolve
+from .cache import ResponseCache
+from .formatter import format_report, format_snapshot
+from .gh_client import GhClient, GhError, run_concurrently
+from .log_parser import FailedLog, parse_failed_log
+from .resolver import ResolveError, resolve, resolve_pr_runs
+from .url_parser import RunRef
+from .watch import watch
+
+# Runs fetched at once by `--pr N --all` (each is itself two gh calls).
+_MAX_PARALLEL_RUNS = 4
 
 
 def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
@@ -22,16 +30,111 @@ def _parse_args(argv: Sequence[str]) -> argparse.Namespace:
         help="Run URL or run ID. If omitted, uses --pr or latest failed run on current branch.",
     )
     parser.add_argument("--pr", type=int, help="Resolve via PR number (most recent failed check).")
+    parser.add_argument(
+        "--all", action="store_true",
+        help="With --pr: snapshot every failed run on the PR as one merged report.",
+    )
     parser.add_argument(
         "--tail", type=int, default=50,
         help="Lines of failed-step log to include per failed job (default: 50).",
     )
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Follow an in-progress run, printing each job's failure as it happens.",
+    )
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument(
+        "--no-cache", action="store_true",
+        help="Don't read or write the local cache of completed runs.",
+    )
+    cache.add_argument(
+        "--refresh", action="store_true",
+        help="Re-fetch from GitHub, replacing any cached copy.",
+    )
+    args = parser.parse_args(argv)
+    if args.all and args.pr is None:
+        parser.error("--all requires --pr")
+    if args.all and args.watch:
+        parser.error("--watch follows a single run; it can't be combined with --all")
+    return args
+
+
+def _fetch(client: GhClient, run_ref: RunRef, *, tail: int) -> tuple[dict, FailedLog]:
+    """Fetch run metadata and its failed log, digested as it streams in.
+
+    A job URL limits the log to that job. When the attempt is pinned (by the
+    URL) or this is the first sight of a run, both fetches go out
+    concurrently, and the log is cached if the run turns out to be complete.
+    A run seen before: run_view (small) is fetched live to learn the current
+    attempt, and the log (large) comes from the cache unless the run was
+    re-run since.
+    """
+    target = dict(owner=run_ref.owner, repo=run_ref.repo, run_id=run_ref.run_id)
+    log_scope = dict(job_id=run_ref.job_id, consume=partial(parse_failed_log, tail=tail))
+    attempt = run_ref.attempt
+    run = None
+    try:
+        if attempt is not None or client.known_attempt(**target) is None:
+            # Metadata and the failed-step log are independent fetches.
+            run, log = run_concurrently(
+                partial(client.run_view, **target, attempt=attempt),
+                partial(client.run_log_failed, **target, attempt=attempt, **log_scope),
+            )
+        else:
+            run = client.run_view(**target)
+            log = client.run_log_failed(**target, attempt=run.get("attempt"), **log_scope)
+    finally:
+        # Also on errors: a log spooled while run_view failed is dropped.
+        client.store_log_failed(**target, run=run, job_id=run_ref.job_id)
+    return run, log
+
+
+def _fetch_or_error(client: GhClient, run_ref: RunRef, *, tail: int):
+    try:
+        return _fetch(client, run_ref, tail=tail)
+    except GhError as e:
+        return e
+
+
+def _snapshot_pr_runs(client: GhClient, pr: int, *, tail: int) -> int:
+    """Fetch every failed run on `pr` concurrently and print one report.
+
+    A run that can't be fetched is reported on stderr without sinking the
+    others.
+    """
+    try:
+        run_refs = resolve_pr_runs(pr, client=client)
+    except (ResolveError, GhError, ValueError, RuntimeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    results = run_concurrently(
+        *(partial(_fetch_or_error, client, ref, tail=tail) for ref in run_refs),
+        max_workers=_MAX_PARALLEL_RUNS,
+    )
+    snapshots = []
+    for ref, result in zip(run_refs, results):
+        if isinstance(result, GhError):
+            print(f"error: run {ref.run_id}: {result}", file=sys.stderr)
+            continue
+        run, log = result
+        snapshots.append((run, log, ref))
+    if not snapshots:
+        return 1
+
+    print(format_report(snapshots, tail=tail))
+    return 0
 
 
 def main(argv: Optional[Sequence[str]] = None) -> int:
     args = _parse_args(argv if argv is not None else sys.argv[1:])
-    client = GhClient()
+    client = GhClient(
+        cache=None if args.no_cache else ResponseCache(),
+        refresh=args.refresh,
+    )
+
+    if args.all:
+        return _snapshot_pr_runs(client, args.pr, tail=args.tail)
 
     try:
         run_ref = resolve(args.ref, pr=args.pr, client=client)
@@ -39,11 +142,15 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         print(f"error: {e}", file=sys.stderr)
         return 1
 
+    if args.watch:
+        try:
+            return watch(client, run_ref, tail=args.tail)
+        except GhError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+
     try:
-        run = client.run_view(owner=run_ref.owner, repo=run_ref.repo, run_id=run_ref.run_id)
-        log = client.run_log_failed(
-            owner=run_ref.owner, repo=run_ref.repo, run_id=run_ref.run_id
-        )
+        run, log = _fetch(client, run_ref, tail=args.tail)
     except GhError as e:
         print(f"error: {e}", file=sys.stderr)
         return 1
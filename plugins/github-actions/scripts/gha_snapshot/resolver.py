@@ -5,13 +5,16 @@ Resolution priority:
   2. Explicit numeric run ID (with cwd's repo)
   3. PR number (most recent failed check)
   4. Default: latest failed run on current branch
+
+`resolve_pr_runs` instead returns every failed run on a PR.
 """
 
 from __future__ import annotations
 
+from dataclasses import replace
 from typing import Optional
 
-from .gh_client import GhClient
+from .gh_client import GhClient, run_concurrently
 from .url_parser import RunRef, parse_run_url
 
 
@@ -28,7 +31,8 @@ def resolve(
     """Resolve a user-supplied ref into a RunRef.
 
     `ref` may be:
-      - A full run URL → parsed directly
+      - A full run URL → parsed directly; a job URL without an attempt
+        gets the job's attempt looked up, since it may not be the latest
       - A numeric string → treated as a run_id, repo inferred from cwd
       - None → fall through to `pr` or default-branch lookup
 
@@ -39,7 +43,13 @@ def resolve(
     if ref:
         ref = ref.strip()
         if ref.startswith("http"):
-            return parse_run_url(ref)
+            run_ref = parse_run_url(ref)
+            if run_ref.job_id is not None and run_ref.attempt is None:
+                attempt = client.job_attempt(
+                    owner=run_ref.owner, repo=run_ref.repo, job_id=run_ref.job_id
+                )
+                run_ref = replace(run_ref, attempt=attempt)
+            return run_ref
         if ref.isdigit():
             owner, repo = client.current_repo()
             return RunRef(owner=owner, repo=repo, run_id=int(ref))
@@ -51,12 +61,36 @@ def resolve(
         failures = [c for c in checks if c.get("state") == "FAILURE"]
         if not failures:
             raise ResolveError(f"no failed checks on PR #{pr}")
-        # link looks like .../actions/runs/<id>/job/<job_id>
-        return parse_run_url(failures[0]["link"])
+        # link looks like .../actions/runs/<id>/job/<job_id>; snapshot the
+        # whole run, not just that one job.
+        return replace(parse_run_url(failures[0]["link"]), job_id=None)
 
-    owner, repo = client.current_repo()
-    branch = client.current_branch()
+    (owner, repo), branch = run_concurrently(client.current_repo, client.current_branch)
     runs = client.run_list_branch(owner=owner, repo=repo, branch=branch)
     if not runs:
         raise ResolveError(f"no failed runs on branch {branch!r}")
     return RunRef(owner=owner, repo=repo, run_id=int(runs[0]["databaseId"]))
+
+
+def resolve_pr_runs(pr: int, *, client: Optional[GhClient] = None) -> list[RunRef]:
+    """Every distinct failed GitHub Actions run among a PR's checks.
+
+    A workflow's failed jobs share one run, so checks are de-duplicated by
+    run ID, keeping the order `gh pr checks` lists them in. Failed checks
+    that aren't GHA runs (external status checks) are skipped.
+    """
+    client = client or GhClient()
+    owner, repo = client.current_repo()
+    checks = client.pr_checks(owner=owner, repo=repo, pr_number=pr)
+    refs: dict[int, RunRef] = {}
+    for check in checks:
+        if check.get("state") != "FAILURE":
+            continue
+        try:
+            ref = parse_run_url(check.get("link") or "")
+        except ValueError:
+            continue
+        refs.setdefault(ref.run_id, replace(ref, job_id=None))
+    if not refs:
+        raise ResolveError(f"no failed Actions runs on PR #{pr}")
+    return list(refs.values())
@@ -4,11 +4,16 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
+from typing import Optional
 
 # Matches URLs like:
 #   https://github.com/<owner>/<repo>/actions/runs/<run_id>[/...]
+#   .../actions/runs/<run_id>/attempts/<n>
+#   .../actions/runs/<run_id>/job/<job_id>
 _RUN_URL = re.compile(
     r"^https://github\.com/(?P<owner>[^/]+)/(?P<repo>[^/]+)/actions/runs/(?P<run_id>\d+)"
+    r"(?:/attempts/(?P<attempt>\d+))?"
+    r"(?:/jobs?/(?P<job_id>\d+))?"
 )
 
 
@@ -17,6 +22,10 @@ class RunRef:
     owner: str
     repo: str
     run_id: int
+    # Set when the URL points at one job; the snapshot is scoped to it.
+    job_id: Optional[int] = None
+    # Set when the URL pins a run attempt; otherwise the latest is used.
+    attempt: Optional[int] = None
 
     @property
     def repo_slug(self) -> str:
@@ -27,7 +36,7 @@ def parse_run_url(url: str) -> RunRef:
     """Parse a GitHub Actions run URL.
 
     Accepts canonical URLs, URLs with trailing slashes, and URLs with extra
-    path segments like `/job/<id>` or `/attempts/<n>`.
+    path segments like `/job/<id>` or `/attempts/<n>`, whose IDs are kept.
 
     Raises ValueError if the URL doesn't point at a GHA run.
     """
@@ -38,4 +47,6 @@ def parse_run_url(url: str) -> RunRef:
         owner=match["owner"],
         repo=match["repo"],
         run_id=int(match["run_id"]),
+        job_id=int(match["job_id"]) if match["job_id"] else None,
+        attempt=int(match["attempt"]) if match["attempt"] else None,
     )
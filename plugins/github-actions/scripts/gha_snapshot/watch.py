@@ -0,0 +1,117 @@
+"""`--watch`: follow an in-progress run, reporting jobs as they fail.
+
+Polling asks only for the run's job list, with the ETag of the previous
+answer, so an unchanged run costs a 304 and no rate limit. The interval backs
+off while nothing changes and snaps back when something does. A job's failed
+log is fetched once, when the job is first seen failed, and printed right
+away; if it can't be fetched, the job is still reported and the watch goes
+on. The final summary has no logs, since they were streamed already. A ref
+pinned to an attempt is followed at that attempt.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from functools import partial
+from typing import Any, Callable, TextIO
+
+from .formatter import (
+    FAILED_CONCLUSIONS,
+    format_job_failure,
+    format_run_summary,
+    format_snapshot,
+)
+from .gh_client import GhClient, GhError, is_final
+from .log_parser import FailedLog, parse_failed_log
+from .url_parser import RunRef
+
+MIN_INTERVAL = 5.0
+MAX_INTERVAL = 60.0
+_BACKOFF = 1.5
+
+
+def watch(
+    client: GhClient,
+    ref: RunRef,
+    *,
+    tail: int,
+    out: TextIO = sys.stdout,
+    sleep: Callable[[float], None] = time.sleep,
+    min_interval: float = MIN_INTERVAL,
+    max_interval: float = MAX_INTERVAL,
+) -> int:
+    """Poll `ref` until it completes, printing each newly failed job.
+
+    Raises GhError from the underlying calls, except a job's failed log,
+    whose error is printed with the job; returns 130 on Ctrl-C.
+    """
+    target = dict(owner=ref.owner, repo=ref.repo, run_id=ref.run_id)
+    digest = partial(parse_failed_log, tail=tail)
+
+    def emit(text: str) -> None:
+        print(text, file=out, flush=True)
+
+    run = client.run_view(**target, attempt=ref.attempt)
+    if is_final(run):
+        log = client.run_log_failed(
+            **target, attempt=run.get("attempt"), job_id=ref.job_id, consume=digest
+        )
+        client.store_log_failed(**target, run=run, job_id=ref.job_id)
+        emit(format_snapshot(run, log, ref, tail=tail))
+        return 0
+
+    emit(f"Watching {_title(run)} ({run.get('status')}): {run.get('url', '')}")
+    reported: set[Any] = set()
+    etag = None
+    interval = min_interval
+    # Set once every job has completed. GitHub finalizes the run a moment
+    # later, while the job list (now unchanging) answers 304, so from then
+    # on the run itself is checked every tick.
+    all_done = False
+    try:
+        while True:
+            jobs, etag = client.run_jobs(**target, attempt=ref.attempt, etag=etag)
+            if jobs is None:
+                interval = min(interval * _BACKOFF, max_interval)
+            else:
+                interval = min_interval
+                for job in _newly_failed(jobs, reported, ref.job_id):
+                    reported.add(job["databaseId"])
+                    try:
+                        log = client.run_log_failed(
+                            **target, job_id=job["databaseId"], consume=digest
+                        )
+                    except GhError as e:
+                        # e.g. gh refusing a log while the run is in progress;
+                        # the other jobs and the summary are still to come.
+                        emit(format_job_failure(job, FailedLog(tail), tail=tail)
+                             + f"\n  (log unavailable: {e})")
+                        continue
+                    # The run is still going, so this drops the spooled log.
+                    client.store_log_failed(**target, run=run, job_id=job["databaseId"])
+                    emit(format_job_failure(job, log, tail=tail))
+                all_done = bool(jobs) and all(job.get("status") == "completed" for job in jobs)
+            if all_done:
+                run = client.run_view(**target, attempt=ref.attempt)
+                if is_final(run):
+                    emit(format_run_summary(run, ref))
+                    return 0
+            sleep(interval)
+    except KeyboardInterrupt:
+        return 130
+
+
+def _newly_failed(jobs: list[dict[str, Any]], reported: set[Any], job_id):
+    for job in jobs:
+        if job.get("conclusion") not in FAILED_CONCLUSIONS or job.get("databaseId") in reported:
+            continue
+        if job_id is not None and job.get("databaseId") != job_id:
+            continue
+        yield job
+
+
+def _title(run: dict[str, Any]) -> str:
+    name = run.get("workflowName") or run.get("name") or "run"
+    number = run.get("number")
+    return f"{name} #{number}" if number is not None else name
@@ -0,0 +1,27 @@
+import os
+
+from gha_snapshot.cache import ResponseCache
+
+
+class TestResponseCache:
+    def test_round_trip(self, tmp_path):
+        cache = ResponseCache(tmp_path)
+        cache.put("log_failed", "octocat", "Hello-World", 123, 1, value="FAIL")
+        assert cache.get("log_failed", "octocat", "Hello-World", 123, 1) == "FAIL"
+        assert cache.get("log_failed", "octocat", "Hello-World", 123, 2) is None
+
+    def test_missing_dir_is_a_miss(self, tmp_path):
+        assert ResponseCache(tmp_path / "nope").get("anything") is None
+
+    def test_evicts_least_recently_used_over_budget(self, tmp_path):
+        cache = ResponseCache(tmp_path, max_bytes=25)
+        cache.put("a", value="x" * 10)
+        cache.put("b", value="x" * 10)
+        # Age both, then touch "a" so "b" is the least recently used.
+        for name in os.listdir(tmp_path):
+            os.utime(tmp_path / name, (1, 1))
+        assert cache.get("a") is not None
+        cache.put("c", value="x" * 10)
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
@@ -1,7 +1,7 @@
 import json
 from pathlib import Path
 
-from gha_snapshot.formatter import format_snapshot
+from gha_snapshot.formatter import format_report, format_snapshot
 from gha_snapshot.url_parser import RunRef
 
 FIXTURE_DIR = Path(__file__).parent / "fixtures"
@@ -123,3 +123,40 @@ class TestFormatSnapshot:
         # Cleanup lines after the error should be excluded
         assert "Post job cleanup" not in out
         assert "Cleaning up orphan processes" not in out
+
+
+class TestFormatReport:
+    def _matrix_run(self, workflow, number):
+        run = _minimal_run()
+        run["workflowName"], run["number"] = workflow, number
+        run["jobs"] = [
+            {"name": f"test ({leg})", "conclusion": "failure", "url": f"u/{leg}",
+             "steps": [{"name": "Run npm test", "conclusion": "failure"}]}
+            for leg in ("node 18", "node 20")
+        ]
+        return run
+
+    def test_identical_failures_collapse_across_jobs(self):
+        log = "\n".join(
+            f"test ({leg})\tRun npm test\t2026-05-18T12:0{i}:00.1234567Z "
+            f"FAIL src/foo.test.ts after {i * 7}ms"
+            for i, leg in enumerate(("node 18", "node 20"))
+        )
+        ref = RunRef("octocat", "Hello-World", 123)
+        out = format_report([(self._matrix_run("CI", 42), log, ref)], tail=10)
+        assert out.count("Failed step output") == 1
+        assert "same failure in CI / test (node 20)" in out
+
+    def test_runs_get_headers_and_distinct_failures_stay_separate(self):
+        ci = "test (node 18)\tRun npm test\tFAIL a\ntest (node 20)\tRun npm test\tFAIL b"
+        lint = "test (node 18)\tRun npm test\t::error file=x.js::bad\n"
+        out = format_report([
+            (self._matrix_run("CI", 42), ci, RunRef("octocat", "Hello-World", 123)),
+            (self._matrix_run("Lint", 43), lint, RunRef("octocat", "Hello-World", 124)),
+        ], tail=10)
+        assert "Run: CI #42" in out and "Run: Lint #43" in out
+        # FAIL a, FAIL b, and Lint's annotation line.
+        assert out.count("Failed step output") == 3
+        assert "same failure" not in out
+        assert "Lint / test (node 18): ::error file=x.js::bad" in out
+        assert "Lint / run:" in out
@@ -1,13 +1,36 @@
+import io
 import json
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
+from gha_snapshot.cache import ResponseCache
 from gha_snapshot.gh_client import GhClient, GhError
 
 FIXTURE_DIR = Path(__file__).parent / "fixtures"
 
 
+class FakePopen:
+    """Stands in for the streaming `gh` subprocess."""
+
+    calls: list = []
+
+    def __init__(self, stdout="", returncode=0, stderr=b""):
+        self._stdout, self._returncode, self._stderr = stdout, returncode, stderr
+
+    def __call__(self, args, stdout=None, stderr=None, text=None):
+        FakePopen.calls.append(args)
+        stderr.write(self._stderr)
+        self.stdout = io.StringIO(self._stdout)
+        return self
+
+    def wait(self):
+        return self._returncode
+
+    def poll(self):
+        return self._returncode
+
+
 class TestGhClient:
     def test_run_view_returns_parsed_json(self):
         fixture = (FIXTURE_DIR / "run_view_failed.json").read_text()
@@ -39,15 +62,37 @@ class TestGhClient:
                 client.run_view(owner="octocat", repo="Hello-World", run_id=999)
 
     def test_run_log_failed_returns_text(self):
-        with patch("gha_snapshot.gh_client.subprocess.run") as mock_run:
-            mock_run.return_value.returncode = 0
-            mock_run.return_value.stdout = "build\tRun npm test\tFAIL src/foo.test.ts\n"
-            mock_run.return_value.stderr = ""
-
+        fake = FakePopen("build\tRun npm test\tFAIL src/foo.test.ts\n")
+        with patch("gha_snapshot.gh_client.subprocess.Popen", fake):
             client = GhClient()
             log = client.run_log_failed(owner="octocat", repo="Hello-World", run_id=123)
             assert "FAIL src/foo.test.ts" in log
 
+    def test_run_log_failed_for_one_job(self):
+        FakePopen.calls = []
+        with patch("gha_snapshot.gh_client.subprocess.Popen", FakePopen("")):
+            GhClient().run_log_failed(
+                owner="octocat", repo="Hello-World", run_id=123, job_id=201
+            )
+        args = FakePopen.calls[0]
+        assert args[args.index("--job") + 1] == "201"
+        assert "123" not in args
+
+    def test_run_log_failed_streams_into_consumer(self):
+        fake = FakePopen("build\tstep\tone\nbuild\tstep\ttwo\n")
+        with patch("gha_snapshot.gh_client.subprocess.Popen", fake):
+            count = GhClient().run_log_failed(
+                owner="octocat", repo="Hello-World", run_id=123,
+                consume=lambda lines: sum(1 for _ in lines),
+            )
+        assert count == 2
+
+    def test_run_log_failed_raises_on_gh_failure(self):
+        fake = FakePopen(returncode=1, stderr=b"HTTP 404: Not Found")
+        with patch("gha_snapshot.gh_client.subprocess.Popen", fake):
+            with pytest.raises(GhError, match="HTTP 404"):
+                GhClient().run_log_failed(owner="octocat", repo="Hello-World", run_id=1)
+
     def test_current_repo_returns_owner_and_repo(self):
         with patch("gha_snapshot.gh_client.subprocess.run") as mock_run:
             mock_run.return_value.returncode = 0
@@ -58,3 +103,177 @@ class TestGhClient:
             owner, repo = client.current_repo()
             assert owner == "octocat"
             assert repo == "Hello-World"
+
+
+def _gh(mock_run, stdout):
+    mock_run.return_value.returncode = 0
+    mock_run.return_value.stdout = stdout
+    mock_run.return_value.stderr = ""
+
+
+class TestGhClientCache:
+    def test_completed_attempt_served_from_cache(self, tmp_path):
+        fixture = (FIXTURE_DIR / "run_view_failed.json").read_text()
+        client = GhClient(cache=ResponseCache(tmp_path))
+        target = dict(owner="octocat", repo="Hello-World", run_id=123)
+
+        with patch("gha_snapshot.gh_client.subprocess.run") as mock_run:
+            _gh(mock_run, fixture)
+            client.run_view(**target)
+            assert client.known_attempt(**target) == 1
+            FakePopen.calls = []
+            with patch(
+                "gha_snapshot.gh_client.subprocess.Popen",
+                FakePopen("build\tRun npm test\tFAIL\n"),
+            ):
+                client.run_log_failed(**target, attempt=1)
+                assert "--attempt" in FakePopen.calls[0]
+
+                assert client.run_view(**target, attempt=1)["databaseId"] == 123
+                assert "FAIL" in client.run_log_failed(**target, attempt=1)
+            assert mock_run.call_count == 1
+            assert len(FakePopen.calls) == 1
+
+    def test_log_of_unknown_attempt_kept_once_run_is_final(self, tmp_path):
+        fixture = json.loads((FIXTURE_DIR / "run_view_failed.json").read_text())
+        client = GhClient(cache=ResponseCache(tmp_path))
+        target = dict(owner="octocat", repo="Hello-World", run_id=123)
+
+        with patch("gha_snapshot.gh_client.subprocess.Popen", FakePopen("a\tb\tFAIL\n")):
+            client.run_log_failed(**target)
+        client.store_log_failed(**target, run=fixture)
+
+        assert client.cache.get("log_failed", "octocat", "Hello-World", 123, 1) == "a\tb\tFAIL\n"
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_log_of_unfinished_run_discarded(self, tmp_path):
+        client = GhClient(cache=ResponseCache(tmp_path))
+        target = dict(owner="octocat", repo="Hello-World", run_id=123)
+
+        with patch("gha_snapshot.gh_client.subprocess.Popen", FakePopen("a\tb\tc\n")):
+            client.run_log_failed(**target)
+        client.store_log_failed(**target, run={"attempt": 1, "status": "in_progress"})
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_in_progress_run_not_cached(self, tmp_path):
+        client = GhClient(cache=ResponseCache(tmp_path))
+        target = dict(owner="octocat", repo="Hello-World", run_id=123)
+
+        with patch("gha_snapshot.gh_client.subprocess.run") as mock_run:
+            _gh(mock_run, '{"attempt": 1, "status": "in_progress", "conclusion": ""}')
+            client.run_view(**target)
+            client.run_view(**target, attempt=1)
+            assert mock_run.call_count == 2
+        assert client.known_attempt(**target) is None
+
+    def test_refresh_skips_reads(self, tmp_path):
+        fixture = (FIXTURE_DIR / "run_view_failed.json").read_text()
+        cache = ResponseCache(tmp_path)
+        target = dict(owner="octocat", repo="Hello-World", run_id=123, attempt=1)
+
+        with patch("gha_snapshot.gh_client.subprocess.run") as mock_run:
+            _gh(mock_run, fixture)
+            GhClient(cache=cache).run_view(**target)
+            GhClient(cache=cache, refresh=True).run_view(**target)
+            assert mock_run.call_count == 2
+
+    def test_current_repo_cached_briefly(self, tmp_path):
+        client = GhClient(cache=ResponseCache(tmp_path))
+
+        with patch("gha_snapshot.gh_client.subprocess.run") as mock_run:
+            _gh(mock_run, '{"owner":{"login":"octocat"},"name":"Hello-World"}')
+            assert client.current_repo() == ("octocat", "Hello-World")
+            assert client.current_repo() == ("octocat", "Hello-World")
+            assert mock_run.call_count == 1
+            with patch("gha_snapshot.gh_client.time.time", return_value=2e10):
+                client.current_repo()
+            assert mock_run.call_count == 2
+
+    def test_job_attempt_cached_for_good(self, tmp_path):
+        client = GhClient(cache=ResponseCache(tmp_path))
+        target = dict(owner="octocat", repo="Hello-World", job_id=201)
+
+        with patch("gha_snapshot.gh_client.subprocess.run") as mock_run:
+            _gh(mock_run, "1\n")
+            assert client.job_attempt(**target) == 1
+            assert client.job_attempt(**target) == 1
+            assert mock_run.call_count == 1
+        assert "repos/octocat/Hello-World/actions/jobs/201" in mock_run.call_args[0][0]
+
+
+class TestRunJobs:
+    target = dict(owner="octocat", repo="Hello-World", run_id=123)
+
+    def test_parses_jobs_and_etag(self):
+        body = json.dumps({"jobs": [{
+            "id": 201, "name": "test", "status": "completed", "conclusion": "failure",
+            "html_url": "https://github.com/octocat/Hello-World/actions/runs/123/job/201",
+            "steps": [{"name": "Run npm test", "conclusion": "failure", "number": 2}],
+        }]})
+        response = f'HTTP/2.0 200 OK\r\nEtag: W/"abc"\r\n\r\n{body}'
+
+        with patch("gha_snapshot.gh_client.subprocess.run") as mock_run:
+            _gh(mock_run, response)
+            jobs, etag = GhClient().run_jobs(**self.target)
+
+        assert etag[0][0] == 'W/"abc"'
+        assert jobs[0]["databaseId"] == 201
+        assert jobs[0]["url"].endswith("/job/201")
+        assert jobs[0]["steps"][0]["name"] == "Run npm test"
+        assert "If-None-Match" not in " ".join(mock_run.call_args[0][0])
+
+    def test_pinned_attempt(self):
+        with patch("gha_snapshot.gh_client.subprocess.run") as mock_run:
+            _gh(mock_run, 'HTTP/2.0 200 OK\r\n\r\n{"jobs": []}')
+            GhClient().run_jobs(**self.target, attempt=2)
+        assert "repos/octocat/Hello-World/actions/runs/123/attempts/2/jobs?" in (
+            mock_run.call_args[0][0][-1]
+        )
+
+    def test_not_modified_returns_none(self):
+        first = 'HTTP/2.0 200 OK\r\nEtag: W/"abc"\r\n\r\n{"jobs": []}'
+        with patch("gha_snapshot.gh_client.subprocess.run") as mock_run:
+            _gh(mock_run, first)
+            _, etag = GhClient().run_jobs(**self.target)
+            mock_run.return_value.returncode = 1
+            mock_run.return_value.stdout = 'HTTP/2.0 304 Not Modified\r\nEtag: W/"abc"\r\n\r\n'
+            mock_run.return_value.stderr = "gh: HTTP 304"
+            jobs, again = GhClient().run_jobs(**self.target, etag=etag)
+
+        assert (jobs, again) == (None, etag)
+        assert 'If-None-Match: W/"abc"' in mock_run.call_args[0][0]
+
+    def test_follows_next_pages_with_an_etag_each(self):
+        def page(number, job_ids, last):
+            link = "" if last else f'Link: <https://api.github.com/x?page={number + 1}>; rel="next"\r\n'
+            body = json.dumps({"jobs": [{"id": i, "name": f"job{i}"} for i in job_ids]})
+            return MagicMock(
+                returncode=0, stderr="",
+                stdout=f'HTTP/2.0 200 OK\r\nEtag: "p{number}"\r\n{link}\r\n{body}',
+            )
+
+        not_modified = MagicMock(returncode=1, stdout="HTTP/2.0 304 Not Modified\r\n\r\n", stderr="gh: HTTP 304")
+        with patch("gha_snapshot.gh_client.subprocess.run") as mock_run:
+            mock_run.side_effect = [page(1, [1, 2], False), page(2, [3], True)]
+            jobs, etag = GhClient().run_jobs(**self.target)
+            assert [job["databaseId"] for job in jobs] == [1, 2, 3]
+            assert mock_run.call_args_list[1][0][0][3].endswith("per_page=100&page=2")
+
+            # Only the second page changed: the first is reused from its 304.
+            mock_run.side_effect = [not_modified, page(2, [3, 4], True)]
+            jobs, etag = GhClient().run_jobs(**self.target, etag=etag)
+            assert [job["databaseId"] for job in jobs] == [1, 2, 3, 4]
+            headers = [call[0][0][-1] for call in mock_run.call_args_list[2:]]
+            assert headers == ['If-None-Match: "p1"', 'If-None-Match: "p2"']
+
+            mock_run.side_effect = [not_modified, not_modified]
+            assert GhClient().run_jobs(**self.target, etag=etag) == (None, etag)
+
+    def test_other_failures_raise(self):
+        with patch("gha_snapshot.gh_client.subprocess.run") as mock_run:
+            mock_run.return_value.returncode = 1
+            mock_run.return_value.stdout = "HTTP/2.0 404 Not Found\r\n\r\n{}"
+            mock_run.return_value.stderr = "gh: Not Found (HTTP 404)"
+            with pytest.raises(GhError, match="404"):
+                GhClient().run_jobs(**self.target)
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from gha_snapshot.log_parser import parse_failed_log
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+
+
+class TestParseFailedLog:
+    def test_reads_a_stream_once_keeping_bounded_tails(self):
+        lines = (f"test\tRun npm test\tline {i}\n" for i in range(10_000))
+        log = parse_failed_log(lines, tail=5)
+        assert log.lines_for("test", "Run npm test") == [f"line {i}" for i in range(9995, 10_000)]
+        assert len(log.jobs["test"]) == 5
+
+    def test_zero_tail_keeps_every_line(self):
+        lines = [f"test\tRun npm test\tline {i}" for i in range(100)]
+        log = parse_failed_log(lines, tail=0)
+        assert log.lines_for("test", "Run npm test") == [f"line {i}" for i in range(100)]
+        assert len(log.jobs["test"]) == 100
+
+    def test_file_and_text_inputs_agree(self):
+        path = FIXTURE_DIR / "run_log_failed.txt"
+        with open(path) as f:
+            streamed = parse_failed_log(f, tail=50)
+        text = parse_failed_log(path.read_text().splitlines(), tail=50)
+        assert streamed.steps == text.steps
+        assert streamed.annotations == text.annotations
+
+    def test_fallback_uses_job_tail_at_last_error(self):
+        log = parse_failed_log([
+            "test\tUNKNOWN STEP\tbefore",
+            "test\tUNKNOWN STEP\t##[error]boom",
+            "test\tUNKNOWN STEP\tcleanup",
+        ], tail=50)
+        assert log.lines_for("test", "Run npm test") == ["before", "##[error]boom"]
+
+    def test_fallback_with_zero_tail_keeps_the_job_up_to_its_last_error(self):
+        lines = []
+        for i in range(20_000):
+            lines.append(f"test\tUNKNOWN STEP\tline {i}")
+            lines.append(f"test\tUNKNOWN STEP\t##[error]boom {i}")
+        lines.append("test\tUNKNOWN STEP\tcleanup")
+        log = parse_failed_log(lines, tail=0)
+        assert log.lines_for("test", "Run npm test") == [line.split("\t")[2] for line in lines[:-1]]
+
+    def test_annotations_collected_per_job(self):
+        log = parse_failed_log([
+            "lint\tRun eslint\t::warning file=a.js,line=1::unused var",
+            "test\tRun jest\tno annotation :: here",
+        ], tail=5)
+        assert log.annotations == {"lint": ["::warning file=a.js,line=1::unused var"]}
+
+    def test_malformed_lines_ignored(self):
+        log = parse_failed_log(["no tabs here", "\tstep\tmissing job", "job\tstep"], tail=5)
+        assert log.steps == {}
@@ -1,12 +1,17 @@
 import io
 import json
+import threading
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
-from gha_snapshot.main import main
+from gha_snapshot.cache import ResponseCache
+from gha_snapshot.gh_client import GhClient, GhError
+from gha_snapshot.main import _fetch, main
 from gha_snapshot.url_parser import RunRef
 
+from .test_gh_client import FakePopen
+
 FIXTURE_DIR = Path(__file__).parent / "fixtures"
 
 
@@ -16,6 +21,7 @@ def _patched_client():
         (FIXTURE_DIR / "run_view_failed.json").read_text()
     )
     client.run_log_failed.return_value = (FIXTURE_DIR / "run_log_failed.txt").read_text()
+    client.known_attempt.return_value = None
     return client
 
 
@@ -63,3 +69,122 @@ class TestMain:
         # run_view should have been called with run_id=200
         called_with = client.run_view.call_args.kwargs
         assert called_with["run_id"] == 200
+
+    def test_run_view_and_log_are_fetched_concurrently(self, capsys):
+        # Each fetch waits for the other; run back to back, the barrier
+        # would time out and break.
+        barrier = threading.Barrier(2, timeout=5)
+        client = _patched_client()
+        run_view, log = client.run_view.return_value, client.run_log_failed.return_value
+
+        def fetch(result):
+            def wait(**kwargs):
+                barrier.wait()
+                return result
+            return wait
+
+        client.run_view.side_effect = fetch(run_view)
+        client.run_log_failed.side_effect = fetch(log)
+        with patch("gha_snapshot.main.GhClient", return_value=client):
+            exit_code = main(["https://github.com/octocat/Hello-World/actions/runs/123"])
+        assert exit_code == 0
+        assert "Failed step output" in capsys.readouterr().out
+
+    def test_fetch_error_returns_exit_1(self, capsys):
+        client = _patched_client()
+        client.run_log_failed.side_effect = GhError("HTTP 502")
+        with patch("gha_snapshot.main.GhClient", return_value=client):
+            exit_code = main(["https://github.com/octocat/Hello-World/actions/runs/123"])
+        assert exit_code == 1
+        assert "HTTP 502" in capsys.readouterr().err
+
+    def test_seen_run_reads_log_for_current_attempt(self, capsys):
+        client = _patched_client()
+        client.known_attempt.return_value = 1
+        with patch("gha_snapshot.main.GhClient", return_value=client):
+            exit_code = main(["https://github.com/octocat/Hello-World/actions/runs/123"])
+        assert exit_code == 0
+        assert client.run_log_failed.call_args.kwargs["attempt"] == 1
+
+    def test_no_cache_flag_builds_uncached_client(self, capsys):
+        with patch("gha_snapshot.main.GhClient", return_value=_patched_client()) as cls:
+            main(["https://github.com/octocat/Hello-World/actions/runs/123", "--no-cache"])
+        assert cls.call_args.kwargs["cache"] is None
+
+    def test_all_flag_snapshots_every_failed_run(self, capsys):
+        client = _patched_client()
+        client.current_repo.return_value = ("octocat", "Hello-World")
+        client.pr_checks.return_value = json.loads((FIXTURE_DIR / "pr_checks.json").read_text())
+
+        def run_log_failed(**kwargs):
+            if kwargs["run_id"] == 201:
+                raise GhError("HTTP 502")
+            return (FIXTURE_DIR / "run_log_failed.txt").read_text()
+
+        client.run_log_failed.side_effect = run_log_failed
+        with patch("gha_snapshot.main.GhClient", return_value=client):
+            exit_code = main(["--pr", "42", "--all"])
+        captured = capsys.readouterr()
+        assert exit_code == 0
+        assert sorted(c.kwargs["run_id"] for c in client.run_view.call_args_list) == [200, 201]
+        assert "error: run 201: HTTP 502" in captured.err
+        assert "Failed step output" in captured.out
+
+    def test_all_flag_requires_pr(self, capsys):
+        with pytest.raises(SystemExit):
+            main(["--all"])
+
+    def test_job_url_fetches_and_shows_only_that_job(self, capsys):
+        client = _patched_client()
+        run = client.run_view.return_value
+        run["jobs"].append({
+            "name": "lint", "conclusion": "failure",
+            "url": "https://github.com/octocat/Hello-World/actions/runs/123/job/203",
+            "steps": [{"name": "Run eslint", "conclusion": "failure"}],
+        })
+        client.run_log_failed.return_value += "\nlint\tRun eslint\tlint exploded\n"
+        with patch("gha_snapshot.main.GhClient", return_value=client):
+            exit_code = main([
+                "https://github.com/octocat/Hello-World/actions/runs/123/attempts/1/job/201",
+            ])
+        out = capsys.readouterr().out
+        assert exit_code == 0
+        assert client.run_log_failed.call_args.kwargs["job_id"] == 201
+        assert client.run_view.call_args.kwargs["attempt"] == 1
+        assert 'Failed step output (test → "Run npm test"' in out
+        assert "lint exploded" not in out
+
+    def test_job_url_from_an_earlier_attempt_fetches_that_attempt(self, capsys):
+        client = _patched_client()
+        client.job_attempt.return_value = 1
+        with patch("gha_snapshot.main.GhClient", return_value=client):
+            exit_code = main(["https://github.com/octocat/Hello-World/actions/runs/123/job/201"])
+        out = capsys.readouterr().out
+        assert exit_code == 0
+        assert client.run_view.call_args.kwargs["attempt"] == 1
+        assert client.run_log_failed.call_args.kwargs["attempt"] == 1
+        assert 'Failed step output (test → "Run npm test"' in out
+
+    def test_watch_rejects_all(self, capsys):
+        with pytest.raises(SystemExit):
+            main(["--pr", "42", "--all", "--watch"])
+
+    def test_watch_flag_hands_off_to_watch(self, capsys):
+        with patch("gha_snapshot.main.GhClient", return_value=_patched_client()), \
+                patch("gha_snapshot.main.watch", return_value=0) as mock_watch:
+            exit_code = main([
+                "https://github.com/octocat/Hello-World/actions/runs/123", "--watch",
+            ])
+        assert exit_code == 0
+        assert mock_watch.call_args.args[1].run_id == 123
+
+
+def test_fetch_drops_the_spooled_log_when_run_view_fails(tmp_path):
+    client = GhClient(cache=ResponseCache(tmp_path))
+    log = (FIXTURE_DIR / "run_log_failed.txt").read_text()
+    with patch.object(client, "run_view", side_effect=GhError("HTTP 502")), \
+            patch("gha_snapshot.gh_client.subprocess.Popen", FakePopen(log)):
+        with pytest.raises(GhError, match="HTTP 502"):
+            _fetch(client, RunRef(owner="octocat", repo="Hello-World", run_id=123), tail=50)
+    assert client._spooled == {}
+    assert list(tmp_path.iterdir()) == []
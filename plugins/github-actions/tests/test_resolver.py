@@ -3,7 +3,7 @@ from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
-from gha_snapshot.resolver import resolve, ResolveError
+from gha_snapshot.resolver import resolve, resolve_pr_runs, ResolveError
 from gha_snapshot.url_parser import RunRef
 
 FIXTURE_DIR = Path(__file__).parent / "fixtures"
@@ -30,6 +30,18 @@ class TestResolve:
         ref = resolve("https://github.com/octocat/Hello-World/actions/runs/123", client=_fixture_client())
         assert ref == RunRef(owner="octocat", repo="Hello-World", run_id=123)
 
+    def test_job_url_pins_the_jobs_attempt(self):
+        client = _fixture_client(job_attempt=1)
+        ref = resolve("https://github.com/octocat/Hello-World/actions/runs/123/job/201", client=client)
+        assert ref == RunRef(owner="octocat", repo="Hello-World", run_id=123, job_id=201, attempt=1)
+        client.job_attempt.assert_called_once_with(owner="octocat", repo="Hello-World", job_id=201)
+
+    def test_job_url_with_attempt_needs_no_lookup(self):
+        client = _fixture_client()
+        ref = resolve("https://github.com/octocat/Hello-World/actions/runs/123/attempts/2/job/201", client=client)
+        assert ref.attempt == 2
+        client.job_attempt.assert_not_called()
+
     def test_bare_run_id_uses_current_repo(self):
         ref = resolve("123", client=_fixture_client())
         assert ref == RunRef(owner="octocat", repo="Hello-World", run_id=123)
@@ -38,6 +50,8 @@ class TestResolve:
         ref = resolve(None, pr=42, client=_fixture_client())
         # First FAILURE in fixture is run 200; resolver should pick that.
         assert ref.run_id == 200
+        # The check links to a job, but the whole run is snapshotted.
+        assert ref.job_id is None
 
     def test_pr_with_no_failures_raises(self):
         client = _fixture_client(pr_checks=[
@@ -54,3 +68,22 @@ class TestResolve:
         client = _fixture_client(run_list_branch=[])
         with pytest.raises(ResolveError, match="no failed runs"):
             resolve(None, client=client)
+
+
+class TestResolvePrRuns:
+    def test_every_distinct_failed_run(self):
+        checks = json.loads((FIXTURE_DIR / "pr_checks.json").read_text()) + [
+            # Second failed job of run 200, and a non-Actions status check.
+            {"name": "test (node 20)", "state": "FAILURE",
+             "link": "https://github.com/octocat/Hello-World/actions/runs/200/job/302"},
+            {"name": "ci/external", "state": "FAILURE", "link": "https://ci.example.com/b/1"},
+        ]
+        refs = resolve_pr_runs(42, client=_fixture_client(pr_checks=checks))
+        assert [r.run_id for r in refs] == [200, 201]
+
+    def test_no_failed_runs_raises(self):
+        client = _fixture_client(pr_checks=[
+            {"name": "ci/external", "state": "FAILURE", "link": "https://ci.example.com/b/1"}
+        ])
+        with pytest.raises(ResolveError, match="no failed Actions runs"):
+            resolve_pr_runs(42, client=client)
@@ -14,10 +14,18 @@ class TestParseRunUrl:
     def test_url_with_job_segment(self):
         ref = parse_run_url("https://github.com/octocat/Hello-World/actions/runs/123456789/job/9876")
         assert ref.run_id == 123456789
+        assert ref.job_id == 9876
+        assert ref.attempt is None
 
     def test_url_with_attempt_segment(self):
         ref = parse_run_url("https://github.com/octocat/Hello-World/actions/runs/123456789/attempts/2")
         assert ref.run_id == 123456789
+        assert ref.attempt == 2
+        assert ref.job_id is None
+
+    def test_canonical_url_has_no_job_or_attempt(self):
+        ref = parse_run_url("https://github.com/octocat/Hello-World/actions/runs/1/")
+        assert (ref.job_id, ref.attempt) == (None, None)
 
     def test_repo_with_dots(self):
         ref = parse_run_url("https://github.com/octocat/my.repo/actions/runs/1")
@@ -0,0 +1,138 @@
+import io
+import json
+from pathlib import Path
+from dataclasses import replace
+from unittest.mock import MagicMock
+
+from gha_snapshot.gh_client import GhError
+from gha_snapshot.url_parser import RunRef
+from gha_snapshot.watch import watch
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+REF = RunRef(owner="octocat", repo="Hello-World", run_id=123)
+
+
+def _job(job_id, name, status="in_progress", conclusion=None):
+    return {
+        "databaseId": job_id, "name": name, "status": status, "conclusion": conclusion,
+        "url": f"https://github.com/octocat/Hello-World/actions/runs/123/job/{job_id}",
+        "steps": [{"name": "Run it", "conclusion": conclusion}],
+    }
+
+
+def _client(polls):
+    final = json.loads((FIXTURE_DIR / "run_view_failed.json").read_text())
+    client = MagicMock()
+    client.run_view.side_effect = [
+        {"status": "in_progress", "workflowName": "CI", "number": 7, "url": "u"},
+        final,
+    ]
+    client.run_jobs.side_effect = polls
+    client.run_log_failed.side_effect = (
+        lambda **kw: kw["consume"]([f"job{kw['job_id']}\tRun it\tboom {kw['job_id']}\n"])
+    )
+    return client
+
+
+def test_streams_each_failure_once_and_backs_off():
+    polls = [
+        ([_job(1, "job1"), _job(2, "job2")], "e1"),
+        ([_job(1, "job1", "completed", "failure"), _job(2, "job2")], "e2"),
+        (None, "e2"),
+        (None, "e2"),
+        ([_job(1, "job1", "completed", "failure"),
+          _job(2, "job2", "completed", "failure")], "e3"),
+    ]
+    client = _client(polls)
+    out, sleeps = io.StringIO(), []
+
+    code = watch(client, REF, tail=10, out=out, sleep=sleeps.append,
+                 min_interval=2, max_interval=4)
+
+    assert code == 0
+    assert [c.kwargs["job_id"] for c in client.run_log_failed.call_args_list] == [1, 2]
+    assert [c.kwargs["etag"] for c in client.run_jobs.call_args_list] == [
+        None, "e1", "e2", "e2", "e2",
+    ]
+    assert sleeps == [2, 2, 3, 4]
+    assert [c.kwargs["job_id"] for c in client.store_log_failed.call_args_list] == [1, 2]
+    text = out.getvalue()
+    assert text.startswith("Watching CI #7 (in_progress): u")
+    assert text.index("boom 1") < text.index("boom 2") < text.index("Links:")
+    assert text.count("Job failed:") == 2
+
+
+def test_unavailable_log_is_reported_and_the_watch_goes_on():
+    polls = [
+        ([_job(1, "job1", "completed", "failure"), _job(2, "job2")], "e1"),
+        ([_job(1, "job1", "completed", "failure"),
+          _job(2, "job2", "completed", "failure")], "e2"),
+    ]
+    client = _client(polls)
+    log_failed = client.run_log_failed.side_effect
+
+    def flaky(**kw):
+        if kw["job_id"] == 1:
+            raise GhError("run 123 is still in progress")
+        return log_failed(**kw)
+
+    client.run_log_failed.side_effect = flaky
+    out = io.StringIO()
+
+    assert watch(client, REF, tail=10, out=out, sleep=lambda _: None) == 0
+    text = out.getvalue()
+    assert "(log unavailable: run 123 is still in progress)" in text
+    assert text.index("job1") < text.index("boom 2") < text.index("Links:")
+    assert text.count("Job failed:") == 2
+    assert [c.kwargs["job_id"] for c in client.store_log_failed.call_args_list] == [2]
+
+
+def test_timed_out_job_counts_as_failed():
+    client = _client([([_job(1, "job1", "completed", "timed_out")], "e1")])
+    out = io.StringIO()
+
+    assert watch(client, REF, tail=10, out=out, sleep=lambda _: None) == 0
+    assert [c.kwargs["job_id"] for c in client.run_log_failed.call_args_list] == [1]
+    assert "Job failed:" in out.getvalue()
+
+
+def test_pinned_attempt_is_followed():
+    client = _client([([_job(1, "job1", "completed", "success")], "e1")])
+
+    assert watch(client, replace(REF, attempt=2), tail=10, out=io.StringIO(),
+                 sleep=lambda _: None) == 0
+    assert [c.kwargs["attempt"] for c in client.run_view.call_args_list] == [2, 2]
+    assert client.run_jobs.call_args.kwargs["attempt"] == 2
+
+
+def test_keeps_checking_run_after_jobs_complete():
+    # Every job is done, but the run is only finalized a couple of 304s later.
+    done = [_job(1, "job1", "completed", "success")]
+    client = _client([(done, "e1"), (None, "e1"), (None, "e1")])
+    in_progress = {"status": "in_progress", "workflowName": "CI", "number": 7, "url": "u"}
+    final = json.loads((FIXTURE_DIR / "run_view_failed.json").read_text())
+    client.run_view.side_effect = [in_progress, in_progress, in_progress, final]
+    out = io.StringIO()
+
+    assert watch(client, REF, tail=10, out=out, sleep=lambda _: None) == 0
+    assert client.run_jobs.call_count == 3
+    assert client.run_view.call_count == 4
+    assert "Links:" in out.getvalue()
+
+
+def test_completed_run_prints_snapshot_without_polling():
+    client = _client([])
+    client.run_view.side_effect = None
+    client.run_view.return_value = json.loads(
+        (FIXTURE_DIR / "run_view_failed.json").read_text()
+    )
+    out = io.StringIO()
+
+    assert watch(client, REF, tail=10, out=out, sleep=lambda _: None) == 0
+    client.run_jobs.assert_not_called()
+    assert "Jobs:" in out.getvalue()
+
+
+def test_interrupt_exits_130():
+    client = _client(KeyboardInterrupt())
+    assert watch(client, REF, tail=10, out=io.StringIO(), sleep=lambda _: None) == 130
@@ -1,218 +1,669 @@
 #!/usr/bin/env python3
 """PostToolUseFailure:Bash hook (sandbox-advisor). See README.md."""
+import functools
 import json
+import marshal
+import os
 import re
 import sys
+import time
+from pathlib import Path
+
+# The failure-mode registry lives in layered YAML rule files (see the header
+# of modes.yaml for the schema and layering). The merged result is compiled
+# into plain dicts/sets/tuples and cached with marshal, keyed on every
+# layer's (path, mtime, size), so a warm run never imports yaml or walks the
+# rules; it stats the layers and loads one small binary file.
+_DEFAULT_RULES = Path(__file__).resolve().parent / "modes.yaml"
+_RULES_FILENAME = "sandbox-advisor.yaml"
+# Bump when the compiled shape changes so stale caches get rebuilt.
+_COMPILED_FORMAT = 3
+
+
+def _user_config_dirs() -> list:
+    """User-level Claude config directories, honoring ``CLAUDE_CONFIG_DIR``.
+
+    It accepts a single path or a ``:``/``,``-separated list; when unset,
+    ``$HOME/.claude`` is the default. Returned in precedence order.
+    """
+    config_dir = os.environ.get("CLAUDE_CONFIG_DIR", "").strip()
+    if config_dir:
+        dirs = [Path(p.strip()) for p in re.split(r"[:,]", config_dir) if p.strip()]
+        if dirs:
+            return dirs
+    home = os.environ.get("HOME", "")
+    return [Path(home) / ".claude"] if home else []
+
+
+def rule_layers() -> list:
+    """Existing rule files, lowest precedence first.
+
+    Plugin defaults, then the first user config dir that has a rule file,
+    then the project's ``.claude/sandbox-advisor.yaml``.
+    """
+    layers = [_DEFAULT_RULES]
+    for config_dir in _user_config_dirs():
+        candidate = config_dir / _RULES_FILENAME
+        if candidate.is_file():
+            layers.append(candidate)
+            break
+    project_dir = os.environ.get("CLAUDE_PROJECT_DIR", "")
+    if project_dir:
+        layers.append(Path(project_dir) / ".claude" / _RULES_FILENAME)
+    return [p for p in layers if p.is_file()]
+
+
+def _cache_dir() -> Path:
+    base = os.environ.get("SANDBOX_ADVISOR_CACHE_DIR", "")
+    if not base:
+        xdg = os.environ.get("XDG_CACHE_HOME", "") or os.path.join(
+            os.environ.get("HOME", ""), ".cache"
+        )
+        base = os.path.join(xdg, "pickled-claude-plugins", "sandbox-advisor")
+    return Path(base)
 
-# Per-mode error fingerprints, matched case-insensitively against the raw
-# payload text. git-write is deliberately broad: the same sandbox deny surfaces
-# as the index.lock message, a blocked-path "Operation not permitted", OR the
-# downstream "Could not reset index file" with no EPERM line visible. srb and
-# ps-top stay narrow because their failures are distinctive.
-_MODE_FINGERPRINTS = {
-    "git-write": (
-        "operation not permitted",
-        "index.lock",
-        "could not reset index file",
-        ".claude/agents",
-        ".claude/commands",
-        ".vscode/",
-        ".gitmodules",
-    ),
-    "srb": (
-        "operation not permitted",
-        "mdb_error",
-        "failed to create database",
-    ),
-    "ps-top": (
-        "operation not permitted",
-        "os error 1",
-    ),
-    "git-ssh": (
-        # SSH (port 22) egress is blocked outright by the sandbox network
-        # allowlist, which only permits HTTPS to specific hosts -- not the
-        # ssh-agent socket, which is a separate (and already-open) surface.
-        # Deliberately excludes the generic "operation not permitted"
-        # fingerprint: the `gh` matcher below is broad (any gh subcommand),
-        # and that string is common enough in unrelated gh failures to
-        # false-positive.
-        "port 22",
-        "could not read from remote repository",
-        "authentication method negotiation failed",
-        "connection closed by unknown port",
-        "failed to run git: exit status",
-    ),
-    "keychain-write": (
-        # macOS Keychain WRITES go through a Security.framework call the
-        # sandbox denies outright; READS are unaffected (confirmed
-        # empirically: `security find-generic-password` and `gh auth status`
-        # both succeed against an existing item). Narrow matcher below makes
-        # the generic "operation not permitted" fingerprint safe here.
-        "seckeychainitemcreatefromcontent",
-        "operation not permitted",
-    ),
-}
 
+def _cache_path() -> Path:
+    # marshal's format is tied to the interpreter version.
+    return _cache_dir() / "modes-py{}{}.marshal".format(*sys.version_info[:2])
+
+
+def _read_rule_file(path: Path) -> dict:
+    """Parse one rule file; an unreadable or malformed layer is skipped."""
+    import yaml  # only needed on a cache miss
+
+    try:
+        data = yaml.safe_load(path.read_text())
+    except (OSError, UnicodeDecodeError, yaml.YAMLError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _merge_layers(layers) -> dict:
+    """Merge rule files in order; later layers win per mode and per key."""
+    merged = {"wrappers": [], "options_with_values": {}, "modes": {}}
+    for path in layers:
+        data = _read_rule_file(path)
+        wrappers = data.get("wrappers")
+        if isinstance(wrappers, list):
+            merged["wrappers"].extend(w for w in wrappers if isinstance(w, list) and w)
+        options = data.get("options_with_values")
+        if isinstance(options, dict):
+            for argv0, opts in options.items():
+                if isinstance(opts, list):
+                    merged["options_with_values"].setdefault(str(argv0), set()).update(
+                        str(o) for o in opts
+                    )
+        modes = data.get("modes")
+        if isinstance(modes, dict):
+            for name, spec in modes.items():
+                if isinstance(spec, dict):
+                    merged["modes"].setdefault(str(name), {}).update(spec)
+    return merged
+
+
+def _valid_pattern(pattern: str) -> bool:
+    try:
+        re.compile(pattern)
+    except re.error:
+        return False
+    return True
+
+
+def compile_rules(merged: dict) -> dict:
+    """Compile merged rule data into the marshal-able matcher tables.
+
+    ``dispatch`` maps argv0 to ``(paths, lengths, takes_value, patterns,
+    default)``: ``paths`` maps a subcommand path (tuple of positional words)
+    to its mode, ``lengths`` lists the path lengths present (longest first),
+    ``takes_value`` holds argv0's options that consume the next word,
+    ``patterns`` is ``((regex, mode), ...)`` and ``default`` is the catch-all
+    mode. Paths, patterns and the catch-all are tried in that order,
+    narrowest first, and within each the earliest mode in the merged rules
+    wins, so classifying a segment is a couple of dict lookups. ``wrappers``
+    is keyed on a wrapper's first word. ``needles`` are substrings of every
+    argv0, for rejecting most command lines before tokenizing them. Modes
+    missing fingerprints or advice, or with ``enabled: false``, are dropped:
+    they could never produce advice.
+    """
+    dispatch = {}
+    fingerprints = {}
+    advice = {}
+    for mode, spec in merged["modes"].items():
+        if spec.get("enabled", True) is False:
+            continue
+        fps = tuple(str(fp).lower() for fp in spec.get("fingerprints") or () if fp)
+        text = spec.get("advice")
+        if not fps or not text:
+            continue
+        fingerprints[mode] = fps
+        advice[mode] = str(text).strip()
+        commands = spec.get("commands")
+        for matcher in commands if isinstance(commands, list) else ():
+            if not isinstance(matcher, dict) or not isinstance(matcher.get("argv0"), list):
+                continue
+            subcommands = [tuple(str(p).split()) for p in matcher.get("subcommands") or ()]
+            patterns = [
+                str(p) for p in matcher.get("patterns") or () if _valid_pattern(str(p))
+            ]
+            for argv0 in matcher["argv0"]:
+                paths, pattern_list, default = dispatch.setdefault(str(argv0), ({}, [], []))
+                for path in subcommands:
+                    if path:
+                        paths.setdefault(path, mode)
+                pattern_list.extend((p, mode) for p in patterns)
+                if not subcommands and not patterns:
+                    default.append(mode)
+    dispatch = {
+        argv0: (
+            paths,
+            tuple(sorted({len(p) for p in paths}, reverse=True)),
+            frozenset(merged["options_with_values"].get(argv0, ())),
+            tuple(pattern_list),
+            default[0] if default else None,
+        )
+        for argv0, (paths, pattern_list, default) in dispatch.items()
+    }
+    # The shortest argv0 spellings that every other one contains: a command
+    # line with none of them anywhere can't classify.
+    needles = []
+    for argv0 in sorted(dispatch, key=len):
+        if not any(needle in argv0 for needle in needles):
+            needles.append(argv0)
+    wrappers = {}
+    for wrapper in merged["wrappers"]:
+        wrapper = tuple(str(t) for t in wrapper)
+        wrappers.setdefault(wrapper[0], []).append(wrapper)
+    return {
+        "format": _COMPILED_FORMAT,
+        "dispatch": dispatch,
+        "wrappers": {k: tuple(v) for k, v in wrappers.items()},
+        "needles": tuple(needles),
+        "fingerprints": fingerprints,
+        "advice": advice,
+    }
+
+
+def _write_cache(path: Path, rules: dict) -> None:
+    """Atomically replace the cache; a failure only costs a recompile later."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as f:
+            marshal.dump(rules, f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
 
-def matches_mode_fingerprints(text: str, mode: str) -> bool:
+
+def load_rules() -> dict:
+    """Return the compiled rules, from the cache when no layer has changed."""
+    layers = rule_layers()
+    key = []
+    for path in layers:
+        st = path.stat()
+        key.append((str(path), st.st_mtime_ns, st.st_size))
+    key = tuple(key)
+    cache = _cache_path()
+    try:
+        with open(cache, "rb") as f:
+            cached = marshal.load(f)
+        if (
+            isinstance(cached, dict)
+            and cached.get("format") == _COMPILED_FORMAT
+            and cached.get("key") == key
+        ):
+            return cached
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    rules = compile_rules(_merge_layers(layers))
+    rules["key"] = key
+    _write_cache(cache, rules)
+    return rules
+
+
+@functools.lru_cache(maxsize=None)
+def _fingerprint_matcher(fingerprints_by_mode: tuple):
+    """Compile ``((mode, fingerprints), ...)`` into one scan pattern.
+
+    Every fingerprint of every candidate mode goes into ONE case-insensitive
+    pattern so a failure window is scanned in a single pass (the Aho-Corasick
+    idea, done by the C regex engine). The lookahead makes matches
+    zero-width, so overlapping fingerprints at different offsets are all
+    reported; longest-first alternation keeps a longer fingerprint from being
+    shadowed by its prefix. Returns ``(pattern, {fingerprint: modes})``.
+    """
+    owners = {}
+    for mode, fps in fingerprints_by_mode:
+        for fp in fps:
+            owners.setdefault(fp, set()).add(mode)
+    alternation = "|".join(re.escape(fp) for fp in sorted(owners, key=len, reverse=True))
+    return re.compile("(?=(" + alternation + "))", re.IGNORECASE), owners
+
+
+def _scan_for_mode(texts, mode: str, rules: dict) -> bool:
+    """True on the first fingerprint owned by `mode` found in any text."""
+    return _failing_mode(texts, [mode], rules) == mode
+
+
+def _failing_mode(texts, modes: list, rules: dict):
+    """Pick which of the candidate `modes` the failure output points at.
+
+    One combined pass over every candidate's fingerprints. With a single
+    candidate the first hit settles it. With several (one per classified
+    segment), a mode whose matched fingerprint no other candidate shares is
+    the stronger signal; ties go to the later segment, since a `&&` chain
+    stops at the command that failed.
+    """
+    candidates = tuple(
+        (m, rules["fingerprints"][m]) for m in modes if rules["fingerprints"].get(m)
+    )
+    if not candidates:
+        return None
+    pattern, owners = _fingerprint_matcher(candidates)
+    hits = {}
+    for text in texts:
+        for match in pattern.finditer(text):
+            owning = owners[match.group(1).lower()]
+            if len(candidates) == 1:
+                return candidates[0][0]
+            for mode in owning:
+                hits[mode] = hits.get(mode, False) or len(owning) == 1
+    if not hits:
+        return None
+    order = [m for m, _ in candidates]
+    return max(hits, key=lambda m: (hits[m], order.index(m)))
+
+
+def matches_mode_fingerprints(text: str, mode: str, rules: dict = None) -> bool:
     """True if the failure output carries a fingerprint for this mode."""
     if not text:
         return False
-    low = text.lower()
-    return any(fp in low for fp in _MODE_FINGERPRINTS.get(mode, ()))
-
-
-# git subcommands that write locally (worktree/index/refs), MINUS the ones
-# that talk to a remote -- those go through _GIT_NETWORK_SUBCOMMANDS instead,
-# since their sandbox failure mode (SSH port 22 egress) is unrelated to the
-# blocked-path denies this mode covers. Read-only forms (log/show/diff/
-# status/...) are intentionally absent so they classify as None.
-_GIT_WRITE_SUBCOMMANDS = {
-    "add", "commit", "rebase", "merge", "cherry-pick", "revert", "rm", "mv",
-    "restore", "reset", "am", "apply", "clean",
-    "checkout", "switch", "init", "stash", "worktree", "branch", "tag",
-}
+    return _scan_for_mode(_windows(text), mode, rules or load_rules())
 
-# git subcommands that talk to a remote -- fail under the sandbox because raw
-# SSH (port 22) egress is blocked, not because of a blocked write path.
-_GIT_NETWORK_SUBCOMMANDS = {"push", "fetch", "pull", "clone", "ls-remote"}
-
-_SRB_RE = re.compile(r"^(bundle\s+exec\s+)?(\./)?(bin/)?srb(\s|$)")
-_PS_TOP_RE = re.compile(r"^(rtk\s+)?(/usr/bin/|/bin/)?(ps|top)(\s|$)")
-# Deliberately broad: matches ANY gh subcommand, not just the ones that shell
-# out to git. Only `pr checkout`/`co`/`sw` and `repo sync` actually inherit
-# the current repo's remote protocol (and so hit this bug when that remote is
-# SSH); `repo clone`/`gist clone`/`repo fork --clone`/`extension install` use
-# gh's own `git_protocol` config instead, independent of any local remote.
-# The rest of gh is pure REST/GraphQL over HTTPS and never touches this path.
-# Fingerprint gating in decide_advice() is what keeps the broad match safe.
-_GH_RE = re.compile(r"^gh(\s|$)")
-# gh subcommands that write credentials to the macOS Keychain. Checked before
-# _GH_RE so these take "keychain-write" instead of falling into "git-ssh".
-_GH_AUTH_WRITE_RE = re.compile(
-    r"^gh\s+auth\s+(login|refresh|logout|setup-git)(\s|$)"
+
+# Tokenizing is two C-level findall passes. The first splits the command
+# line into segments at control operators; quoting, `$(...)`/backtick
+# substitutions and redirections (`2>&1`, `&>log`) are consumed whole, so
+# their `&`, `|`, `;` and parens don't split anything, and comments are
+# dropped. The second splits one segment into words. Quoted strings are
+# matched unrolled and nothing follows the repeated groups, so the engine
+# never backtracks into them: both passes are linear in the command length.
+_QUOTED = r"""'[^']*'|"[^"\\]*(?:\\.[^"\\]*)*"|`[^`\\]*(?:\\.[^`\\]*)*`"""
+_SUBSTITUTION = r"""\$\((?:[^()'"]|'[^']*'|"[^"\\]*(?:\\.[^"\\]*)*")*\)"""
+_SEGMENT_RE = re.compile(
+    r"""
+    (                                       # a segment:
+        (?:
+            [^;&|()\n'"\\`$<>\#]+           #   plain characters
+          | """ + _QUOTED + r"""
+          | """ + _SUBSTITUTION + r"""
+          | \\. | \$                         #   escape (incl. continuation), lone $
+          | [<>]+&?-? | &>+                 #   redirections
+          | (?<=[^\s;&|()])\#               #   a # inside a word
+        )+
+    )
+    | \#[^\n]*                              # comment
+    | &&|\|\||;;|\|&|[;&|\n()]              # control operators
+    """,
+    re.VERBOSE | re.DOTALL,
 )
-# `security` subcommands that write/delete keychain items (vs. find-*, which
-# only reads and is unaffected).
-_SECURITY_WRITE_RE = re.compile(
-    r"^security\s+(add|delete)-(generic|internet)-password(\s|$)"
+_WORD_RE = re.compile(
+    r"(?:[^\s'\"\\`$]+|" + _QUOTED + "|" + _SUBSTITUTION + r"|\\[^\n]|\$)+",
+    re.DOTALL,
 )
-_ENV_PREFIX_RE = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*=\S*\s+)+")
+# Most commands never reach the findall passes. One with none of these
+# characters is a single segment of plain words (str.split); the other cheap
+# routes are in _segment_strings and _segment_words.
+_SHELL_SPECIAL_RE = re.compile(r"""[;&|()\n'"\\`#$<>]""")
+_OPERATOR_RE = re.compile(r"[;&|\n()]+")
+_QUOTING_RE = re.compile(r"""'([^']*)'|"([^"\\]*(?:\\.[^"\\]*)*)"|\\(.)""", re.DOTALL)
+# Here-document bodies are data, not commands: collapse `<<EOF ... EOF` to
+# its introducer before tokenizing (see _collapse_heredocs).
+_HEREDOC_START_RE = re.compile(r"""<<-?[ \t]*(['"]?)(\w+)\1([^\n]*)\n""")
+_ENV_ASSIGNMENT_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*=")
+# Reserved words that can precede a simple command in a segment.
+_SHELL_KEYWORDS = {"!", "{", "}", "time", "if", "then", "else", "elif", "do", "while", "until"}
+
 
+def _unquote(word: str) -> str:
+    if "'" not in word and '"' not in word and "\\" not in word:
+        return word
+    quote = word[0]
+    if quote in "'\"" and word[-1] == quote and word.count(quote) == 2 and "\\" not in word:
+        return word[1:-1]
+    return _QUOTING_RE.sub(_unquote_match, word)
 
-def _strip_leading_cd_and_env(command: str) -> str:
-    """Reduce `cd <path> && FOO=bar <cmd>` to `<cmd>`.
 
-    Only a single leading `cd ... &&` is stripped (the dominant real shape);
-    further chaining is left intact so the segment we inspect is the real one.
+def _unquote_match(m) -> str:
+    single, double, escaped = m.groups()
+    if single is not None:
+        return single
+    return double if double is not None else escaped
+
+
+def _segment_strings(command: str) -> list:
+    """The command line's segments, as unsplit strings.
+
+    Here-documents must already be collapsed (_collapse_heredocs).
     """
-    seg = command.strip()
-    cd_match = re.match(r"^cd\s+\S+\s*&&\s*(.*)$", seg, re.DOTALL)
-    if cd_match:
-        seg = cd_match.group(1).strip()
-    seg = _ENV_PREFIX_RE.sub("", seg)
-    return seg.strip()
-
-
-def _git_subcommand(seg: str):
-    """Return the git subcommand token, or None if `seg` isn't a `git ...` call."""
-    toks = seg.split()
-    if not toks or toks[0] != "git":
-        return None
-    # Skip git global options to find the subcommand.
-    i = 1
-    while i < len(toks):
-        t = toks[i]
-        if t in ("-C", "-c", "--git-dir", "--work-tree", "--namespace"):
-            i += 2
+    if (
+        "\\" not in command and "`" not in command and "#" not in command
+        and "$" not in command and "<" not in command and ">" not in command
+    ):
+        single = "'" in command
+        if single == ('"' in command):
+            if not single:
+                return _split_operators(command)
+        else:
+            # One quote kind, so the quoted text is every other piece of a
+            # split on it; if none of that holds an operator, neither does
+            # any quoted word.
+            parts = command.split("'" if single else '"')
+            if len(parts) % 2 and not _has_operator(" ".join(parts[1::2])):
+                return _split_operators(command)
+    return _SEGMENT_RE.findall(command)
+
+
+def _collapse_heredocs(command: str) -> str:
+    """Replace each `<<EOF` line, body and `EOF` line with the `<<EOF` line.
+
+    The body ends at the first line that is just the delimiter (give or
+    take blanks and tabs); without one, the `<<` is left alone. The end is
+    found with `str.find`: bodies are often whole scripts, and stepping
+    through them in the regex engine was most of the cost of a command.
+    """
+    pieces = []
+    done = 0  # command[:done] is settled
+    pos = command.find("<<")
+    while pos >= 0:
+        start = _HEREDOC_START_RE.match(command, pos)
+        if start:
+            quote, word, rest = start.groups()
+            # Like the regex engine, fall back to shorter delimiters (only
+            # possible unquoted: a quote must follow the word).
+            for n in range(len(word), 0 if not quote else len(word) - 1, -1):
+                end = _heredoc_end(command, word[:n], start.end())
+                if end >= 0:
+                    pieces += (command[done:pos], "<<", word[:n], word[n:], rest)
+                    done = end
+                    break
+            else:
+                end = -1
+        if not start or end < 0:
+            pos = command.find("<<", pos + 1)
+            continue
+        pos = command.find("<<", done)
+    return "".join(pieces) + command[done:] if pieces else command
+
+
+def _heredoc_end(command: str, delimiter: str, body: int) -> int:
+    """Where the line that ends a heredoc body starting at `body` ends, or -1."""
+    found = command.find(delimiter, body)
+    while found >= 0:
+        line = command.rfind("\n", 0, found) + 1
+        end = command.find("\n", found)
+        end = len(command) if end < 0 else end
+        if (
+            line >= body
+            and not command[line:found].strip(" \t")
+            and not command[found + len(delimiter):end].strip(" \t")
+        ):
+            return end
+        found = command.find(delimiter, found + 1)
+    return -1
+
+
+def _has_operator(text: str) -> bool:
+    return (
+        ";" in text or "&" in text or "|" in text
+        or "(" in text or ")" in text or "\n" in text
+    )
+
+
+def _split_operators(command: str) -> list:
+    """`_OPERATOR_RE.split`, with a shortcut for the usual `a && b`.
+
+    Where `&&` is the only operator, splitting on it gives the same
+    segments (or an extra empty one, for `&&&&`, which has no words).
+    """
+    if (
+        ";" not in command and "|" not in command and "(" not in command
+        and ")" not in command and "\n" not in command
+        and command.count("&") == 2 * command.count("&&")
+    ):
+        return command.split("&&")
+    return _OPERATOR_RE.split(command)
+
+
+def _segment_words(segment: str) -> list:
+    """One segment's words, unquoted."""
+    # Single-character `in` tests are much cheaper than a character-class
+    # search, and most segments need none of the work below.
+    single = "'" in segment
+    double = '"' in segment
+    if "\\" not in segment and "`" not in segment and "$" not in segment:
+        if not single and not double:
+            return segment.split()
+        if single != double:
+            quote = "'" if single else '"'
+            if not segment.count(quote) % 2:
+                return _split_literal_quotes(segment, quote)
+    return [_unquote(w) for w in _WORD_RE.findall(segment)]
+
+
+def _split_literal_quotes(segment: str, quote: str) -> list:
+    """Split a segment whose only specials are balanced `quote` characters.
+
+    Without escapes, `$` or backticks, either quote kind is literal, so the
+    odd-numbered pieces of ``segment.split(quote)`` are the quoted text.
+    """
+    words = []
+    glue = False  # the next piece continues the last word
+    for i, part in enumerate(segment.split(quote)):
+        if i % 2:
+            if glue:
+                words[-1] += part
+            else:
+                words.append(part)
+            glue = True
+        elif part:
+            pieces = part.split()
+            if glue and not part[0].isspace():
+                words[-1] += pieces.pop(0)
+            words += pieces
+            glue = not part[-1].isspace()
+    return words
+
+
+def shell_segments(command: str) -> list:
+    """Split a command line into simple commands, each a list of words.
+
+    `cd a && cd b && git commit`, `(cd x; git push)` and `git commit | tee`
+    all come back as one segment per command. Pure tokenizing: nothing is
+    expanded or executed.
+    """
+    segments = _segment_strings(_collapse_heredocs(command))
+    return [words for words in map(_segment_words, segments) if words]
+
+
+def _command_words(words: list, rules: dict) -> list:
+    """Drop keywords, env assignments and launcher wrappers before argv0."""
+    dispatch = rules["dispatch"]
+    wrappers = rules["wrappers"]
+    i = 0
+    while i < len(words):
+        w = words[i]
+        if w in dispatch:
+            break
+        if w in _SHELL_KEYWORDS:
+            i += 2 if w == "time" and words[i + 1:i + 2] == ["-p"] else 1
             continue
-        if t.startswith("-"):
+        if "=" in w and _ENV_ASSIGNMENT_RE.match(w):
             i += 1
             continue
-        break
-    return toks[i] if i < len(toks) else ""
-
-
-def classify_command(command: str):
-    """Return 'git-write', 'git-ssh', 'keychain-write', 'srb', 'ps-top', or None."""
-    seg = _strip_leading_cd_and_env(command)
-    if _SRB_RE.match(seg):
-        return "srb"
-    if _PS_TOP_RE.match(seg):
-        return "ps-top"
-    if _GH_AUTH_WRITE_RE.match(seg) or _SECURITY_WRITE_RE.match(seg):
-        return "keychain-write"
-    sub = _git_subcommand(seg)
-    if sub in _GIT_NETWORK_SUBCOMMANDS or _GH_RE.match(seg):
-        return "git-ssh"
-    if sub in _GIT_WRITE_SUBCOMMANDS:
-        return "git-write"
-    return None
-
-
-# Advisory, not directive. We acknowledge the command is a KNOWN sandbox
-# failure mode and that this is likely (not certainly) why it failed, then
-# offer the fix. This honesty is what makes the broad git fingerprints safe:
-# we never assert "definitely the sandbox," we say "known to fail this way."
-_ADVICE = {
-    "git-write": (
-        "Heads up: git writes inside pt worktrees are KNOWN to fail under the "
-        "Claude Code command sandbox (the blocked .claude/.vscode/.gitmodules "
-        "paths and .git/worktrees/.../index.lock, which allowWrite cannot "
-        "override). If that's why this failed, re-run with "
-        "dangerouslyDisableSandbox: true."
-    ),
-    "srb": (
-        "Heads up: srb (sorbet) is KNOWN to fail under the Claude Code command "
-        "sandbox -- it caches in LMDB, which uses SysV semaphores the sandbox "
-        "denies (semctl/semop EPERM); the cache dir is already writable so "
-        "allowWrite cannot fix it. If that's why this failed, re-run with "
-        "dangerouslyDisableSandbox: true."
-    ),
-    "ps-top": (
-        "Heads up: ps/top are KNOWN to fail under the Claude Code command "
-        "sandbox -- they are setuid-root binaries and the sandbox denies "
-        "executing setuid/setgid binaries. They are read-only and safe "
-        "unsandboxed. If that's why this failed, re-run with "
-        "dangerouslyDisableSandbox: true."
-    ),
-    "git-ssh": (
-        "Heads up: git operations over SSH (push, fetch, pull, clone, "
-        "ls-remote), or `gh pr checkout`/`gh repo sync` against a repo whose "
-        "remote is an SSH URL, are KNOWN to fail under the Claude Code "
-        "command sandbox -- the network sandbox only allows HTTPS to "
-        "specific allowlisted hosts, so raw SSH on port 22 is blocked "
-        "outright. This is NOT the ssh-agent socket, which is already open. "
-        "If that's why this failed, re-run with dangerouslyDisableSandbox: "
-        "true, or fix it durably by switching the remote to HTTPS: `git "
-        "remote set-url origin https://github.com/OWNER/REPO.git` (and, if "
-        "cloning/forking fresh via gh, `gh config set -h github.com "
-        "git_protocol https`)."
-    ),
-    "keychain-write": (
-        "Heads up: writing to the macOS Keychain (`gh auth login`/`refresh`/"
-        "`logout`/`setup-git`, or `security add-*-password`/`delete-*-"
-        "password`) is KNOWN to fail under the Claude Code command sandbox "
-        "-- Keychain reads are fine (gh reading an already-stored token "
-        "works), but the write call is denied outright. If that's why this "
-        "failed, re-run with dangerouslyDisableSandbox: true. There's no "
-        "sandbox setting that fixes this durably; the practical workaround "
-        "is to run the auth/write step once outside the sandbox -- reads "
-        "of the resulting credential work fine sandboxed afterward."
-    ),
+        for wrapper in wrappers.get(w, ()):
+            if tuple(words[i:i + len(wrapper)]) == wrapper:
+                i += len(wrapper)
+                break
+        else:
+            break
+    return words[i:]
+
+
+def _classify_words(words: list, rules: dict):
+    """Classify one segment's words against the compiled table."""
+    dispatch = rules["dispatch"]
+    if words[0] not in dispatch:
+        words = _command_words(words, rules)
+        if not words or words[0] not in dispatch:
+            return None
+    paths, lengths, takes_value, patterns, default = dispatch[words[0]]
+    if paths:
+        # Up to lengths[0] positional words after argv0, skipping options
+        # and the values of options that take one.
+        limit = lengths[0]
+        positional = []
+        skip = False
+        for w in words[1:]:
+            if skip:
+                skip = False
+            elif w in takes_value:
+                skip = True
+            elif w[:1] != "-":
+                positional.append(w)
+                if len(positional) == limit:
+                    break
+        positional = tuple(positional)
+        for n in lengths:
+            mode = paths.get(positional[:n])
+            if mode:
+                return mode
+    if patterns:
+        rest = " ".join(words[1:])
+        for pattern, mode in patterns:
+            if re.match(pattern, rest):
+                return mode
+    return default
+
+
+def _mentions_argv0(text: str, needles: tuple) -> bool:
+    """False if no word of `text` can be an argv0, for a few substring tests.
+
+    A segment only classifies if one of its words is an argv0. Unquoting a
+    word just drops quote and backslash characters, so that argv0 is then
+    in the text without them, and so is one of the `needles`.
+    """
+    if "'" in text:
+        text = text.replace("'", "")
+    if '"' in text:
+        text = text.replace('"', "")
+    if "\\" in text:
+        text = text.replace("\\", "")
+    for needle in needles:
+        if needle in text:
+            return True
+    return False
+
+
+def classify_segments(command: str, rules: dict = None) -> list:
+    """Return the failure modes of `command`'s segments, in order.
+
+    Segments that don't belong to any mode are left out.
+    """
+    rules = rules or load_rules()
+    needles = rules["needles"]
+    # Most command lines have no argv0 anywhere and stop here.
+    if not _mentions_argv0(command, needles):
+        return []
+    known = rules["dispatch"].keys()
+    if not _SHELL_SPECIAL_RE.search(command):
+        # The common case: one segment of plain words.
+        words = command.split()
+        if known.isdisjoint(words):
+            return []
+        mode = _classify_words(words, rules)
+        return [mode] if mode else []
+    if "<<" in command:
+        # Here-document bodies are often whole scripts, full of needles
+        # that aren't commands; without them, most such lines have none.
+        command = _collapse_heredocs(command)
+        if not _mentions_argv0(command, needles):
+            return []
+    modes = []
+    segments = _segment_strings(command)
+    for segment in segments:
+        # With one segment, that's the check just made.
+        if len(segments) > 1 and not _mentions_argv0(segment, needles):
+            continue
+        words = _segment_words(segment)
+        # argv0, after any keywords/wrappers, is one of the words; most
+        # segments have none of them and stop here.
+        if not known.isdisjoint(words):
+            mode = _classify_words(words, rules)
+            if mode:
+                modes.append(mode)
+    return modes
+
+
+def classify_command(command: str, rules: dict = None):
+    """Return the first failure mode found in `command` (e.g. 'git-write'), or None."""
+    modes = classify_segments(command, rules)
+    return modes[0] if modes else None
+
+
+# Only the head and tail of each failure-output string are scanned: the
+# sandbox denies show up where the command died (the first error) or where it
+# gave up (the last lines), and failed builds can carry megabytes of output in
+# between. Size is per end, in characters.
+def _scan_window() -> int:
+    try:
+        return max(1, int(os.environ["SANDBOX_ADVISOR_SCAN_WINDOW"]))
+    except (KeyError, ValueError):
+        return 64 * 1024
+
+
+_SCAN_WINDOW = _scan_window()
+
+# Hook-envelope fields that never carry failure output. tool_input is the
+# important one: skipping it keeps fingerprints from false-matching the
+# command text (e.g. a commit message saying "operation not permitted").
+_NON_OUTPUT_KEYS = {
+    "tool_input", "tool_name", "tool_use_id", "session_id", "transcript_path",
+    "cwd", "hook_event_name", "permission_mode",
 }
 
 
-def _error_text(payload: dict) -> str:
-    """Serialize the payload EXCEPT tool_input, so fingerprints match the
-    failure output regardless of which field carries it, without
-    false-matching the command text (which lives in tool_input)."""
-    rest = {k: v for k, v in payload.items() if k != "tool_input"}
-    return json.dumps(rest, default=str)
+def _windows(text: str):
+    """The head and tail windows of `text` (the whole thing if it's small)."""
+    if len(text) <= 2 * _SCAN_WINDOW:
+        return (text,)
+    return (text[:_SCAN_WINDOW], text[-_SCAN_WINDOW:])
 
 
-def decide_advice(payload: dict):
-    """Return advisory text to inject, or None to stay silent."""
+def _failure_output_windows(payload: dict):
+    """Yield bounded windows of every string in the failure-output fields.
+
+    Walks the payload minus the envelope keys, so it doesn't matter which
+    field carries the output (``error``, ``tool_response.stderr``, ...), and
+    never serializes or lowercases the full payload.
+    """
+    stack = [v for k, v in payload.items() if k not in _NON_OUTPUT_KEYS]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, str):
+            yield from _windows(value)
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+
+
+def decide_mode(payload: dict, rules: dict):
+    """Return the failure mode to advise on for this payload, or None."""
     tool_input = payload.get("tool_input") or {}
     command = tool_input.get("command") or ""
     if not command:
@@ -220,14 +671,92 @@ def decide_advice(payload: dict):
     # Loop guard: if it already ran unsandboxed, "re-run unsandboxed" is wrong.
     if tool_input.get("dangerouslyDisableSandbox"):
         return None
-    mode = classify_command(command)
-    if mode is None:
+    modes = list(dict.fromkeys(classify_segments(command, rules)))
+    if not modes:
         return None
-    # Require one of THIS mode's fingerprints in the failure payload, so an
+    # Require a candidate mode's fingerprint in the failure payload, so an
     # srb type-error or a non-sandbox git error does not trigger advice.
-    if not matches_mode_fingerprints(_error_text(payload), mode):
-        return None
-    return _ADVICE[mode]
+    return _failing_mode(_failure_output_windows(payload), modes, rules)
+
+
+def decide_advice(payload: dict, rules: dict = None):
+    """Return advisory text to inject, or None to stay silent."""
+    rules = rules or load_rules()
+    mode = decide_mode(payload, rules)
+    return rules["advice"][mode] if mode else None
+
+
+# Session dedup. Once a mode's advice has been injected into a session, the
+# agent has it in context; repeating the same paragraph on every retry of
+# `git commit` only bloats the transcript. State is one small JSON file,
+# {session_id: {mode: last_advised_epoch}}, replaced atomically, with entries
+# older than _SESSION_TTL evicted and at most _MAX_SESSIONS kept (most recent
+# first). Any problem reading or writing it means "advise" (fail open).
+_STATE_FILENAME = "sessions.json"
+_SESSION_TTL = 24 * 60 * 60
+_MAX_SESSIONS = 256
+
+
+def _repeat_window() -> float:
+    """Seconds during which a mode's advice isn't repeated in a session."""
+    try:
+        return max(0.0, float(os.environ["SANDBOX_ADVISOR_REPEAT_WINDOW"]))
+    except (KeyError, ValueError):
+        return 30 * 60.0
+
+
+def _prune_sessions(state: dict, now: float) -> dict:
+    """Drop expired entries and cap the number of sessions kept."""
+    live = {}
+    for session_id, modes in state.items():
+        if not isinstance(modes, dict):
+            continue
+        fresh = {
+            m: t for m, t in modes.items()
+            if isinstance(t, (int, float)) and now - t < _SESSION_TTL
+        }
+        if fresh:
+            live[session_id] = fresh
+    if len(live) > _MAX_SESSIONS:
+        newest = sorted(live, key=lambda sid: max(live[sid].values()), reverse=True)
+        live = {sid: live[sid] for sid in newest[:_MAX_SESSIONS]}
+    return live
+
+
+def recently_advised(session_id, mode: str, now: float = None) -> bool:
+    """True if `mode` was advised in this session within the repeat window.
+
+    Otherwise records this advice as given and returns False. Without a
+    session_id there's nothing to key on, so advice is never suppressed.
+    """
+    if not session_id:
+        return False
+    now = time.time() if now is None else now
+    path = _cache_dir() / _STATE_FILENAME
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    state = _prune_sessions(state if isinstance(state, dict) else {}, now)
+    seen = state.setdefault(session_id, {})
+    last = seen.get(mode)
+    if last is not None and now - last < _repeat_window():
+        return True
+    seen[mode] = now
+    state = _prune_sessions(state, now)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+    return False
 
 
 def main() -> None:
@@ -238,7 +767,10 @@ def main() -> None:
         sys.exit(0)
     reason = None
     try:
-        reason = decide_advice(payload)
+        rules = load_rules()
+        mode = decide_mode(payload, rules)
+        if mode and not recently_advised(payload.get("session_id"), mode):
+            reason = rules["advice"][mode]
     except Exception:
         sys.exit(0)
     if reason:
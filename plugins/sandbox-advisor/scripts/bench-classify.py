@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Benchmark advise.py's shell-segment classifier against the old regex pipeline.
+
+The baseline below is the pre-tokenizer classifier (a single leading `cd ..
+&&` strip, env-prefix strip, then one regex per mode), kept here verbatim so
+the comparison stays honest as advise.py evolves.
+
+Usage:
+    uv run python scripts/bench-classify.py [COMMANDS_FILE] [-n N] [--repeat R]
+
+COMMANDS_FILE holds recorded Bash commands, one JSON string per line (so
+multi-line commands survive), e.g. extracted from transcripts with
+`jq -c '.message.content[]? | select(.name == "Bash") | .input.command'`.
+Without it, a synthetic mix of N (default 100k) commands is used. Each
+implementation's best of R interleaved runs is reported.
+"""
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HOOK = Path(__file__).resolve().parent.parent / "hooks" / "advise.py"
+
+# --- baseline: the regex pipeline this replaced ------------------------------
+
+_GIT_WRITE_SUBCOMMANDS = {
+    "add", "commit", "rebase", "merge", "cherry-pick", "revert", "rm", "mv",
+    "restore", "reset", "am", "apply", "clean",
+    "checkout", "switch", "init", "stash", "worktree", "branch", "tag",
+}
+_GIT_NETWORK_SUBCOMMANDS = {"push", "fetch", "pull", "clone", "ls-remote"}
+_SRB_RE = re.compile(r"^(bundle\s+exec\s+)?(\./)?(bin/)?srb(\s|$)")
+_PS_TOP_RE = re.compile(r"^(rtk\s+)?(/usr/bin/|/bin/)?(ps|top)(\s|$)")
+_GH_RE = re.compile(r"^gh(\s|$)")
+_GH_AUTH_WRITE_RE = re.compile(r"^gh\s+auth\s+(login|refresh|logout|setup-git)(\s|$)")
+_SECURITY_WRITE_RE = re.compile(r"^security\s+(add|delete)-(generic|internet)-password(\s|$)")
+_ENV_PREFIX_RE = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*=\S*\s+)+")
+
+
+def _baseline_strip(command):
+    seg = command.strip()
+    cd_match = re.match(r"^cd\s+\S+\s*&&\s*(.*)$", seg, re.DOTALL)
+    if cd_match:
+        seg = cd_match.group(1).strip()
+    seg = _ENV_PREFIX_RE.sub("", seg)
+    return seg.strip()
+
+
+def _baseline_git_subcommand(seg):
+    toks = seg.split()
+    if not toks or toks[0] != "git":
+        return None
+    i = 1
+    while i < len(toks):
+        t = toks[i]
+        if t in ("-C", "-c", "--git-dir", "--work-tree", "--namespace"):
+            i += 2
+            continue
+        if t.startswith("-"):
+            i += 1
+            continue
+        break
+    return toks[i] if i < len(toks) else ""
+
+
+def baseline_classify(command):
+    seg = _baseline_strip(command)
+    if _SRB_RE.match(seg):
+        return "srb"
+    if _PS_TOP_RE.match(seg):
+        return "ps-top"
+    if _GH_AUTH_WRITE_RE.match(seg) or _SECURITY_WRITE_RE.match(seg):
+        return "keychain-write"
+    sub = _baseline_git_subcommand(seg)
+    if sub in _GIT_NETWORK_SUBCOMMANDS or _GH_RE.match(seg):
+        return "git-ssh"
+    if sub in _GIT_WRITE_SUBCOMMANDS:
+        return "git-write"
+    return None
+
+
+# --- harness -----------------------------------------------------------------
+
+_SYNTHETIC = [
+    "git status",
+    "git add . && git commit -m 'wip: tidy up the parser'",
+    "cd repos/app/worktrees/feature && git commit -m \"fix: handle empty input\"",
+    "bundle exec rspec spec/models/user_spec.rb --format progress",
+    "bundle exec srb tc",
+    "ls -la src/",
+    "rg -n 'def classify' plugins/ | head -20",
+    "gh pr view 123 --json title,body",
+    "npm test -- --watch=false 2>&1 | tail -40",
+    "FOO=1 BAR=2 make test",
+    "cat README.md",
+    "(cd web && yarn build)",
+    "python -m pytest -q tests/test_advise_unit.py",
+    "git log --oneline -20",
+    "git push origin HEAD",
+    "ps aux | grep ruby",
+]
+
+
+def _load_commands(path, n):
+    if path:
+        with open(path) as f:
+            commands = [json.loads(line) for line in f if line.strip()]
+    else:
+        commands = _SYNTHETIC
+    return list(itertools.islice(itertools.cycle(commands), n))
+
+
+def _run(fn, commands):
+    start = time.perf_counter()
+    for command in commands:
+        fn(command)
+    return time.perf_counter() - start
+
+
+def _time(fns, commands, repeat):
+    # Interleave the candidates and keep each one's best run, so machine
+    # noise and frequency drift hit both alike.
+    best = [float("inf")] * len(fns)
+    for _ in range(repeat):
+        for i, fn in enumerate(fns):
+            best[i] = min(best[i], _run(fn, commands))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("commands_file", nargs="?")
+    parser.add_argument("-n", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Keep the benchmark off the real rules cache and personal rule files.
+    tmp = tempfile.mkdtemp()
+    os.environ["SANDBOX_ADVISOR_CACHE_DIR"] = tmp
+    os.environ["CLAUDE_CONFIG_DIR"] = tmp
+    os.environ.pop("CLAUDE_PROJECT_DIR", None)
+    spec = importlib.util.spec_from_file_location("advise", HOOK)
+    advise = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(advise)
+    rules = advise.load_rules()
+
+    commands = _load_commands(args.commands_file, args.n)
+    baseline, segments = _time(
+        [baseline_classify, lambda c: advise.classify_segments(c, rules)],
+        commands,
+        args.repeat,
+    )
+    n = len(commands)
+    print(f"{n} commands")
+    print(f"  regex pipeline:   {baseline:.3f}s  ({baseline / n * 1e6:.2f} us/cmd)")
+    print(f"  segment tokenizer:{segments:.3f}s  ({segments / n * 1e6:.2f} us/cmd)")
+    print(f"  speedup:          {baseline / segments:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,18 @@
+"""Pytest configuration for sandbox-advisor tests."""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_rules(tmp_path, monkeypatch):
+    """Keep every test on the plugin's default rules and a private cache.
+
+    Points the user config dir at an empty directory, drops any project dir,
+    and sends the compiled-rules cache to tmp, so a developer's personal
+    sandbox-advisor.yaml (or a stale cache) can't leak into the results. The
+    environment is inherited by the hook subprocesses too.
+    """
+    user_dir = tmp_path / "claude-config"
+    user_dir.mkdir()
+    monkeypatch.setenv("CLAUDE_CONFIG_DIR", str(user_dir))
+    monkeypatch.delenv("CLAUDE_PROJECT_DIR", raising=False)
+    monkeypatch.setenv("SANDBOX_ADVISOR_CACHE_DIR", str(tmp_path / "cache"))
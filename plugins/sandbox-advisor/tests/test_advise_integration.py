@@ -102,3 +102,15 @@ def test_empty_stdin_fails_open():
     result = _run("")
     assert result.returncode == 0
     assert result.stdout.strip() == ""
+
+
+def test_repeat_advice_suppressed_within_session():
+    payload = json.loads((FIXTURES / "git-write-eperm.json").read_text())
+    payload["session_id"] = "abc-123"
+    first = _run(json.dumps(payload))
+    second = _run(json.dumps(payload))
+    assert _advice(first)
+    assert second.returncode == 0
+    assert _advice(second) is None
+    payload["session_id"] = "def-456"
+    assert _advice(_run(json.dumps(payload)))
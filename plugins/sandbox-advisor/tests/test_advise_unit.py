@@ -1,5 +1,6 @@
 """Unit tests for sandbox-advisor pure functions."""
 import importlib.util
+import json
 from pathlib import Path
 
 _spec = importlib.util.spec_from_file_location(
@@ -102,6 +103,49 @@ class TestMatchesModeFingerprints:
             "Operation not permitted", "keychain-write"
         )
 
+    def test_case_insensitive(self):
+        assert advise.matches_mode_fingerprints("OPERATION NOT PERMITTED", "srb")
+
+    def test_overlapping_fingerprints_all_seen(self):
+        # git-ssh only owns "port 22" here, not the EPERM string that
+        # follows it; the single combined pass must still report it.
+        assert advise.matches_mode_fingerprints(
+            "connect to host x port 22: Operation not permitted", "git-ssh"
+        )
+
+
+class TestBoundedScan:
+    def _payload(self, output):
+        return {
+            "tool_input": {"command": "srb tc"},
+            "tool_response": {"stdout": output, "stderr": ""},
+        }
+
+    def test_fingerprint_in_tail_of_huge_output_found(self):
+        big = "x" * (advise._SCAN_WINDOW * 4) + "\nmdb_error: Operation not permitted"
+        assert advise.decide_advice(self._payload(big)) is not None
+
+    def test_fingerprint_in_head_of_huge_output_found(self):
+        big = "Operation not permitted\n" + "x" * (advise._SCAN_WINDOW * 4)
+        assert advise.decide_advice(self._payload(big)) is not None
+
+    def test_middle_of_huge_output_not_scanned(self):
+        pad = "x" * (advise._SCAN_WINDOW * 2)
+        big = pad + "Operation not permitted" + pad
+        assert advise.decide_advice(self._payload(big)) is None
+
+    def test_envelope_fields_not_scanned(self):
+        payload = self._payload("typecheck errors")
+        payload["cwd"] = "/tmp/operation not permitted"
+        assert advise.decide_advice(payload) is None
+
+    def test_nested_error_field_scanned(self):
+        payload = {
+            "tool_input": {"command": "ps aux"},
+            "error": [{"detail": "ps: os error 1"}],
+        }
+        assert advise.decide_advice(payload) is not None
+
 
 class TestClassifyCommand:
     def test_bare_git_write(self):
@@ -206,6 +250,196 @@ class TestClassifyCommand:
             "security find-generic-password -a foo -s bar"
         ) is None
 
+    def test_git_global_option_value_skipped(self):
+        assert advise.classify_command("git -C repo commit -m x") == "git-write"
+
+    def test_env_prefix_before_git(self):
+        assert advise.classify_command(
+            "GIT_EDITOR=true FOO=1 git rebase --continue"
+        ) == "git-write"
+
+
+class TestShellSegments:
+    def test_and_chain(self):
+        assert advise.shell_segments("cd a && cd b && git commit -m x") == [
+            ["cd", "a"], ["cd", "b"], ["git", "commit", "-m", "x"],
+        ]
+
+    def test_subshell(self):
+        assert advise.shell_segments("(cd x; git push)") == [
+            ["cd", "x"], ["git", "push"],
+        ]
+
+    def test_pipe_and_redirection(self):
+        assert advise.shell_segments("git commit 2>&1 | tee log") == [
+            ["git", "commit", "2>&1"], ["tee", "log"],
+        ]
+
+    def test_operators_inside_quotes_do_not_split(self):
+        assert advise.shell_segments("git commit -m 'a && b; c | d'") == [
+            ["git", "commit", "-m", "a && b; c | d"],
+        ]
+        assert advise.shell_segments("echo \"it's (fine)\" && git push") == [
+            ["echo", "it's (fine)"], ["git", "push"],
+        ]
+
+    def test_quotes_join_adjacent_text(self):
+        assert advise.shell_segments("git log --format='%h %s'x") == [
+            ["git", "log", "--format=%h %sx"],
+        ]
+
+    def test_substitution_and_comment(self):
+        assert advise.shell_segments("echo $(git rev-parse HEAD; true) # git push") == [
+            ["echo", "$(git rev-parse HEAD; true)"],
+        ]
+
+    def test_heredoc_body_is_not_commands(self):
+        command = "cat <<'EOF' > msg\ngit push; rm -rf /\nEOF\ngit commit -F msg"
+        assert advise.shell_segments(command) == [
+            ["cat", "<<EOF", ">", "msg"], ["git", "commit", "-F", "msg"],
+        ]
+
+    def test_heredoc_unterminated_or_shorter_delimiter(self):
+        # No `EOF` line: the body is left to tokenize.
+        assert advise.shell_segments("cat <<EOF\ngit push") == [
+            ["cat", "<<EOF"], ["git", "push"],
+        ]
+        # `EOFX` has no end line, but its prefix `EOF` does.
+        assert advise.shell_segments("cat <<EOFX\ngit push\nEOF\nls") == [
+            ["cat", "<<EOFX"], ["ls"],
+        ]
+
+    def test_quoted_operators_with_both_quote_kinds(self):
+        assert advise.shell_segments("""git commit -m "it's a; b" && ls""") == [
+            ["git", "commit", "-m", "it's a; b"], ["ls"],
+        ]
+
+
+class TestClassifySegments:
+    def test_every_segment_classified(self):
+        assert advise.classify_segments("git add . && git push origin HEAD") == [
+            "git-write", "git-ssh",
+        ]
+
+    def test_chained_cds(self):
+        assert advise.classify_segments("cd a && cd b && git commit -m wip") == [
+            "git-write",
+        ]
+
+    def test_subshell(self):
+        assert advise.classify_segments("(cd x; git push)") == ["git-ssh"]
+
+    def test_pipeline(self):
+        assert advise.classify_segments("git commit -m wip | tee log") == ["git-write"]
+
+    def test_time_keyword(self):
+        assert advise.classify_command("time git push") == "git-ssh"
+        assert advise.classify_command("time -p git push") == "git-ssh"
+
+    def test_quoted_operator_is_not_a_segment(self):
+        assert advise.classify_segments("echo 'ok; git push'") == []
+
+    def test_heredoc_script_mentions_are_not_commands(self):
+        command = "python - <<'EOF'\nimport subprocess\nsubprocess.run(['git', 'push'])\nEOF"
+        assert advise.classify_segments(command) == []
+        assert advise.classify_segments(command + "\ngit push") == ["git-ssh"]
+
+    def test_later_segment_classified(self):
+        assert advise.classify_command("make build && ps aux") == "ps-top"
+
+
+class TestClassifierTable:
+    def test_every_default_mode_is_dispatched(self):
+        rules = advise.load_rules()
+        dispatched = set()
+        for paths, _, _, patterns, default in rules["dispatch"].values():
+            dispatched.update(paths.values())
+            dispatched.update(m for _, m in patterns)
+            dispatched.add(default)
+        dispatched.discard(None)
+        assert dispatched == set(rules["advice"]) == {
+            "git-write", "srb", "ps-top", "git-ssh", "keychain-write",
+        }
+
+    def test_narrower_rule_wins_within_argv0(self):
+        # keychain-write's gh matcher has subcommands, so it is tried before
+        # git-ssh's catch-all gh matcher regardless of file order.
+        assert advise.classify_command("gh auth login -h x") == "keychain-write"
+        assert advise.classify_command("gh auth token") == "git-ssh"
+
+
+class TestRuleLayers:
+    def _project_rules(self, tmp_path, monkeypatch, text):
+        rules_dir = tmp_path / "project" / ".claude"
+        rules_dir.mkdir(parents=True)
+        path = rules_dir / "sandbox-advisor.yaml"
+        path.write_text(text)
+        monkeypatch.setenv("CLAUDE_PROJECT_DIR", str(tmp_path / "project"))
+        return path
+
+    def test_project_adds_mode(self, tmp_path, monkeypatch):
+        self._project_rules(tmp_path, monkeypatch, (
+            "modes:\n"
+            "  npm-cache:\n"
+            "    commands:\n"
+            "      - argv0: [npm]\n"
+            "        subcommands: [install, ci]\n"
+            "    fingerprints: [EPERM, _cacache]\n"
+            "    advice: npm cache is outside the sandbox allowlist.\n"
+        ))
+        assert advise.classify_command("npm ci") == "npm-cache"
+        assert advise.classify_command("npm test") is None
+        reason = advise.decide_advice({
+            "tool_input": {"command": "npm install"},
+            "tool_response": {"stderr": "npm ERR! code EPERM ~/.npm/_cacache"},
+        })
+        assert reason == "npm cache is outside the sandbox allowlist."
+        # Defaults are still there underneath.
+        assert advise.classify_command("git commit -m x") == "git-write"
+
+    def test_user_layer_then_project_override(self, tmp_path, monkeypatch):
+        user_dir = tmp_path / "user"
+        user_dir.mkdir()
+        (user_dir / "sandbox-advisor.yaml").write_text(
+            "modes:\n  srb:\n    advice: user srb advice\n"
+        )
+        monkeypatch.setenv("CLAUDE_CONFIG_DIR", str(user_dir))
+        assert advise.load_rules()["advice"]["srb"] == "user srb advice"
+        self._project_rules(
+            tmp_path, monkeypatch, "modes:\n  srb:\n    advice: project srb advice\n"
+        )
+        rules = advise.load_rules()
+        assert rules["advice"]["srb"] == "project srb advice"
+        # Only the overridden key changed.
+        assert "mdb_error" in rules["fingerprints"]["srb"]
+
+    def test_mode_can_be_disabled(self, tmp_path, monkeypatch):
+        self._project_rules(
+            tmp_path, monkeypatch, "modes:\n  ps-top:\n    enabled: false\n"
+        )
+        assert advise.classify_command("ps aux") is None
+
+    def test_malformed_layer_is_skipped(self, tmp_path, monkeypatch):
+        self._project_rules(tmp_path, monkeypatch, "modes: [unterminated\n")
+        assert advise.classify_command("git add .") == "git-write"
+
+    def test_warm_load_skips_compile(self, monkeypatch):
+        advise.load_rules()
+
+        def boom(_layers):
+            raise AssertionError("recompiled despite unchanged layers")
+
+        monkeypatch.setattr(advise, "_merge_layers", boom)
+        assert advise.load_rules()["advice"]["srb"]
+
+    def test_changed_layer_invalidates_cache(self, tmp_path, monkeypatch):
+        path = self._project_rules(
+            tmp_path, monkeypatch, "modes:\n  srb:\n    advice: first\n"
+        )
+        assert advise.load_rules()["advice"]["srb"] == "first"
+        path.write_text("modes:\n  srb:\n    advice: second, longer\n")
+        assert advise.load_rules()["advice"]["srb"] == "second, longer"
+
 
 class TestDecideAdvice:
     def _payload(self, command, output, unsandboxed=False):
@@ -343,3 +577,55 @@ class TestDecideAdvice:
             )
         )
         assert reason is None
+
+    def test_failing_segment_mode_is_reported(self):
+        # Both segments classify; only git-ssh's fingerprint is in the output.
+        reason = advise.decide_advice(
+            self._payload(
+                "git add . && git push",
+                "ssh: connect to host github.com port 22: Operation timed out",
+            )
+        )
+        assert reason is not None
+        assert "SSH" in reason
+
+
+class TestSessionDedup:
+    def test_repeat_in_same_session_suppressed(self):
+        assert not advise.recently_advised("s1", "git-write", now=1000)
+        assert advise.recently_advised("s1", "git-write", now=1010)
+
+    def test_other_mode_or_session_not_suppressed(self):
+        assert not advise.recently_advised("s1", "git-write", now=1000)
+        assert not advise.recently_advised("s1", "srb", now=1001)
+        assert not advise.recently_advised("s2", "git-write", now=1002)
+
+    def test_advises_again_after_window(self, monkeypatch):
+        monkeypatch.setenv("SANDBOX_ADVISOR_REPEAT_WINDOW", "60")
+        assert not advise.recently_advised("s1", "srb", now=1000)
+        assert advise.recently_advised("s1", "srb", now=1059)
+        assert not advise.recently_advised("s1", "srb", now=1061)
+
+    def test_no_session_id_never_suppresses(self):
+        assert not advise.recently_advised(None, "srb", now=1000)
+        assert not advise.recently_advised(None, "srb", now=1001)
+
+    def test_corrupt_state_fails_open(self):
+        path = advise._cache_dir() / advise._STATE_FILENAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("{not json")
+        assert not advise.recently_advised("s1", "srb", now=1000)
+        assert advise.recently_advised("s1", "srb", now=1001)
+
+    def test_state_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(advise, "_MAX_SESSIONS", 3)
+        for i in range(10):
+            advise.recently_advised(f"s{i}", "srb", now=1000 + i)
+        state = json.loads((advise._cache_dir() / advise._STATE_FILENAME).read_text())
+        assert sorted(state) == ["s7", "s8", "s9"]
+
+    def test_expired_sessions_evicted(self):
+        advise.recently_advised("old", "srb", now=1000)
+        advise.recently_advised("new", "srb", now=1000 + advise._SESSION_TTL + 1)
+        state = json.loads((advise._cache_dir() / advise._STATE_FILENAME).read_text())
+        assert list(state) == ["new"]
@@ -36,3 +36,14 @@ def test_hook_script_has_shebang():
     script = PLUGIN_ROOT / "hooks" / "advise.py"
     first_line = script.read_text().splitlines()[0]
     assert first_line.startswith("#!"), "hook script needs a shebang"
+
+
+def test_default_rules_parse_and_define_modes():
+    import yaml
+
+    rules = yaml.safe_load((PLUGIN_ROOT / "hooks" / "modes.yaml").read_text())
+    assert rules["modes"], "expected the default failure modes"
+    for name, mode in rules["modes"].items():
+        assert mode["commands"], f"{name}: no command matchers"
+        assert mode["fingerprints"], f"{name}: no fingerprints"
+        assert mode["advice"], f"{name}: no advice"
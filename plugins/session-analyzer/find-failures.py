@@ -2,10 +2,25 @@
 """Find failed tool calls in Claude session logs."""
 
 import argparse
+import hashlib
 import json
+import mmap
+import os
 import signal
+import struct
 import sys
 from pathlib import Path
+from typing import Any, Iterator, NamedTuple, Union
+
+try:
+    import msgspec
+except ImportError:  # optional accelerator
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # optional accelerator
+    orjson = None
 
 # Handle broken pipe gracefully (e.g., when piping to `less` and quitting early)
 signal.signal(signal.SIGPIPE, signal.SIG_DFL)
@@ -47,36 +62,251 @@ def collect_jsonl_files(paths: list[Path]) -> list[Path]:
     return jsonl_files
 
 
-def parse_session(jsonl_path: Path) -> dict[str, dict]:
-    """Parse JSONL file and return entries indexed by UUID."""
-    entries = {}
-
-    with open(jsonl_path) as f:
+if msgspec is not None:
+
+    class _Message(msgspec.Struct):
+        content: Any = msgspec.UNSET
+
+    class _Entry(msgspec.Struct):
+        uuid: Any = msgspec.UNSET
+        parentUuid: Any = msgspec.UNSET
+        type: Any = msgspec.UNSET
+        message: Union[_Message, None, msgspec.UnsetType] = msgspec.UNSET
+
+    _entry_decoder = msgspec.json.Decoder(_Entry)
+
+    def _fast_loads(line: str) -> Any:
+        """Decode only the fields used here; the rest of the line is skipped.
+
+        A field is in the dict only if it was in the line (`null` included),
+        so `.get` defaults work as they do on the whole entry.
+        """
+        try:
+            entry = _entry_decoder.decode(line)
+        except msgspec.ValidationError:
+            return json.loads(line)  # valid JSON, unexpected shape
+        decoded = {
+            name: getattr(entry, name)
+            for name in ("uuid", "parentUuid", "type")
+            if getattr(entry, name) is not msgspec.UNSET
+        }
+        if isinstance(entry.message, _Message):
+            message = entry.message
+            decoded["message"] = {} if message.content is msgspec.UNSET else {"content": message.content}
+        elif entry.message is None:
+            decoded["message"] = None
+        return decoded
+
+elif orjson is not None:
+    _fast_loads = orjson.loads
+else:
+    _fast_loads = json.loads
+
+
+def decode_line(line: str | bytes) -> Any:
+    """Decode a JSONL line with the fastest available backend."""
+    try:
+        return _fast_loads(line)
+    except ValueError:
+        # The fast decoders are stricter than the stdlib (e.g. about lone
+        # surrogates); let it have the last word.
+        return json.loads(line)
+
+
+def cache_dir() -> Path:
+    base = os.environ.get("SESSION_ANALYZER_CACHE_DIR", "")
+    if not base:
+        xdg = os.environ.get("XDG_CACHE_HOME", "") or os.path.join(
+            os.path.expanduser("~"), ".cache"
+        )
+        base = os.path.join(xdg, "pickled-claude-plugins", "session-analyzer")
+    return Path(base)
+
+
+def read_lines(jsonl_path: Path) -> Iterator[tuple[int, bytes]]:
+    """Yield (byte offset, raw line) for each line of a transcript."""
+    with open(jsonl_path, "rb") as f:
+        offset = 0
         for line in f:
-            line = line.strip()
-            if not line:
-                continue
+            yield offset, line
+            offset += len(line)
 
-            try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
-                continue
 
-            uuid = entry.get("uuid")
-            if uuid:
-                entries[uuid] = entry
+def decode_entry(line: bytes) -> dict | None:
+    """The entry on a raw line, or None for blank and malformed lines."""
+    if not line.strip():
+        return None
+    try:
+        entry = decode_line(line)
+    except ValueError:
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+# Sidecar layout: a header, then one record per uuid, sorted by uuid. Keys
+# are NUL-padded to the longest uuid in the file; `parent` is the record
+# number of the entry's parent, or -1.
+_SIDECAR_MAGIC = b"SAOI"
+_SIDECAR_VERSION = 1
+_HEADER = struct.Struct("<4sHHIQQQ")  # magic, version, key width, count, inode, size, mtime_ns
+_RECORD_TAIL = struct.Struct("<QIiB")  # offset, length, parent, flags
+
+_MAKES_TOOL_CALL = 0x1  # the entry's content has a tool_use
+
+
+class Location(NamedTuple):
+    """Where an entry's line is, and its parent's record."""
+
+    uuid: str
+    offset: int
+    length: int
+    parent: int
+    flags: int
+
+
+class OffsetIndex:
+    """uuid → line offsets for one transcript, from a memory-mapped sidecar.
+
+    The sidecar is built on first use (one pass over the transcript) and
+    rebuilt when the transcript's inode, size or mtime change. A lookup is
+    a binary search over the mapped records and a parent link is a record
+    number, so walking a conversation chain reads one record per hop, and
+    nothing is loaded up front.
+    """
+
+    def __init__(self, jsonl_path: Path):
+        self.jsonl_path = jsonl_path
+        self.sidecar_path = cache_dir() / "offsets" / (
+            hashlib.sha1(str(jsonl_path.resolve()).encode()).hexdigest() + ".idx"
+        )
+        with open(jsonl_path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            # An empty file can't be mapped, but then there are no lines to read.
+            self._lines = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if stat.st_size else b""
+        self._source = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        # Lines past this were written after we looked, and aren't indexed.
+        self.size = stat.st_size
+
+        self._buf = self._load()
+        if self._buf is None:
+            self._buf = self._build()
+        _, _, self._width, self._count, *_ = _HEADER.unpack_from(self._buf)
+        self._record_size = self._width + _RECORD_TAIL.size
+
+    def __enter__(self) -> "OffsetIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for buf in (self._buf, self._lines):
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+
+    def location(self, uuid: str) -> Location | None:
+        """Where the entry with `uuid` is (its last copy, if it's repeated)."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            location = self._at(mid)
+            if location.uuid < uuid:
+                lo = mid + 1
+            elif location.uuid > uuid:
+                hi = mid
+            else:
+                return location
+        return None
+
+    def ancestors(self, uuid: str, flags: int = 0, mentioning: bytes = b"") -> Iterator[Location]:
+        """The locations of `uuid`'s parent, its parent, and so on up to the root.
+
+        Only ancestors with all of `flags` set, and whose raw line contains
+        `mentioning`, are yielded; the others cost a record read, not a
+        decode.
+        """
+        location = self.location(uuid)
+        record = location.parent if location is not None else -1
+        while record >= 0:
+            base = _HEADER.size + record * self._record_size
+            offset, length, parent, record_flags = _RECORD_TAIL.unpack_from(self._buf, base + self._width)
+            if record_flags & flags == flags and self._lines.find(mentioning, offset, offset + length) >= 0:
+                yield self._at(record)
+            record = parent
+
+    def line(self, location: Location) -> bytes:
+        return self._lines[location.offset:location.offset + location.length]
+
+    def _at(self, record: int) -> Location:
+        base = _HEADER.size + record * self._record_size
+        key = self._buf[base:base + self._width].rstrip(b"\0").decode()
+        return Location(key, *_RECORD_TAIL.unpack_from(self._buf, base + self._width))
+
+    def _load(self) -> mmap.mmap | None:
+        """The sidecar, mapped, if there is one and it's for this version of the transcript."""
+        try:
+            with open(self.sidecar_path, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if len(buf) >= _HEADER.size:
+            magic, version, _, _, *source = _HEADER.unpack_from(buf)
+            if (magic, version, tuple(source)) == (_SIDECAR_MAGIC, _SIDECAR_VERSION, self._source):
+                return buf
+        buf.close()
+        return None
+
+    def _build(self) -> bytes:
+        """Index the transcript and write the sidecar; returns its contents."""
+        entries: dict[str, tuple[int, int, Any, int]] = {}
+        for offset, line in read_lines(self.jsonl_path):
+            if offset + len(line) > self.size:
+                break
+            entry = decode_entry(line)
+            uuid = entry.get("uuid") if entry else None
+            if uuid and isinstance(uuid, str):
+                flags = _MAKES_TOOL_CALL if _makes_tool_call(entry) else 0
+                entries[uuid] = (offset, len(line), entry.get("parentUuid"), flags)
+
+        uuids = sorted(entries)
+        numbers = {uuid: number for number, uuid in enumerate(uuids)}
+        width = max((len(uuid.encode()) for uuid in uuids), default=1)
+
+        data = bytearray(_HEADER.pack(_SIDECAR_MAGIC, _SIDECAR_VERSION, width, len(uuids), *self._source))
+        for uuid in uuids:
+            offset, length, parent_uuid, flags = entries[uuid]
+            data += uuid.encode().ljust(width, b"\0")
+            data += _RECORD_TAIL.pack(offset, length, numbers.get(parent_uuid, -1), flags)
+
+        try:
+            self.sidecar_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.sidecar_path.with_name(f"{self.sidecar_path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, self.sidecar_path)
+        except OSError:
+            pass  # it's only a cache; work from memory this time
+        return bytes(data)
+
+
+def _makes_tool_call(entry: dict) -> bool:
+    message = entry.get("message")
+    content = message.get("content") if isinstance(message, dict) else None
+    if not isinstance(content, list):
+        return False
+    return any(isinstance(item, dict) and item.get("type") == "tool_use" for item in content)
 
-    return entries
 
+def find_tool_use(offsets: OffsetIndex, tool_use_id: str, start_uuid: str) -> dict | None:
+    """Walk parent chain to find the tool_use message matching tool_use_id.
 
-def find_tool_use(entries: dict[str, dict], tool_use_id: str, start_uuid: str) -> dict | None:
-    """Walk parent chain to find the tool_use message matching tool_use_id."""
-    current_uuid = entries.get(start_uuid, {}).get("parentUuid")
+    Only ancestors that made a tool call, and whose raw line mentions the
+    id, are read and decoded.
+    """
+    needle = json.dumps(tool_use_id, ensure_ascii=False).encode() if isinstance(tool_use_id, str) else b""
 
-    while current_uuid:
-        entry = entries.get(current_uuid)
-        if not entry:
-            break
+    for location in offsets.ancestors(start_uuid, _MAKES_TOOL_CALL, needle):
+        entry = decode_entry(offsets.line(location)) or {}
 
         message = entry.get("message", {})
         content = message.get("content", [])
@@ -86,46 +316,60 @@ def find_tool_use(entries: dict[str, dict], tool_use_id: str, start_uuid: str) -
                 if isinstance(item, dict) and item.get("type") == "tool_use":
                     if item.get("id") == tool_use_id:
                         return {
-                            "uuid": current_uuid,
+                            "uuid": location.uuid,
                             "type": entry.get("type", "unknown"),
                             "name": item.get("name", "unknown"),
                             "input": item.get("input", {}),
                         }
 
-        current_uuid = entry.get("parentUuid")
-
     return None
 
 
 def find_failures(jsonl_path: Path) -> list[dict]:
-    """Parse JSONL file and extract failed tool calls."""
-    entries = parse_session(jsonl_path)
+    """Scan a JSONL file for failed tool calls, resolving them through its offset index.
+
+    Only lines that mention `is_error` are decoded; the tool_use behind
+    each error is found by following parent links in the offset index.
+    """
     failures = []
 
-    for entry in entries.values():
-        # Look for tool_result with is_error: true
-        message = entry.get("message", {})
-        content = message.get("content", [])
+    with OffsetIndex(jsonl_path) as offsets:
+        for offset, line in read_lines(jsonl_path):
+            if offset >= offsets.size:
+                break
+            if b'"is_error"' not in line:
+                continue
+            entry = decode_entry(line)
+            uuid = entry.get("uuid") if entry else None
+            if not uuid:
+                continue
+            location = offsets.location(uuid)
+            if location is None or location.offset != offset:
+                continue  # an earlier copy of a repeated uuid
 
-        if not isinstance(content, list):
-            continue
+            # Look for tool_result with is_error: true
+            message = entry.get("message", {})
+            content = message.get("content", [])
+
+            if not isinstance(content, list):
+                continue
 
-        for item in content:
-            if isinstance(item, dict) and item.get("is_error") is True:
-                tool_use_id = item.get("tool_use_id", "unknown")
-                tool_use = find_tool_use(entries, tool_use_id, entry.get("uuid", ""))
-
-                failures.append({
-                    "file_path": str(jsonl_path.resolve()),
-                    "request_uuid": tool_use["uuid"] if tool_use else "unknown",
-                    "request_type": tool_use["type"] if tool_use else "unknown",
-                    "response_uuid": entry.get("uuid", "unknown"),
-                    "response_type": entry.get("type", "unknown"),
-                    "tool_use_id": tool_use_id,
-                    "tool_name": tool_use["name"] if tool_use else "unknown",
-                    "tool_input": tool_use["input"] if tool_use else {},
-                    "error_content": item.get("content", ""),
-                })
+            for item in content:
+                if isinstance(item, dict) and item.get("is_error") is True:
+                    tool_use_id = item.get("tool_use_id", "unknown")
+                    tool_use = find_tool_use(offsets, tool_use_id, uuid)
+
+                    failures.append({
+                        "file_path": str(jsonl_path.resolve()),
+                        "request_uuid": tool_use["uuid"] if tool_use else "unknown",
+                        "request_type": tool_use["type"] if tool_use else "unknown",
+                        "response_uuid": uuid,
+                        "response_type": entry.get("type", "unknown"),
+                        "tool_use_id": tool_use_id,
+                        "tool_name": tool_use["name"] if tool_use else "unknown",
+                        "tool_input": tool_use["input"] if tool_use else {},
+                        "error_content": item.get("content", ""),
+                    })
 
     return failures
 
@@ -0,0 +1,8 @@
+"""Pytest configuration for session-analyzer tests."""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    """Send offset sidecars to tmp, away from the real cache."""
+    monkeypatch.setenv("SESSION_ANALYZER_CACHE_DIR", str(tmp_path / "cache"))
@@ -0,0 +1,98 @@
+"""The optional JSON backends decode transcript lines as the stdlib does."""
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+_spec = importlib.util.spec_from_file_location(
+    "find_failures_decoding", Path(__file__).parent.parent / "find-failures.py"
+)
+ff = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ff)
+
+# Whichever backend the module picked at import: the msgspec schema decoder
+# when msgspec is installed.
+_SELECTED = ff._fast_loads
+
+LINES = [
+    b'{"type": "user", "uuid": "u1", "parentUuid": "a1", "message": {"content": [{"type": "tool_result", '
+    b'"tool_use_id": "t1", "content": "boom", "is_error": true}]}, "toolUseResult": {"stdout": ""}}\n',
+    b'{"type": null, "uuid": "u2", "message": {"content": "text"}}\n',
+    b'{"uuid": "u3"}\n',
+    b'{"uuid": "u4", "message": null}\n',
+    b'{"uuid": "u5", "message": {}}\n',
+    b'{"type": "user", "uuid": "u6", "message": "just a string"}\n',  # schema mismatch
+    b'[1, 2, 3]\n',
+    b'{"uuid": "u7", "message": {"content": "lone \\ud800 surrogate"}}\n',
+    b'{"uuid": "u8", "timestamp": NaN, "n": 18446744073709551616}\n',
+    b'{"uuid": "u9", "uuid": "u9-last"}\n',
+    b'{"uuid": "half\n',
+    b'\xff\xfe not utf-8\n',
+]
+
+
+def _backends():
+    return [
+        pytest.param(json.loads, id="json"),
+        pytest.param(
+            ff.orjson.loads if ff.orjson else None, id="orjson",
+            marks=pytest.mark.skipif(ff.orjson is None, reason="orjson not installed"),
+        ),
+        pytest.param(
+            _SELECTED, id="msgspec",
+            marks=pytest.mark.skipif(ff.msgspec is None, reason="msgspec not installed"),
+        ),
+    ]
+
+
+def _used_fields(entry):
+    """What find-failures reads from an entry, keys present or not."""
+    if not isinstance(entry, dict):
+        return entry
+    used = {key: entry[key] for key in ("uuid", "parentUuid", "type") if key in entry}
+    if "message" in entry:
+        message = entry["message"]
+        used["message"] = (
+            {"content": message["content"]} if isinstance(message, dict) and "content" in message
+            else {} if isinstance(message, dict) else message
+        )
+    return used
+
+
+@pytest.mark.parametrize("loads", _backends())
+def test_backends_decode_the_same_fields(loads, monkeypatch):
+    monkeypatch.setattr(ff, "_fast_loads", json.loads)
+    expected = [_used_fields(ff.decode_entry(line)) for line in LINES]
+    monkeypatch.setattr(ff, "_fast_loads", loads)
+    assert [_used_fields(ff.decode_entry(line)) for line in LINES] == expected
+    assert [entry and entry.get("uuid") for entry in expected] == [
+        "u1", "u2", "u3", "u4", "u5", "u6", None, "u7", "u8", "u9-last", None, None,
+    ]
+
+
+@pytest.mark.parametrize("loads", _backends())
+def test_backends_find_the_same_failures(tmp_path, loads, monkeypatch):
+    path = tmp_path / "s.jsonl"
+    path.write_bytes(
+        b'{"type": "assistant", "uuid": "a1", "message": {"content": [{"type": "tool_use", "id": "t1", '
+        b'"name": "Bash", "input": {"command": "make"}}]}}\n'
+        + LINES[0]
+        + b'{"type": null, "uuid": "u2", "parentUuid": "a1", "message": {"content": [{"type": "tool_result", '
+        b'"tool_use_id": "t1", "content": "boom again", "is_error": true}]}}\n'
+    )
+    monkeypatch.setattr(ff, "_fast_loads", json.loads)
+    expected = ff.find_failures(path)
+    monkeypatch.setattr(ff, "_fast_loads", loads)
+    assert ff.find_failures(path) == expected
+    assert [(f["response_uuid"], f["response_type"], f["request_uuid"]) for f in expected] == [
+        ("u1", "user", "a1"), ("u2", None, "a1"),
+    ]
+
+
+@pytest.mark.skipif(ff.msgspec is None, reason="msgspec not installed")
+def test_msgspec_keeps_only_the_fields_used():
+    assert _SELECTED(LINES[0]) == {
+        "uuid": "u1", "parentUuid": "a1", "type": "user",
+        "message": {"content": [{"type": "tool_result", "tool_use_id": "t1", "content": "boom", "is_error": True}]},
+    }
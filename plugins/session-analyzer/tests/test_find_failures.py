@@ -0,0 +1,168 @@
+"""Tests for find-failures.py's offset index and failure resolution."""
+import importlib.util
+import json
+import os
+from pathlib import Path
+
+_spec = importlib.util.spec_from_file_location(
+    "find_failures", Path(__file__).parent.parent / "find-failures.py"
+)
+ff = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ff)
+
+
+def _entry(uuid, parent, *content, type_="assistant"):
+    return {"type": type_, "uuid": uuid, "parentUuid": parent, "message": {"content": list(content)}}
+
+
+def _call(tool_use_id, name, **tool_input):
+    return {"type": "tool_use", "id": tool_use_id, "name": name, "input": tool_input}
+
+
+def _error(tool_use_id, content):
+    return {"type": "tool_result", "tool_use_id": tool_use_id, "content": content, "is_error": True}
+
+
+def _write(path, entries, tail=b""):
+    path.write_bytes(b"".join(json.dumps(e).encode() + b"\n" for e in entries) + tail)
+    return path
+
+
+def _session():
+    """a0 calls t0; two text-only hops later, u3 reports its error."""
+    return [
+        _entry("a0", None, _call("t0", "Bash", command="make")),
+        _entry("a1", "a0", {"type": "text", "text": "thinking"}),
+        _entry("a2", "a1", _call("t9", "Read", file_path="x")),
+        _entry("u3", "a2", _error("t0", "make: *** No targets."), type_="user"),
+    ]
+
+
+def _sidecars(tmp_path):
+    return sorted((tmp_path / "cache" / "offsets").glob("*.idx"))
+
+
+class TestOffsetIndex:
+    def test_locations_point_at_lines(self, tmp_path):
+        path = _write(tmp_path / "s.jsonl", _session())
+        with ff.OffsetIndex(path) as offsets:
+            location = offsets.location("a2")
+            assert json.loads(offsets.line(location))["uuid"] == "a2"
+            assert offsets.location("nope") is None
+            assert [loc.uuid for loc in offsets.ancestors("u3")] == ["a2", "a1", "a0"]
+
+    def test_ancestors_filtered_by_flags_and_mention(self, tmp_path):
+        path = _write(tmp_path / "s.jsonl", _session())
+        with ff.OffsetIndex(path) as offsets:
+            assert [loc.uuid for loc in offsets.ancestors("u3", ff._MAKES_TOOL_CALL)] == ["a2", "a0"]
+            assert [loc.uuid for loc in offsets.ancestors("u3", ff._MAKES_TOOL_CALL, b'"t0"')] == ["a0"]
+
+    def test_repeated_uuid_resolves_to_last_copy(self, tmp_path):
+        entries = _session()
+        path = _write(tmp_path / "s.jsonl", entries + [entries[1]])
+        with ff.OffsetIndex(path) as offsets:
+            last_line = path.read_bytes().rindex(b"\n", 0, -1) + 1
+            assert offsets.location("a1").offset == last_line
+
+    def test_sidecar_is_written_and_reused(self, tmp_path, monkeypatch):
+        path = _write(tmp_path / "s.jsonl", _session())
+        ff.OffsetIndex(path).close()
+        assert len(_sidecars(tmp_path)) == 1
+
+        def no_build(self):
+            raise AssertionError("rebuilt a fresh sidecar")
+
+        monkeypatch.setattr(ff.OffsetIndex, "_build", no_build)
+        with ff.OffsetIndex(path) as offsets:
+            assert offsets.location("u3") is not None
+
+    def test_stale_sidecar_is_rebuilt_when_the_transcript_grows(self, tmp_path):
+        path = _write(tmp_path / "s.jsonl", _session())
+        ff.OffsetIndex(path).close()
+        with open(path, "ab") as f:
+            f.write(json.dumps(_entry("a4", "u3")).encode() + b"\n")
+        with ff.OffsetIndex(path) as offsets:
+            assert offsets.location("a4") is not None
+        assert len(_sidecars(tmp_path)) == 1
+
+    def test_stale_sidecar_is_rebuilt_when_the_transcript_is_replaced(self, tmp_path):
+        path = _write(tmp_path / "s.jsonl", _session())
+        ff.OffsetIndex(path).close()
+        # Same size, new inode.
+        entries = _session()
+        entries[0]["uuid"] = entries[1]["parentUuid"] = "b0"
+        os.replace(_write(tmp_path / "new.jsonl", entries), path)
+        with ff.OffsetIndex(path) as offsets:
+            assert offsets.location("a0") is None
+            assert offsets.location("b0") is not None
+
+    def test_corrupt_sidecar_is_rebuilt(self, tmp_path):
+        path = _write(tmp_path / "s.jsonl", _session())
+        ff.OffsetIndex(path).close()
+        _sidecars(tmp_path)[0].write_bytes(b"junk")
+        with ff.OffsetIndex(path) as offsets:
+            assert offsets.location("u3") is not None
+
+    def test_unwritable_cache_works_from_memory(self, tmp_path, monkeypatch):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        monkeypatch.setenv("SESSION_ANALYZER_CACHE_DIR", str(blocker))
+        path = _write(tmp_path / "s.jsonl", _session())
+        with ff.OffsetIndex(path) as offsets:
+            assert [loc.uuid for loc in offsets.ancestors("u3")] == ["a2", "a1", "a0"]
+
+    def test_partial_last_line_is_skipped(self, tmp_path):
+        path = _write(tmp_path / "s.jsonl", _session(), tail=b'{"uuid": "half')
+        with ff.OffsetIndex(path) as offsets:
+            assert offsets.location("u3") is not None
+
+    def test_empty_transcript(self, tmp_path):
+        path = _write(tmp_path / "s.jsonl", [])
+        with ff.OffsetIndex(path) as offsets:
+            assert offsets.location("a0") is None
+
+
+class TestFindFailures:
+    def test_error_resolves_through_the_parent_chain(self, tmp_path):
+        path = _write(tmp_path / "s.jsonl", _session())
+        [failure] = ff.find_failures(path)
+        assert failure["request_uuid"] == "a0"
+        assert failure["response_uuid"] == "u3"
+        assert failure["tool_name"] == "Bash"
+        assert failure["tool_input"] == {"command": "make"}
+        assert failure["error_content"] == "make: *** No targets."
+
+    def test_parent_outside_the_file_is_unknown(self, tmp_path):
+        path = _write(tmp_path / "s.jsonl", _session()[3:])
+        [failure] = ff.find_failures(path)
+        assert (failure["request_uuid"], failure["tool_name"]) == ("unknown", "unknown")
+
+    def test_repeated_error_entry_is_reported_once(self, tmp_path):
+        entries = _session()
+        path = _write(tmp_path / "s.jsonl", entries + [entries[3]])
+        assert len(ff.find_failures(path)) == 1
+
+    def test_matches_a_full_decode(self, tmp_path):
+        """Same failures as loading every entry into a uuid map and walking it."""
+        entries = []
+        for i in range(30):
+            parent = entries[-1]["uuid"] if entries else None
+            if i % 3 == 2:
+                entries.append(_entry(f"u{i}", parent, _error(f"t{i - 2}", f"error {i}"), type_="user"))
+            else:
+                entries.append(_entry(f"a{i}", parent, _call(f"t{i}", "Bash", command=f"run {i}")))
+        path = _write(tmp_path / "s.jsonl", entries)
+
+        by_uuid = {e["uuid"]: e for e in entries}
+        expected = []
+        for e in entries:
+            for item in e["message"]["content"]:
+                if item.get("is_error"):
+                    node = by_uuid.get(e["parentUuid"])
+                    while node and not any(c.get("id") == item["tool_use_id"] for c in node["message"]["content"]):
+                        node = by_uuid.get(node["parentUuid"])
+                    expected.append((e["uuid"], node["uuid"] if node else "unknown"))
+
+        found = [(f["response_uuid"], f["request_uuid"]) for f in ff.find_failures(path)]
+        assert found == expected
+        assert len(found) == 10
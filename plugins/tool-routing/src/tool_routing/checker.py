@@ -15,9 +15,14 @@ TOOL_INPUT_FIELDS = {
 
 @dataclass
 class CheckResult:
-    """Result of checking a tool call against routes."""
+    """Result of checking a tool call against routes.
+
+    A match on a non-strict route sets ``warning`` instead of ``blocked``:
+    the call goes ahead, with the message shown alongside it.
+    """
 
     blocked: bool
+    warning: bool = False
     route_name: Optional[str] = None
     message: Optional[str] = None
     matched_value: Optional[str] = None
@@ -32,7 +37,7 @@ def check_tool_call(tool_call: dict, routes: dict[str, Route]) -> CheckResult:
         routes: Dictionary of routes to check against
 
     Returns:
-        CheckResult indicating if blocked and why
+        CheckResult indicating if blocked (or warned) and why
     """
     tool_name = tool_call.get("tool_name", "")
     tool_input = tool_call.get("tool_input", {})
@@ -56,9 +61,10 @@ def check_tool_call(tool_call: dict, routes: dict[str, Route]) -> CheckResult:
         try:
             if re.search(route.pattern, value, re.IGNORECASE):
                 return CheckResult(
-                    blocked=True,
+                    blocked=route.strict,
+                    warning=not route.strict,
                     route_name=route_name,
-                    message=route.message,
+                    message=route.render_message(value),
                     matched_value=value,
                     pattern=route.pattern,
                 )
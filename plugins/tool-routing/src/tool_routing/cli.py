@@ -7,8 +7,9 @@ import sys
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-from tool_routing.checker import check_tool_call
+from tool_routing.checker import TOOL_INPUT_FIELDS, check_tool_call
 from tool_routing.config import RouteConflictError, load_routes_file
+from tool_routing.dedup import recently_warned
 from tool_routing.integration_runner import (
     evaluate_report,
     format_evaluate_results,
@@ -28,8 +29,9 @@ def get_all_routes() -> tuple[dict[str, "Route"], list[str]]:
         Tuple of (merged routes dict, list of source files)
 
     Environment:
-        TOOL_ROUTING_ROUTES: Comma-separated list of explicit route file paths.
-            If set, use these instead of Claude CLI discovery. Useful for testing.
+        TOOL_ROUTING_ROUTES: Comma-separated list of explicit route file paths
+            (YAML files or ``.py`` route providers). If set, use these instead
+            of Claude CLI discovery. Useful for testing.
     """
     from tool_routing.config import merge_routes_dicts
     from tool_routing.discovery import discover_all_routes
@@ -58,8 +60,32 @@ def get_all_routes() -> tuple[dict[str, "Route"], list[str]]:
     return merged, all_sources
 
 
+def _hook_output(**fields) -> str:
+    """Serialize a PreToolUse hookSpecificOutput payload."""
+    return json.dumps(
+        {"hookSpecificOutput": {"hookEventName": "PreToolUse", **fields}}
+    )
+
+
 def cmd_check(args: argparse.Namespace) -> int:
-    """Check a tool call against routes (hook entry point)."""
+    """Check a tool call against routes (hook entry point).
+
+    A strict route's match is emitted as a deny decision; a non-strict
+    route's match as additionalContext on an otherwise untouched call, at
+    most once per session and route (see tool_routing.dedup).
+    """
+    # Read tool call from stdin first: calls with nothing to match skip
+    # route discovery and loading entirely.
+    try:
+        raw_input = sys.stdin.read()
+        tool_call = json.loads(raw_input)
+    except json.JSONDecodeError:
+        return 0
+
+    input_field = TOOL_INPUT_FIELDS.get(tool_call.get("tool_name", ""))
+    if not input_field or not (tool_call.get("tool_input") or {}).get(input_field):
+        return 0
+
     try:
         routes, sources = get_all_routes()
     except RouteConflictError as e:
@@ -69,36 +95,31 @@ def cmd_check(args: argparse.Namespace) -> int:
     if not routes:
         return 0
 
-    # Read tool call from stdin
-    try:
-        raw_input = sys.stdin.read()
-        tool_call = json.loads(raw_input)
-    except json.JSONDecodeError:
-        return 0
-
     result = check_tool_call(tool_call, routes)
 
-    if result.blocked:
-        if DEBUG:
-            print(f"❌ Tool Routing: {result.route_name}", file=sys.stderr)
-            if result.matched_value:
-                display = result.matched_value
-                if len(display) > 200:
-                    display = display[:200] + "..."
-                print(f"Matched: {display}", file=sys.stderr)
-            print(f"Pattern: {result.pattern}", file=sys.stderr)
-            print("", file=sys.stderr)
-        # Output JSON to stdout for Claude Code hook processing
-        output = {
-            "hookSpecificOutput": {
-                "hookEventName": "PreToolUse",
-                "permissionDecision": "deny",
-                "permissionDecisionReason": result.message,
-            }
-        }
-        print(json.dumps(output))
+    if not (result.blocked or result.warning):
         return 0
 
+    if DEBUG:
+        label = "❌" if result.blocked else "⚠️"
+        print(f"{label} Tool Routing: {result.route_name}", file=sys.stderr)
+        if result.matched_value:
+            display = result.matched_value
+            if len(display) > 200:
+                display = display[:200] + "..."
+            print(f"Matched: {display}", file=sys.stderr)
+        print(f"Pattern: {result.pattern}", file=sys.stderr)
+        print("", file=sys.stderr)
+
+    # Output JSON to stdout for Claude Code hook processing
+    if result.blocked:
+        print(_hook_output(
+            permissionDecision="deny",
+            permissionDecisionReason=result.message,
+        ))
+    elif not recently_warned(tool_call.get("session_id"), result.route_name):
+        print(_hook_output(additionalContext=result.message))
+
     return 0
 
 
@@ -162,6 +183,8 @@ def cmd_list(args: argparse.Namespace) -> int:
         print(f"{name} (from: {route.source})")
         print(f"  tool: {route.tool}")
         print(f"  pattern: {route.pattern}")
+        if not route.strict:
+            print("  mode: warn")
         if route.tests:
             print(f"  tests: {len(route.tests)}")
         print()
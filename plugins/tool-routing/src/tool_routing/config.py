@@ -1,5 +1,6 @@
 """Configuration loading and merging for tool routing."""
 
+import importlib.util
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
@@ -18,7 +19,7 @@ class TestCase:
     """Inline test case for a route."""
 
     input: dict
-    expect: str  # "block" or "allow"
+    expect: str  # "block", "warn", or "allow"
     desc: Optional[str] = None
     contains: Optional[str] = None
 
@@ -32,16 +33,35 @@ class Route:
     message: str
     tests: list[TestCase] = field(default_factory=list)
     source: Optional[str] = None  # File path where route was defined
+    strict: bool = True  # False: warn with the message but allow the call
+    message_vars: Optional[dict] = None  # If set, message is a format template
+
+    def render_message(self, value: str) -> str:
+        """Render the message for a matched input value.
+
+        With ``message_vars`` set, the message is a ``str.format`` template
+        that can use those vars plus ``{value}`` (the matched input). A
+        template that fails to render falls back to the raw message.
+        """
+        if self.message_vars is None:
+            return self.message
+        try:
+            return self.message.format(**{**self.message_vars, "value": value})
+        except (KeyError, IndexError, ValueError):
+            return self.message
 
 
 def load_routes_file(path: Path) -> dict[str, Route]:
-    """Load routes from a YAML file.
+    """Load routes from a YAML file or a Python route provider (``.py``).
 
     Returns empty dict if file doesn't exist or is invalid (fail open).
     """
     if not path.exists():
         return {}
 
+    if path.suffix == ".py":
+        return load_route_provider(path)
+
     try:
         with open(path) as f:
             data = yaml.safe_load(f)
@@ -51,8 +71,34 @@ def load_routes_file(path: Path) -> dict[str, Route]:
     if not data or "routes" not in data:
         return {}
 
+    return parse_routes(data.get("routes") or {}, path)
+
+
+def load_route_provider(path: Path) -> dict[str, Route]:
+    """Load routes computed by a Python route provider.
+
+    A provider is a module defining ``tool_routes()``, which returns the same
+    mapping a YAML file has under ``routes:``. This lets a plugin derive routes
+    from its own config (strictness, templated messages) instead of running a
+    hook of its own. Any error importing or calling it yields no routes (fail
+    open).
+    """
+    try:
+        spec = importlib.util.spec_from_file_location(
+            f"_tool_routing_provider_{path.stem}", path
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        data = module.tool_routes()
+        return parse_routes(data, path) if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def parse_routes(routes_data: dict, path: Path) -> dict[str, Route]:
+    """Build Route objects from a ``routes:`` mapping."""
     routes = {}
-    for name, route_data in data.get("routes", {}).items():
+    for name, route_data in routes_data.items():
         tests = []
         for test_data in route_data.get("tests", []):
             tests.append(
@@ -70,6 +116,8 @@ def load_routes_file(path: Path) -> dict[str, Route]:
             message=route_data["message"],
             tests=tests,
             source=str(path),
+            strict=bool(route_data.get("strict", True)),
+            message_vars=route_data.get("message_vars"),
         )
 
     return routes
@@ -108,10 +156,10 @@ def merge_routes_dicts(
 
 
 def merge_routes(paths: list[Path]) -> dict[str, Route]:
-    """Load and merge routes from multiple YAML files.
+    """Load and merge routes from multiple route files.
 
     Args:
-        paths: List of paths to tool-routes.yaml files
+        paths: List of paths to tool-routes.yaml files or route providers
 
     Returns:
         Merged dictionary of routes
@@ -0,0 +1,114 @@
+"""Say each warn-mode route's message once per session.
+
+A non-strict route lets the tool call through and adds its message to the
+agent's context. After the first time the agent has seen it, so `check`
+stays quiet for that route for the rest of the session (or until
+TOOL_ROUTING_REPEAT_WINDOW has passed). Blocking routes are never deduped:
+the call is refused every time, and the message says why.
+
+What's been said lives in `warned.json` in the cache dir, mapping
+session_id → {route name: when it last warned}. Routes that haven't warned
+for a day are forgotten, and only the most recently active sessions are
+kept, so the file stays small however many sessions run. It's rewritten
+via a temp file and `os.replace`, since parallel tool calls run `check`
+concurrently. If it can't be read or written, the warning is given.
+
+sandbox-advisor keeps similar bookkeeping for its advice. Plugins are
+installed independently and its hook is a standalone script, so there's no
+shared module for the two to import.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+WARNED_FILE = "warned.json"
+
+# A route that hasn't warned in a session for this long is forgotten there.
+_FORGET_AFTER = 24 * 60 * 60
+
+# Sessions tracked at most, dropping the least recently warned first.
+_SESSIONS_KEPT = 256
+
+
+def _cache_dir() -> Path:
+    base = os.environ.get("TOOL_ROUTING_CACHE_DIR", "")
+    if not base:
+        xdg = os.environ.get("XDG_CACHE_HOME", "") or os.path.join(
+            os.environ.get("HOME", ""), ".cache"
+        )
+        base = os.path.join(xdg, "pickled-claude-plugins", "tool-routing")
+    return Path(base)
+
+
+def _repeat_window() -> float:
+    """Seconds before a route's warning is given again in the same session."""
+    try:
+        return max(0.0, float(os.environ["TOOL_ROUTING_REPEAT_WINDOW"]))
+    except (KeyError, ValueError):
+        return 30 * 60.0
+
+
+def _load_warned(path: Path) -> dict:
+    try:
+        with open(path) as f:
+            warned = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return warned if isinstance(warned, dict) else {}
+
+
+def _save_warned(path: Path, warned: dict) -> None:
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w") as f:
+            json.dump(warned, f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def _forget_stale(warned: dict, now: float) -> dict:
+    """`warned` without old warnings, malformed entries or surplus sessions."""
+    kept = {}
+    for session_id, routes in warned.items():
+        if not isinstance(routes, dict):
+            continue
+        recent = {
+            route: at for route, at in routes.items()
+            if isinstance(at, (int, float)) and now - at < _FORGET_AFTER
+        }
+        if recent:
+            kept[session_id] = recent
+    if len(kept) > _SESSIONS_KEPT:
+        by_activity = sorted(kept, key=lambda sid: max(kept[sid].values()), reverse=True)
+        kept = {sid: kept[sid] for sid in by_activity[:_SESSIONS_KEPT]}
+    return kept
+
+
+def recently_warned(
+    session_id: Optional[str], route_name: str, now: Optional[float] = None
+) -> bool:
+    """True if `route_name` already warned in this session, within the repeat window.
+
+    Otherwise notes that it's warning now and returns False. Calls without a
+    session_id always warn.
+    """
+    if not session_id:
+        return False
+    now = time.time() if now is None else now
+    path = _cache_dir() / WARNED_FILE
+    warned = _forget_stale(_load_warned(path), now)
+    routes = warned.setdefault(session_id, {})
+    last = routes.get(route_name)
+    if last is not None and now - last < _repeat_window():
+        return True
+    routes[route_name] = now
+    _save_warned(path, _forget_stale(warned, now))
+    return False
@@ -36,12 +36,17 @@ def run_route_tests(routes: dict[str, Route]) -> list[TestResult]:
             check_result = check_tool_call(test.input, routes)
 
             # Determine actual result
-            actual = "block" if check_result.blocked else "allow"
+            if check_result.blocked:
+                actual = "block"
+            elif check_result.warning:
+                actual = "warn"
+            else:
+                actual = "allow"
             passed = actual == test.expect
 
             # Check contains if specified and test passed so far
             contains_error = None
-            if passed and test.contains and check_result.blocked:
+            if passed and test.contains and check_result.message:
                 if test.contains not in (check_result.message or ""):
                     passed = False
                     contains_error = (
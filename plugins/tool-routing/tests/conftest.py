@@ -12,7 +12,8 @@ def cli_env(tmp_path):
 
     Includes PYTHONPATH so subprocess can import tool_routing.
     Uses TOOL_ROUTING_ROUTES to specify explicit route file paths,
-    bypassing Claude CLI discovery for test isolation.
+    bypassing Claude CLI discovery for test isolation, and a throwaway
+    TOOL_ROUTING_CACHE_DIR for warning dedup state.
     """
     src_path = Path(__file__).parent.parent / "src"
     routes_file = tmp_path / "hooks" / "tool-routes.yaml"
@@ -20,4 +21,5 @@ def cli_env(tmp_path):
         "PYTHONPATH": str(src_path),
         "PATH": os.environ.get("PATH", ""),
         "TOOL_ROUTING_ROUTES": str(routes_file),
+        "TOOL_ROUTING_CACHE_DIR": str(tmp_path / "cache"),
     }
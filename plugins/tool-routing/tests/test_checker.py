@@ -104,3 +104,27 @@ def test_check_wrong_tool_type_allows():
     result = check_tool_call(tool_call, routes)
 
     assert result.blocked is False
+
+
+def test_check_non_strict_route_warns():
+    """A non-strict route allows the call but reports a rendered message."""
+    routes = {
+        "bk-cli": Route(
+            tool="Bash",
+            pattern=r"^bk build\b",
+            message="Prefer {preferred} to `{value}`",
+            strict=False,
+            message_vars={"preferred": "bktide"},
+        )
+    }
+
+    tool_call = {
+        "tool_name": "Bash",
+        "tool_input": {"command": "bk build view 1"},
+    }
+
+    result = check_tool_call(tool_call, routes)
+
+    assert result.blocked is False
+    assert result.warning is True
+    assert result.message == "Prefer bktide to `bk build view 1`"
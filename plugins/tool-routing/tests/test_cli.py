@@ -4,7 +4,7 @@ import sys
 
 
 def test_cli_check_blocks_matching_route(tmp_path, cli_env):
-    """CLI check exits 2 and prints message for matching route."""
+    """CLI check denies a matching route via JSON on stdout, exiting 0."""
     # Create routes file
     hooks_dir = tmp_path / "hooks"
     hooks_dir.mkdir()
@@ -29,8 +29,10 @@ routes:
         env=cli_env,
     )
 
-    assert result.returncode == 2
-    assert "Don't fetch blocked.com" in result.stderr
+    assert result.returncode == 0
+    output = json.loads(result.stdout)["hookSpecificOutput"]
+    assert output["permissionDecision"] == "deny"
+    assert "Don't fetch blocked.com" in output["permissionDecisionReason"]
 
 
 def test_cli_check_allows_non_matching(tmp_path, cli_env):
@@ -61,6 +63,64 @@ routes:
     assert result.returncode == 0
 
 
+def _write_warn_route(tmp_path):
+    hooks_dir = tmp_path / "hooks"
+    hooks_dir.mkdir()
+    (hooks_dir / "tool-routes.yaml").write_text("""
+routes:
+  check-warns-route:
+    tool: Bash
+    pattern: "^grep"
+    strict: false
+    message: "Consider rg"
+""")
+
+
+def _run_check(cli_env, tool_call):
+    return subprocess.run(
+        [sys.executable, "-m", "tool_routing", "check"],
+        input=json.dumps(tool_call),
+        capture_output=True,
+        text=True,
+        env=cli_env,
+    )
+
+
+def test_cli_check_warns_on_non_strict_route(tmp_path, cli_env):
+    """CLI check allows a non-strict match and adds the message as context."""
+    _write_warn_route(tmp_path)
+
+    result = _run_check(cli_env, {
+        "tool_name": "Bash",
+        "tool_input": {"command": "grep -r foo ."},
+    })
+
+    assert result.returncode == 0
+    output = json.loads(result.stdout)["hookSpecificOutput"]
+    assert output == {
+        "hookEventName": "PreToolUse",
+        "additionalContext": "Consider rg",
+    }
+
+
+def test_cli_check_warns_once_per_session(tmp_path, cli_env):
+    """A repeat match in the same session stays silent; a new session warns."""
+    _write_warn_route(tmp_path)
+    call = {
+        "tool_name": "Bash",
+        "tool_input": {"command": "grep -r foo ."},
+        "session_id": "s1",
+    }
+
+    first = _run_check(cli_env, call)
+    repeat = _run_check(cli_env, call)
+    other = _run_check(cli_env, {**call, "session_id": "s2"})
+
+    assert "Consider rg" in first.stdout
+    assert repeat.stdout == ""
+    assert "Consider rg" in other.stdout
+
+
 def test_cli_check_allows_on_missing_config(tmp_path, cli_env):
     """CLI check exits 0 when no config exists (fail open)."""
     tool_call = json.dumps({
@@ -82,3 +82,67 @@ def test_merge_routes_conflict_raises():
     assert "same-name" in str(exc_info.value)
     assert "file1.yaml" in str(exc_info.value)
     assert "file2.yaml" in str(exc_info.value)
+
+
+def test_load_routes_file_strict_and_message_vars(tmp_path):
+    """strict and message_vars are read from YAML."""
+    routes_file = tmp_path / "tool-routes.yaml"
+    routes_file.write_text("""
+routes:
+  warn-route:
+    tool: Bash
+    pattern: "^grep"
+    strict: false
+    message_vars:
+      preferred: rg
+    message: "Prefer {preferred} over `{value}`"
+""")
+
+    route = load_routes_file(routes_file)["warn-route"]
+
+    assert route.strict is False
+    assert route.render_message("grep foo") == "Prefer rg over `grep foo`"
+
+
+def test_route_render_message_falls_back_on_bad_template():
+    """A template referencing an unknown var renders as the raw message."""
+    route = Route(
+        tool="Bash", pattern="x", message="Use {missing}", message_vars={}
+    )
+    assert route.render_message("x") == "Use {missing}"
+
+
+def test_route_render_message_without_vars_is_literal():
+    """Without message_vars, braces in the message are left alone."""
+    route = Route(tool="Bash", pattern="x", message="Use {value}")
+    assert route.render_message("x") == "Use {value}"
+
+
+def test_load_route_provider(tmp_path):
+    """A .py route file is a provider whose tool_routes() supplies routes."""
+    provider = tmp_path / "routes.py"
+    provider.write_text('''
+def tool_routes():
+    return {
+        "provided": {
+            "tool": "Bash",
+            "pattern": "^bk build",
+            "strict": False,
+            "message": "Prefer bktide",
+        }
+    }
+''')
+
+    routes = load_routes_file(provider)
+
+    assert list(routes) == ["provided"]
+    assert routes["provided"].strict is False
+    assert routes["provided"].source == str(provider)
+
+
+def test_load_route_provider_fails_open(tmp_path):
+    """A provider that raises contributes no routes."""
+    provider = tmp_path / "routes.py"
+    provider.write_text("def tool_routes():\n    raise RuntimeError('boom')\n")
+
+    assert load_routes_file(provider) == {}
@@ -0,0 +1,45 @@
+from tool_routing.dedup import _SESSIONS_KEPT, _forget_stale, recently_warned
+
+
+def test_recently_warned_within_window(tmp_path, monkeypatch):
+    """Second warning inside the repeat window is suppressed."""
+    monkeypatch.setenv("TOOL_ROUTING_CACHE_DIR", str(tmp_path))
+
+    assert recently_warned("s1", "route", now=1000.0) is False
+    assert recently_warned("s1", "route", now=1001.0) is True
+    assert recently_warned("s1", "other-route", now=1001.0) is False
+
+
+def test_recently_warned_after_window(tmp_path, monkeypatch):
+    """Warnings repeat once the window has passed."""
+    monkeypatch.setenv("TOOL_ROUTING_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("TOOL_ROUTING_REPEAT_WINDOW", "60")
+
+    assert recently_warned("s1", "route", now=1000.0) is False
+    assert recently_warned("s1", "route", now=1061.0) is False
+
+
+def test_recently_warned_without_session_never_suppresses(tmp_path, monkeypatch):
+    """No session_id means nothing to key on."""
+    monkeypatch.setenv("TOOL_ROUTING_CACHE_DIR", str(tmp_path))
+
+    assert recently_warned(None, "route") is False
+    assert recently_warned(None, "route") is False
+    assert not (tmp_path / "warned.json").exists()
+
+
+def test_forget_stale_caps_session_count():
+    """Only the most recently active sessions are kept."""
+    warned = {f"s{i}": {"route": float(i)} for i in range(_SESSIONS_KEPT + 10)}
+
+    kept = _forget_stale(warned, now=float(_SESSIONS_KEPT + 10))
+
+    assert len(kept) == _SESSIONS_KEPT
+    assert "s0" not in kept
+
+
+def test_forget_stale_drops_old_warnings():
+    """A day-old warning is forgotten, so the route warns again."""
+    kept = _forget_stale({"s1": {"old": 0.0, "new": 90_000.0}, "s2": "junk"}, now=90_001.0)
+
+    assert kept == {"s1": {"new": 90_000.0}}
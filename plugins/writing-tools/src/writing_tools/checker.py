@@ -7,7 +7,6 @@ docs/code and my own cleanup commands never get blocked.
 """
 
 import json
-import re
 import shlex
 from dataclasses import dataclass
 from pathlib import Path
@@ -46,18 +45,21 @@ def _serialize(tool_input: dict) -> str:
         return str(tool_input)
 
 
-def _matches_bash_prefix(command: str, prefixes: list[str]) -> bool:
-    """True if the command starts with a configured prefix at a command boundary.
+def _matches_bash_prefix(command: str, config: Config) -> Optional[str]:
+    """Return the configured prefix the command invokes at a command boundary.
 
     Matches at the start of the string or right after a shell separator
     (``;`` ``&&`` ``||`` ``|``), so ``gh pr create ...`` matches but
     ``grep "gh pr create" foo`` (the prefix quoted inside an argument) does not.
+    Uses the config's precompiled :attr:`Config.bash_prefix_pattern`, so the
+    cost is one regex search regardless of how many prefixes are configured.
+    Returns ``None`` when nothing matches.
     """
-    for prefix in prefixes:
-        pattern = r"(?:^|[;&|]\s*)" + re.escape(prefix)
-        if re.search(pattern, command):
-            return True
-    return False
+    pattern = config.bash_prefix_pattern
+    if pattern is None:
+        return None
+    match = pattern.search(command)
+    return match.group(1) if match else None
 
 
 def _body_file_paths(command: str) -> list[str]:
@@ -131,7 +133,7 @@ def check_tool_call(tool_call: dict, load_config: Callable[[], Config]) -> Check
         return CheckResult(blocked=False)
 
     if tool_name == "Bash":
-        if not _matches_bash_prefix(command, config.bash_commands):
+        if _matches_bash_prefix(command, config) is None:
             # Arbitrary bash (incl. my own grep/perl em-dash cleanup): allow.
             return CheckResult(blocked=False)
         if EMDASH in command or _body_file_has_emdash(command):
@@ -9,6 +9,7 @@ outside the versioned plugin (see the discovery order in ``find_config_path``).
 import os
 import re
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 from typing import Optional
 
@@ -26,6 +27,22 @@ class Config:
         """True when nothing is opted in, so the hook is a no-op (inert)."""
         return not self.mcp_tools and not self.bash_commands
 
+    @cached_property
+    def bash_prefix_pattern(self) -> Optional[re.Pattern]:
+        """All ``bash_commands`` compiled into one command-boundary regex.
+
+        Built lazily, once per loaded config, so matching a command costs a
+        single ``search`` no matter how many prefixes are configured. Prefixes
+        are tried longest-first, so when one prefix extends another (``gh pr``
+        vs ``gh pr create``) the more specific one is the one reported. Group 1
+        is the matched prefix. ``None`` when no prefixes are configured.
+        """
+        if not self.bash_commands:
+            return None
+        prefixes = sorted(set(self.bash_commands), key=len, reverse=True)
+        alternation = "|".join(re.escape(p) for p in prefixes)
+        return re.compile(r"(?:^|[;&|]\s*)(" + alternation + ")")
+
 
 def _shipped_config_path() -> Path:
     """The plugin's own inert default config (empty lists).
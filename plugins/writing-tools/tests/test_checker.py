@@ -1,6 +1,6 @@
 """Tests for the em-dash checker."""
 
-from writing_tools.checker import check_tool_call
+from writing_tools.checker import _matches_bash_prefix, check_tool_call
 from writing_tools.config import Config
 
 EMDASH = "—"
@@ -149,3 +149,25 @@ def test_emdash_escaped_in_json_still_detected():
     }
     result = check_tool_call(call, cfg(mcp_tools=[SLACK_TOOL]))
     assert result.blocked is True
+
+
+def test_bash_prefix_match_reports_longest_prefix():
+    config = Config(bash_commands=["gh pr", "gh pr create", "slack-cli send"])
+    assert _matches_bash_prefix("gh pr create --title x", config) == "gh pr create"
+    assert _matches_bash_prefix("gh pr edit 12", config) == "gh pr"
+    assert _matches_bash_prefix("cd x; slack-cli send hi", config) == "slack-cli send"
+    assert _matches_bash_prefix('grep "gh pr create" log', config) is None
+
+
+def test_bash_prefix_pattern_compiled_once_per_config():
+    config = Config(bash_commands=["gh pr create"])
+    assert config.bash_prefix_pattern is config.bash_prefix_pattern
+    assert Config().bash_prefix_pattern is None
+
+
+def test_long_prefix_list_still_matches_each_entry():
+    prefixes = [f"tool{i} send" for i in range(500)] + ["gh issue comment"]
+    config = Config(bash_commands=prefixes)
+    assert _matches_bash_prefix("gh issue comment 3 --body x", config) == "gh issue comment"
+    assert _matches_bash_prefix("tool417 send --msg y", config) == "tool417 send"
+    assert _matches_bash_prefix("tool9999 send", config) is None